@@ -0,0 +1,58 @@
+'''Command line entry point: `python -m benchmarks run` and `python -m benchmarks compare`.'''
+import argparse
+import json
+import sys
+
+from . import cases  # registers the cases
+from .harness import CASES, compare, run
+
+def format_result(name: str, result: dict) -> str:
+    return (
+        f"{name:<36} {result['iter']['items_per_s']:>14,.0f} items/s"
+        f" {result['iter']['peak_bytes'] / 1024:>10,.1f} KiB"
+        f"   x{result['overhead']:.2f} vs baseline"
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="run the suite")
+    run_parser.add_argument('-o', '--output', help="write the JSON report to this file")
+    run_parser.add_argument('-n', '--items', type=int, default=100_000, help="number of source items per case")
+    run_parser.add_argument('-r', '--repeat', type=int, default=5, help="repetitions per measurement; the best is kept")
+    run_parser.add_argument('-k', '--select', default='', help="only run cases whose name or group contains this string")
+    run_parser.add_argument('-l', '--list', action='store_true', help="list the cases and exit")
+    compare_parser = commands.add_parser('compare', help="compare two JSON reports")
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('-t', '--threshold', type=float, default=0.1, help="fraction of slowdown or memory growth flagged as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        def select(case):
+            return args.select in case.name or args.select in case.group
+        if args.list:
+            for case in CASES.values():
+                if select(case):
+                    print(f"{case.group:<12} {case.name}")
+            return 0
+        report = run(args.items, args.repeat, select, progress=lambda name, result: print(format_result(name, result)))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+        return 0
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows = compare(old, new, args.threshold)
+    for row in rows:
+        flag = 'REGRESSION' if row['regression'] else ''
+        print(f"{row['name']:<36} time x{row['time_ratio']:.2f}  memory x{row['memory_ratio']:.2f}  {flag}")
+    regressions = sum(row['regression'] for row in rows)
+    print(f"{regressions} regression(s) above {args.threshold:.0%} in {len(rows)} case(s)")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
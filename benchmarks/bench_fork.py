@@ -0,0 +1,26 @@
+'''Measures the per-item cost of `Iter.fork` against the number of branches. Each branch takes the items with one remainder modulo the number of branches, and the branches are drained one after another, so all but the first are served from their buffers.'''
+import timeit
+
+from pipe_iter import Iter
+
+N = 100_000
+REPEAT = 5
+BRANCHES = (2, 4, 8, 16)
+
+def predicates(k):
+    return [lambda x, i=i: x % k == i for i in range(k)]
+
+def run(k, first_only):
+    forks = Iter(range(N)).fork(*predicates(k), first_only=first_only)
+    return sum(sum(1 for _ in fork) for fork in forks)
+
+def main():
+    for first_only in (True, False):
+        print(f"first_only={first_only}")
+        for k in BRANCHES:
+            assert run(k, first_only) == N
+            best = min(timeit.repeat(lambda: run(k, first_only), number=1, repeat=REPEAT))
+            print(f"  {k:>2} branches: {best * 1e3:8.2f} ms ({best / N * 1e9:6.1f} ns/item)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+'''Compares a 10-stage `Iter` chain, which is fused into a single generator, with the equivalent chain of nested builtin iterators that `Iter` used to build.'''
+import itertools
+import timeit
+
+from pipe_iter import Iter
+from pipe_iter.fusion import with_options
+
+N = 100_000
+REPEAT = 5
+
+def add_one(x):
+    return x + 1
+
+def is_odd(x):
+    return x % 2
+
+def nothing(x):
+    pass
+
+def below(x):
+    return x < N * 4
+
+def fused():
+    return (Iter(range(N))
+        .map(add_one)
+        .inspect(nothing)
+        .map(add_one)
+        .filter(is_odd)
+        .map(add_one)
+        .inspect(nothing)
+        .map(add_one)
+        .filterfalse(is_odd)
+        .map(add_one)
+        .takewhile(below)
+        .collect(list)
+    )
+
+def nested():
+    def inspector(fn):
+        def inner(x):
+            fn(x)
+            return x
+        return inner
+    itr = iter(range(N))
+    itr = map(with_options(add_one), itr)
+    itr = map(inspector(with_options(nothing)), itr)
+    itr = map(with_options(add_one), itr)
+    itr = filter(with_options(is_odd), itr)
+    itr = map(with_options(add_one), itr)
+    itr = map(inspector(with_options(nothing)), itr)
+    itr = map(with_options(add_one), itr)
+    itr = itertools.filterfalse(with_options(is_odd), itr)
+    itr = map(with_options(add_one), itr)
+    itr = itertools.takewhile(with_options(below), itr)
+    return list(itr)
+
+def main():
+    assert fused() == nested()
+    for name, fn in (('nested', nested), ('fused', fused)):
+        best = min(timeit.repeat(fn, number=1, repeat=REPEAT))
+        print(f"{name:>8}: {best * 1e3:8.2f} ms ({best / N * 1e9:6.1f} ns/item)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,833 @@
+'''Benchmark cases. Each case pairs an `Iter` pipeline with the equivalent hand-written itertools/generator code, so that the wrapper overhead can be read off the ratio between them.'''
+from collections import deque
+import functools
+import itertools
+import atexit
+import math
+import operator
+import os
+import random
+import struct
+import tempfile
+
+from pipe_iter import CountIf, Iter
+from pipe_iter.vectorized import np
+
+from .harness import case
+
+exhaust = deque(maxlen=0).extend
+
+def inc(x):
+    return x + 1
+
+def is_odd(x):
+    return x % 2
+
+def add(x, y):
+    return x + y
+
+def nothing(x):
+    pass
+
+def side(n, factor=1):
+    '''Source size `k` for a pairwise combinatoric case, so that it yields about `n` items when its output grows like `k**2 / factor`.'''
+    return max(2, math.isqrt(n * factor))
+
+#****************#
+#* Lazy methods *#
+#****************#
+
+@case('accumulate', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).accumulate().collect(exhaust),
+        lambda: exhaust(itertools.accumulate(range(n))),
+    )
+
+@case('apply', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).apply(reversed_pairs).collect(exhaust),
+        lambda: exhaust(reversed_pairs(iter(range(n)))),
+    )
+
+def reversed_pairs(iterator):
+    return map(operator.neg, iterator)
+
+@case('batched', 'lazy')
+def _(n):
+    def baseline():
+        iterator = iter(range(n))
+        exhaust(iter(lambda: tuple(itertools.islice(iterator, 16)), ()))
+    return (
+        lambda: Iter(range(n)).batched(16).collect(exhaust),
+        baseline,
+    )
+
+@case('batched_by', 'lazy')
+def _(n):
+    words = ['x' * (i % 7) for i in range(n)]
+    def baseline():
+        batch = []
+        total = 0
+        for word in words:
+            if batch and total + len(word) > 64:
+                exhaust((tuple(batch),))
+                batch = []
+                total = 0
+            batch.append(word)
+            total += len(word)
+        exhaust((tuple(batch),))
+    return (
+        lambda: Iter(words).batched_by(max_weight=64).collect(exhaust),
+        baseline,
+    )
+
+@case('chain', 'lazy')
+def _(n):
+    half = n // 2
+    return (
+        lambda: Iter(range(half)).chain(range(n - half)).collect(exhaust),
+        lambda: exhaust(itertools.chain(range(half), range(n - half))),
+    )
+
+@case('combinations', 'lazy')
+def _(n):
+    k = side(n, 2)
+    return (
+        lambda: Iter(range(k)).combinations(2).collect(exhaust),
+        lambda: exhaust(itertools.combinations(range(k), 2)),
+    )
+
+@case('combinations_with_replacement', 'lazy')
+def _(n):
+    k = side(n, 2)
+    return (
+        lambda: Iter(range(k)).combinations_with_replacement(2).collect(exhaust),
+        lambda: exhaust(itertools.combinations_with_replacement(range(k), 2)),
+    )
+
+@case('compress', 'lazy')
+def _(n):
+    selectors = [1, 0, 0] * (n // 3 + 1)
+    return (
+        lambda: Iter(range(n)).compress(selectors).collect(exhaust),
+        lambda: exhaust(itertools.compress(range(n), selectors)),
+    )
+
+@case('cycle', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(100)).cycle().take(n).collect(exhaust),
+        lambda: exhaust(itertools.islice(itertools.cycle(range(100)), n)),
+    )
+
+@case('dropwhile', 'lazy')
+def _(n):
+    half = n // 2
+    return (
+        lambda: Iter(range(n)).dropwhile(lambda x: x < half).collect(exhaust),
+        lambda: exhaust(itertools.dropwhile(lambda x: x < half, range(n))),
+    )
+
+@case('enumerate', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).enumerate().collect(exhaust),
+        lambda: exhaust(enumerate(range(n))),
+    )
+
+@case('evenitems', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).evenitems().collect(exhaust),
+        lambda: exhaust(itertools.islice(range(n), 1, None, 2)),
+    )
+
+@case('filter', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).filter(is_odd).collect(exhaust),
+        lambda: exhaust(filter(is_odd, range(n))),
+    )
+
+@case('filter_batches', 'lazy')
+def _(n):
+    if np is None:
+        return (lambda: None, lambda: None)
+    def baseline():
+        iterator = iter(range(n))
+        for batch in iter(lambda: tuple(itertools.islice(iterator, 1024)), ()):
+            exhaust(itertools.compress(batch, (np.array(batch) % 2 == 1).tolist()))
+    return (
+        lambda: Iter(range(n)).filter_batches(lambda a: a % 2 == 1).collect(exhaust),
+        baseline,
+    )
+
+@case('filter_star', 'lazy')
+def _(n):
+    pairs = list(zip(range(n), range(n)))
+    def either_odd(x, y):
+        return (x | y) & 1
+    return (
+        lambda: Iter(pairs).star().filter(either_odd).collect(exhaust),
+        lambda: exhaust(itertools.compress(pairs, itertools.starmap(either_odd, pairs))),
+    )
+
+@case('filterfalse_star', 'lazy')
+def _(n):
+    pairs = list(zip(range(n), range(n)))
+    def either_odd(x, y):
+        return (x | y) & 1
+    def baseline():
+        for x, y in pairs:
+            if not either_odd(x, y):
+                pass
+    return (
+        lambda: Iter(pairs).star().filterfalse(either_odd).collect(exhaust),
+        baseline,
+    )
+
+@case('takewhile_star', 'lazy')
+def _(n):
+    pairs = list(zip(range(n), range(n)))
+    def below(x, y):
+        return x < n
+    def baseline():
+        for x, y in pairs:
+            if not below(x, y):
+                break
+    return (
+        lambda: Iter(pairs).star().takewhile(below).collect(exhaust),
+        baseline,
+    )
+
+@case('filterfalse', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).filterfalse(is_odd).collect(exhaust),
+        lambda: exhaust(itertools.filterfalse(is_odd, range(n))),
+    )
+
+@case('filter_map', 'lazy')
+def _(n):
+    def half_if_even(x):
+        return None if x % 2 else x // 2
+    return (
+        lambda: Iter(range(n)).filter_map(half_if_even).collect(exhaust),
+        lambda: exhaust(x for x in map(half_if_even, range(n)) if x is not None),
+    )
+
+@case('flat_map', 'lazy')
+def _(n):
+    def pair(x):
+        return (x, x)
+    half = n // 2
+    return (
+        lambda: Iter(range(half)).flat_map(pair).collect(exhaust),
+        lambda: exhaust(itertools.chain.from_iterable(map(pair, range(half)))),
+    )
+
+@case('flatten', 'lazy')
+def _(n):
+    nested = [(i, i) for i in range(n // 2)]
+    return (
+        lambda: Iter(nested).flatten().collect(exhaust),
+        lambda: exhaust(itertools.chain.from_iterable(nested)),
+    )
+
+@case('groupby', 'lazy')
+def _(n):
+    def key(x):
+        return x // 10
+    return (
+        lambda: Iter(range(n)).groupby(key).collect(exhaust),
+        lambda: exhaust(itertools.groupby(range(n), key)),
+    )
+
+@case('inspect', 'lazy')
+def _(n):
+    def baseline():
+        for x in range(n):
+            nothing(x)
+    return (
+        lambda: Iter(range(n)).inspect(nothing).collect(exhaust),
+        baseline,
+    )
+
+@case('islice', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(2 * n)).islice(0, 2 * n, 2).collect(exhaust),
+        lambda: exhaust(itertools.islice(range(2 * n), 0, 2 * n, 2)),
+    )
+
+@case('map', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).map(inc).collect(exhaust),
+        lambda: exhaust(map(inc, range(n))),
+    )
+
+@case('map_batches', 'lazy')
+def _(n):
+    if np is None:
+        return (lambda: None, lambda: None)
+    def baseline():
+        iterator = iter(range(n))
+        for batch in iter(lambda: tuple(itertools.islice(iterator, 1024)), ()):
+            exhaust((np.array(batch) + 1).tolist())
+    return (
+        lambda: Iter(range(n)).map_batches(lambda a: a + 1).collect(exhaust),
+        baseline,
+    )
+
+@case('map_star', 'lazy')
+def _(n):
+    pairs = list(zip(range(n), range(n)))
+    return (
+        lambda: Iter(pairs).star().map(add).collect(exhaust),
+        lambda: exhaust(itertools.starmap(add, pairs)),
+    )
+
+@case('map_star_fallible', 'lazy')
+def _(n):
+    pairs = list(zip(range(n), range(n)))
+    def baseline():
+        for x, y in pairs:
+            try:
+                add(x, y)
+            except Exception:
+                pass
+    return (
+        lambda: Iter(pairs).star().fallible().map(add).collect(exhaust),
+        baseline,
+    )
+
+@case('map_doublestar', 'lazy')
+def _(n):
+    records = [{'x': i, 'y': i} for i in range(n)]
+    return (
+        lambda: Iter(records).doublestar().map(add).collect(exhaust),
+        lambda: exhaust(add(**record) for record in records),
+    )
+
+@case('map_fallible', 'lazy')
+def _(n):
+    def baseline():
+        for x in range(n):
+            try:
+                inc(x)
+            except Exception:
+                pass
+    return (
+        lambda: Iter(range(n)).fallible().map(inc).collect(exhaust),
+        baseline,
+    )
+
+@case('map_chain_10', 'lazy')
+def _(n):
+    def baseline():
+        exhaust(inc(inc(inc(inc(inc(inc(inc(inc(inc(inc(x)))))))))) for x in range(n))
+    def fused():
+        itr = Iter(range(n))
+        for _ in range(10):
+            itr = itr.map(inc)
+        itr.collect(exhaust)
+    return (fused, baseline)
+
+@case('odditems', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).odditems().collect(exhaust),
+        lambda: exhaust(itertools.islice(range(n), 0, None, 2)),
+    )
+
+@case('pairwise', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).pairwise().collect(exhaust),
+        lambda: exhaust(itertools.pairwise(range(n))),
+    )
+
+@case('par_map', 'parallel', scale=0.1)
+def _(n):
+    return (
+        lambda: Iter(range(n)).par_map(inc, workers=2, chunksize=1024).collect(exhaust),
+        lambda: exhaust(map(inc, range(n))),
+    )
+
+@case('permutations', 'lazy')
+def _(n):
+    k = side(n)
+    return (
+        lambda: Iter(range(k)).permutations(2).collect(exhaust),
+        lambda: exhaust(itertools.permutations(range(k), 2)),
+    )
+
+@case('product', 'lazy')
+def _(n):
+    k = side(n)
+    return (
+        lambda: Iter(range(k)).product(range(k)).collect(exhaust),
+        lambda: exhaust(itertools.product(range(k), range(k))),
+    )
+
+@case('skip', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(2 * n)).skip(n).collect(exhaust),
+        lambda: exhaust(itertools.islice(range(2 * n), n, None)),
+    )
+
+@case('somevalue', 'lazy')
+def _(n):
+    items = [None if i % 3 == 0 else i for i in range(n)]
+    return (
+        lambda: Iter(items).somevalue().collect(exhaust),
+        lambda: exhaust(x for x in items if x is not None),
+    )
+
+@case('starmap', 'lazy')
+def _(n):
+    pairs = list(zip(range(n), range(n)))
+    return (
+        lambda: Iter(pairs).starmap(add).collect(exhaust),
+        lambda: exhaust(itertools.starmap(add, pairs)),
+    )
+
+@case('stretch', 'lazy')
+def _(n):
+    nested = [[i, [i, i]] for i in range(n // 3)]
+    def baseline():
+        for outer in nested:
+            for inner in outer:
+                if isinstance(inner, list):
+                    exhaust(inner)
+    return (
+        lambda: Iter(nested).stretch(2).collect(exhaust),
+        baseline,
+    )
+
+@case('switch_map', 'lazy')
+def _(n):
+    def baseline():
+        for x in range(n):
+            r = x % 3
+            if r == 0:
+                inc(x)
+            elif r == 1:
+                str(x)
+            else:
+                x
+    return (
+        lambda: Iter(range(n)).switch_map(key=lambda x: x % 3, cases={0: inc, 1: str}).collect(exhaust),
+        baseline,
+    )
+
+@case('take', 'lazy')
+def _(n):
+    return (
+        lambda: Iter.count().take(n).collect(exhaust),
+        lambda: exhaust(itertools.islice(itertools.count(), n)),
+    )
+
+@case('takewhile', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).takewhile(lambda x: x < n).collect(exhaust),
+        lambda: exhaust(itertools.takewhile(lambda x: x < n, range(n))),
+    )
+
+@case('thread_map', 'parallel', scale=0.1)
+def _(n):
+    return (
+        lambda: Iter(range(n)).thread_map(inc, workers=4).collect(exhaust),
+        lambda: exhaust(map(inc, range(n))),
+    )
+
+@case('window', 'lazy')
+def _(n):
+    def baseline():
+        iterator = iter(range(n))
+        window = tuple(itertools.islice(iterator, 8))
+        exhaust((window,))
+        for item in iterator:
+            window = window[1:] + (item,)
+            exhaust((window,))
+    return (
+        lambda: Iter(range(n)).window(8).collect(exhaust),
+        baseline,
+    )
+
+@case('zip', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).zip(range(n)).collect(exhaust),
+        lambda: exhaust(zip(range(n), range(n))),
+    )
+
+@case('zip_longest', 'lazy')
+def _(n):
+    return (
+        lambda: Iter(range(n)).zip_longest(range(n // 2)).collect(exhaust),
+        lambda: exhaust(itertools.zip_longest(range(n), range(n // 2))),
+    )
+
+#***************#
+#* Fork & tee  *#
+#***************#
+
+def fork_case(k: int):
+    def setup(n):
+        predicates = [lambda x, i=i: x % k == i for i in range(k)]
+        def baseline():
+            branches = [[] for _ in range(k)]
+            for x in range(n):
+                for predicate, branch in zip(predicates, branches):
+                    if predicate(x):
+                        branch.append(x)
+                        break
+            for branch in branches:
+                exhaust(branch)
+        def forked():
+            for fork in Iter(range(n)).fork(*predicates):
+                exhaust(fork)
+        return (forked, baseline)
+    return setup
+
+for k in (2, 4, 8, 16):
+    case(f'fork_{k}', 'fork')(fork_case(k))
+
+@case('clone_skewed', 'tee')
+def _(n):
+    def baseline():
+        first, second = itertools.tee(range(n))
+        exhaust(first)
+        exhaust(second)
+    def cloned():
+        first = Iter(range(n))
+        second = first.clone()
+        first.collect(exhaust)
+        second.collect(exhaust)
+    return (cloned, baseline)
+
+@case('tee_skewed_4', 'tee')
+def _(n):
+    def baseline():
+        for branch in itertools.tee(range(n), 4):
+            exhaust(branch)
+    def teed():
+        for branch in Iter(range(n)).tee(4):
+            branch.collect(exhaust)
+    return (teed, baseline)
+
+#****************#
+#* File sources *#
+#****************#
+
+def temp_file(data: bytes) -> str:
+    '''Writes `data` to a temporary file, deleted when the interpreter exits, and returns its path.'''
+    fd, path = tempfile.mkstemp(prefix='pipe_iter_bench_')
+    with os.fdopen(fd, 'wb') as file:
+        file.write(data)
+    atexit.register(os.remove, path)
+    return path
+
+def lines_case(**options):
+    def setup(n):
+        path = temp_file(b''.join(b'%d,some text,%d\n' % (i, i * 7) for i in range(n)))
+        def baseline():
+            with open(path, encoding='utf-8') as file:
+                exhaust(file)
+        return (
+            lambda: Iter.from_lines(path, encoding='utf-8', **options).collect(exhaust),
+            baseline,
+        )
+    return setup
+
+case('from_lines', 'files')(lines_case())
+case('from_lines_no_mmap', 'files')(lines_case(mmap=False))
+
+@case('from_records', 'files')
+def _(n):
+    record = struct.Struct('<iid')
+    path = temp_file(b''.join(record.pack(i, -i, i / 2) for i in range(n)))
+    def baseline():
+        with open(path, 'rb') as file:
+            exhaust(map(record.unpack, iter(functools.partial(file.read, record.size), b'')))
+    return (
+        lambda: Iter.from_records(path, record).collect(exhaust),
+        baseline,
+    )
+
+def sink_case(method: str, **options):
+    def setup(n):
+        path = temp_file(b'')
+        lines = [f'{i},some text,{i * 7}' for i in range(n)]
+        def baseline():
+            with open(path, 'w', encoding='utf-8') as file:
+                for line in lines:
+                    file.write(line + '\n')
+        return (
+            lambda: getattr(Iter(lines), method)(path, **options),
+            baseline,
+        )
+    return setup
+
+case('write_lines', 'files')(sink_case('write_lines'))
+case('write_lines_background', 'files')(sink_case('write_lines', background=True))
+
+@case('tee_bounded_lockstep', 'tee')
+def _(n):
+    return (
+        lambda: exhaust(zip(*Iter(range(n)).tee(2, max_lag=16))),
+        lambda: exhaust(zip(*itertools.tee(range(n), 2))),
+    )
+
+@case('cache_3_passes', 'tee')
+def _(n):
+    def baseline():
+        items = list(map(inc, range(n)))
+        for _ in range(3):
+            exhaust(items)
+    def cached():
+        cache = Iter(range(n)).map(inc).cache()
+        for _ in range(3):
+            exhaust(cache)
+    return (cached, baseline)
+
+@case('cache_3_passes_spill', 'tee')
+def _(n):
+    def baseline():
+        items = list(map(inc, range(n)))
+        for _ in range(3):
+            exhaust(items)
+    def cached():
+        with Iter(range(n)).map(inc).cache(max_items=n // 10) as cache:
+            for _ in range(3):
+                exhaust(cache)
+    return (cached, baseline)
+
+@case('sorted_external', 'sorting')
+def _(n):
+    data = [(i * 7919) % n for i in range(n)]
+    return (
+        lambda: exhaust(Iter(data).sorted(max_memory=n // 10)),
+        lambda: exhaust(sorted(data)),
+    )
+
+@case('unique', 'sorting')
+def _(n):
+    keys = [(i * 7919) % (n // 4) for i in range(n)]
+    def baseline():
+        seen = set()
+        def new(x):
+            if x in seen:
+                return False
+            seen.add(x)
+            return True
+        exhaust(filter(new, keys))
+    return (
+        lambda: exhaust(Iter(keys).unique()),
+        baseline,
+    )
+
+@case('unique_bloom', 'sorting')
+def _(n):
+    keys = [(i * 7919) % (n // 4) for i in range(n)]
+    def baseline():
+        seen = set()
+        def new(x):
+            if x in seen:
+                return False
+            seen.add(x)
+            return True
+        exhaust(filter(new, keys))
+    return (
+        lambda: exhaust(Iter(keys).unique(mode='bloom', capacity=n // 4)),
+        baseline,
+    )
+
+@case('unique_consecutive', 'sorting')
+def _(n):
+    keys = [i // 4 for i in range(n)]
+    return (
+        lambda: exhaust(Iter(keys).unique_consecutive()),
+        lambda: exhaust(key for key, _ in itertools.groupby(keys)),
+    )
+
+@case('group_aggregate_sum', 'sorting')
+def _(n):
+    pairs = [((i * 7919) % 1000, i) for i in range(n)]
+    first = operator.itemgetter(0)
+    second = operator.itemgetter(1)
+    return (
+        lambda: exhaust(Iter(pairs).group_aggregate(first, 'sum', value=second)),
+        lambda: exhaust((key, sum(map(second, group))) for key, group in itertools.groupby(sorted(pairs, key=first), first)),
+    )
+
+@case('group_aggregate_spill', 'sorting')
+def _(n):
+    pairs = [((i * 7919) % 1000, i) for i in range(n)]
+    first = operator.itemgetter(0)
+    second = operator.itemgetter(1)
+    return (
+        lambda: exhaust(Iter(pairs).group_aggregate(first, 'sum', value=second, max_groups_in_memory=100)),
+        lambda: exhaust((key, sum(map(second, group))) for key, group in itertools.groupby(sorted(pairs, key=first), first)),
+    )
+
+@case('join_hash', 'sorting')
+def _(n):
+    users = [(i, f'user {i}') for i in range(n // 10)]
+    orders = [((i * 7919) % (n // 10), i) for i in range(n)]
+    first = operator.itemgetter(0)
+    def baseline():
+        table = dict(users)
+        exhaust((order, (order[0], table[order[0]])) for order in orders if order[0] in table)
+    return (
+        lambda: exhaust(Iter(orders).join(users, first)),
+        baseline,
+    )
+
+@case('join_hash_spill', 'sorting')
+def _(n):
+    users = [(i, f'user {i}') for i in range(n // 10)]
+    orders = [((i * 7919) % (n // 10), i) for i in range(n)]
+    first = operator.itemgetter(0)
+    def baseline():
+        table = dict(users)
+        exhaust((order, (order[0], table[order[0]])) for order in orders if order[0] in table)
+    return (
+        lambda: exhaust(Iter(orders).join(users, first, max_memory=n // 100)),
+        baseline,
+    )
+
+@case('join_merge', 'sorting')
+def _(n):
+    users = [(i, f'user {i}') for i in range(n // 10)]
+    orders = sorted(((i * 7919) % (n // 10), i) for i in range(n))
+    first = operator.itemgetter(0)
+    def baseline():
+        table = dict(users)
+        exhaust((order, (order[0], table[order[0]])) for order in orders if order[0] in table)
+    return (
+        lambda: exhaust(Iter(orders).join(users, first, strategy='merge')),
+        baseline,
+    )
+
+@case('filter_in', 'sorting')
+def _(n):
+    keys = set(range(0, n, 3))
+    return (
+        lambda: exhaust(Iter(range(n)).filter_in(keys)),
+        lambda: exhaust(x for x in range(n) if x in keys),
+    )
+
+#*********************#
+#* Consuming methods *#
+#*********************#
+
+@case('count_if', 'consuming')
+def _(n):
+    return (
+        lambda: Iter(range(n)).count_if(is_odd),
+        lambda: sum(1 for x in range(n) if is_odd(x)),
+    )
+
+@case('find', 'consuming')
+def _(n):
+    return (
+        lambda: Iter(range(n)).find(lambda x: x == n - 1),
+        lambda: next(filter(lambda x: x == n - 1, range(n)), None),
+    )
+
+@case('nth', 'consuming')
+def _(n):
+    return (
+        lambda: Iter(range(n)).nth(n),
+        lambda: next(itertools.islice(range(n), n - 1, None), None),
+    )
+
+@case('sample', 'consuming')
+def _(n):
+    return (
+        lambda: Iter(range(n)).sample(100, seed=0),
+        lambda: random.Random(0).sample(list(range(n)), 100),
+    )
+
+@case('approx_distinct', 'consuming')
+def _(n):
+    return (
+        lambda: Iter(range(n)).approx_distinct(),
+        lambda: len(set(range(n))),
+    )
+
+@case('approx_quantiles', 'consuming')
+def _(n):
+    data = [(i * 7919) % n for i in range(n)]
+    return (
+        lambda: Iter(data).approx_quantiles([0.5, 0.99]),
+        lambda: [sorted(data)[int(q * (n - 1))] for q in (0.5, 0.99)],
+    )
+
+@case('aggregate_5', 'consuming')
+def _(n):
+    def baseline():
+        items = list(range(n))
+        return min(items), max(items), sum(items), len(items), sum(1 for x in items if x % 2)
+    return (
+        lambda: Iter(range(n)).aggregate(low='min', high='max', total='sum', n='count', odd=CountIf(is_odd)),
+        baseline,
+    )
+
+@case('top_k', 'consuming')
+def _(n):
+    data = [(i * 7919) % n for i in range(n)]
+    return (
+        lambda: Iter(data).top_k(10),
+        lambda: sorted(data, reverse=True)[:10],
+    )
+
+@case('reduce', 'consuming')
+def _(n):
+    return (
+        lambda: Iter(range(n)).reduce(operator.add),
+        lambda: functools.reduce(operator.add, range(n)),
+    )
+
+@case('for_each_star', 'consuming')
+def _(n):
+    pairs = list(zip(range(n), range(n)))
+    return (
+        lambda: Iter(pairs).star().for_each(add),
+        lambda: exhaust(itertools.starmap(add, pairs)),
+    )
+
+@case('for_each_star_fallible', 'consuming')
+def _(n):
+    pairs = list(zip(range(n), range(n)))
+    def baseline():
+        for x, y in pairs:
+            try:
+                add(x, y)
+            except Exception:
+                pass
+    return (
+        lambda: Iter(pairs).star().fallible().for_each(add),
+        baseline,
+    )
+
+@case('fold', 'consuming')
+def _(n):
+    return (
+        lambda: Iter(range(n)).fold(operator.add, 0),
+        lambda: functools.reduce(operator.add, range(n), 0),
+    )
+
+@case('collect_list', 'consuming')
+def _(n):
+    return (
+        lambda: Iter(range(n)).collect(list),
+        lambda: list(range(n)),
+    )
@@ -0,0 +1,95 @@
+'''Registry, measurement and comparison helpers for the benchmark suite.'''
+from collections.abc import Callable
+from dataclasses import dataclass
+import gc
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+@dataclass
+class Case:
+    '''A benchmark case: `setup(n)` returns a pair of zero-argument callables that each process `n` source items, the first with `Iter` and the second with hand-written itertools/generator code.'''
+    name: str
+    group: str
+    setup: Callable[[int], tuple[Callable[[], object], Callable[[], object]]]
+    scale: float = 1.0
+
+CASES: dict[str, Case] = {}
+
+def case(name: str, group: str, scale: float = 1.0):
+    '''Registers a benchmark case. `scale` multiplies the number of items, for cases that are much slower or faster per item than the rest.'''
+    def register(setup):
+        if name in CASES:
+            raise ValueError(f"Duplicate benchmark case {name!r}")
+        CASES[name] = Case(name, group, setup, scale)
+        return setup
+    return register
+
+def measure(fn: Callable[[], object], items: int, repeat: int) -> dict:
+    '''Returns the best time, throughput and peak traced memory of `fn`.'''
+    gc.collect()
+    seconds = min(timeit.repeat(fn, number=1, repeat=repeat))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds': seconds,
+        'items_per_s': items / seconds if seconds else float('inf'),
+        'peak_bytes': peak,
+    }
+
+def run_case(case: Case, n: int, repeat: int) -> dict:
+    items = max(1, int(n * case.scale))
+    iter_fn, baseline_fn = case.setup(items)
+    result = {
+        'group': case.group,
+        'items': items,
+        'iter': measure(iter_fn, items, repeat),
+        'baseline': measure(baseline_fn, items, repeat),
+    }
+    result['overhead'] = result['iter']['seconds'] / result['baseline']['seconds']
+    return result
+
+def run(n: int, repeat: int, select: Callable[[Case], bool] = lambda case: True, progress=None) -> dict:
+    '''Runs the selected cases and returns a JSON-serializable report.'''
+    results = {}
+    for case in CASES.values():
+        if not select(case):
+            continue
+        results[case.name] = run_case(case, n, repeat)
+        if progress is not None:
+            progress(case.name, results[case.name])
+    return {
+        'meta': {
+            'python': sys.version,
+            'platform': platform.platform(),
+            'n': n,
+            'repeat': repeat,
+            'timestamp': time.time(),
+        },
+        'results': results,
+    }
+
+def compare(old: dict, new: dict, threshold: float) -> list[dict]:
+    '''Compares two reports case by case. Returns one row per case present in both, with `regression` set if the `Iter` variant got slower, or its peak memory grew, by more than `threshold` (a fraction).'''
+    rows = []
+    for name, new_result in new['results'].items():
+        old_result = old['results'].get(name)
+        if old_result is None:
+            continue
+        time_ratio = new_result['iter']['seconds'] / old_result['iter']['seconds']
+        old_peak = old_result['iter']['peak_bytes']
+        memory_ratio = new_result['iter']['peak_bytes'] / old_peak if old_peak else 1.0
+        rows.append({
+            'name': name,
+            'time_ratio': time_ratio,
+            'memory_ratio': memory_ratio,
+            'regression': time_ratio > 1 + threshold or memory_ratio > 1 + threshold,
+        })
+    return rows
@@ -1,8 +1,23 @@
 from .pipe_iter import Iter
+from .aggregate import Accumulator, CountIf, Fold
+from .async_iter import AsyncIter
+from .buffer import BufferOverflowError
+from .cache import Cache
+from .fork import Fork
 from .func import star_func, doublestar_func, fallible_func
+from .tee import Tee, TeeBranch
 
 __all__ = [
-    'Iter'
+    'Iter',
+    'Accumulator',
+    'CountIf',
+    'Fold',
+    'AsyncIter',
+    'BufferOverflowError',
+    'Cache',
+    'Fork',
+    'Tee',
+    'TeeBranch',
     'star_func',
     'doublestar_func',
     'fallible_func',
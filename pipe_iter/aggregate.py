@@ -0,0 +1,366 @@
+import abc
+from collections.abc import Callable, Iterable, Iterator
+import functools
+import itertools
+import operator
+import pickle
+import tempfile
+from typing import Any
+
+SPILL_BATCH = 1024
+'''Number of items per `pickle.dump` when items are spilled to a partition file.'''
+PARTITIONS = 16
+MAX_DEPTH = 8
+'''Partitions this many levels deep are aggregated in memory whatever their size, as their keys collide under every salt.'''
+_MISSING = object()
+
+#****************#
+#* Accumulators *#
+#****************#
+
+class Accumulator(abc.ABC):
+    '''Reduces a group of values to a result. The state of a group is created from its first value by `start`, updated with each later value by `add` (which returns the new state and may modify the old one), and turned into the result by `result`; `empty` is the result for no values. Subclasses override `start` and `add`, and `result` if the state is not the result itself. `inline` is the source of the update run by `aggregate` for each value `x`, with `{s}` standing for the state and `{add}` and `{acc}` for `add` and the accumulator: built-in accumulators update their state in place of a call. The attributes named in `bindings` are looked up once per run, and stand for themselves in `inline` (e.g. `{predicate}`). The state may start as the first value itself, so updates must not modify it in place (`{s} = {s} + x`, not `{s} += x`).'''
+    name = 'accumulator'
+    inline = '{s} = {add}({s}, x)'
+    bindings: tuple[str, ...] = ()
+
+    @abc.abstractmethod
+    def start(self, value) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def add(self, state, value) -> Any:
+        ...
+
+    def result(self, state) -> Any:
+        return state
+
+    def empty(self) -> Any:
+        return None
+
+    def __repr__(self):
+        return f'{type(self).__name__}()'
+
+class Count(Accumulator):
+    name = 'count'
+    inline = '{s} += 1'
+
+    def start(self, value):
+        return 1
+
+    def add(self, state, value):
+        return state + 1
+
+    def empty(self):
+        return 0
+
+class CountIf(Accumulator):
+    '''Counts the values for which `predicate` is true.'''
+    name = 'count_if'
+    inline = 'if {predicate}(x): {s} += 1'
+    bindings = ('predicate',)
+
+    def __init__(self, predicate: Callable[[Any], bool]):
+        self.predicate = predicate
+
+    def start(self, value):
+        return 1 if self.predicate(value) else 0
+
+    def add(self, state, value):
+        return state + 1 if self.predicate(value) else state
+
+    def empty(self):
+        return 0
+
+    def __repr__(self):
+        return f'CountIf({self.predicate!r})'
+
+class Sum(Accumulator):
+    name = 'sum'
+    inline = '{s} = {s} + x'
+
+    def start(self, value):
+        return value
+
+    add = staticmethod(operator.add)
+
+    def empty(self):
+        return 0
+
+class Min(Accumulator):
+    name = 'min'
+    inline = 'if x < {s}: {s} = x'
+
+    def start(self, value):
+        return value
+
+    def add(self, state, value):
+        return value if value < state else state
+
+class Max(Accumulator):
+    name = 'max'
+    inline = 'if x > {s}: {s} = x'
+
+    def start(self, value):
+        return value
+
+    def add(self, state, value):
+        return value if value > state else state
+
+class Mean(Accumulator):
+    '''The arithmetic mean, from a count and a sum.'''
+    name = 'mean'
+    inline = '{s}[0] += 1\n{s}[1] = {s}[1] + x'
+
+    def start(self, value):
+        return [1, value]
+
+    def add(self, state, value):
+        state[0] += 1
+        state[1] = state[1] + value
+        return state
+
+    def result(self, state):
+        return state[1] / state[0]
+
+class Var(Accumulator):
+    '''The sample variance, as `statistics.variance` computes it, by Welford's algorithm; `None` for fewer than two values.'''
+    name = 'var'
+    inline = '{s}[0] += 1\nd = x - {s}[1]\n{s}[1] = {s}[1] + d / {s}[0]\n{s}[2] = {s}[2] + d * (x - {s}[1])'
+
+    def start(self, value):
+        return [1, value, 0.0]
+
+    def add(self, state, value):
+        state[0] += 1
+        delta = value - state[1]
+        state[1] = state[1] + delta / state[0]
+        state[2] = state[2] + delta * (value - state[1])
+        return state
+
+    def result(self, state):
+        return state[2] / (state[0] - 1) if state[0] > 1 else None
+
+class First(Accumulator):
+    name = 'first'
+    inline = ''
+
+    def start(self, value):
+        return value
+
+    def add(self, state, value):
+        return state
+
+class Last(Accumulator):
+    name = 'last'
+    inline = '{s} = x'
+
+    def start(self, value):
+        return value
+
+    def add(self, state, value):
+        return value
+
+class AnyTrue(Accumulator):
+    name = 'any'
+    inline = 'if not {s} and x: {s} = True'
+
+    def start(self, value):
+        return bool(value)
+
+    def add(self, state, value):
+        return state or bool(value)
+
+    def empty(self):
+        return False
+
+class AllTrue(Accumulator):
+    name = 'all'
+    inline = 'if {s} and not x: {s} = False'
+
+    def start(self, value):
+        return bool(value)
+
+    def add(self, state, value):
+        return state and bool(value)
+
+    def empty(self):
+        return True
+
+class List(Accumulator):
+    name = 'list'
+    inline = '{s}.append(x)'
+
+    def start(self, value):
+        return [value]
+
+    def add(self, state, value):
+        state.append(value)
+        return state
+
+    def empty(self):
+        return []
+
+class Fold(Accumulator):
+    '''Folds each group with `fn`, beginning with `initial`, like `Iter.fold`.'''
+    name = 'fold'
+    inline = '{s} = {fn}({s}, x)'
+    bindings = ('fn',)
+
+    def __init__(self, fn: Callable[[Any, Any], Any], initial):
+        self.fn = fn
+        self.initial = initial
+
+    def start(self, value):
+        return self.fn(self.initial, value)
+
+    def add(self, state, value):
+        return self.fn(state, value)
+
+    def empty(self):
+        return self.initial
+
+    def __repr__(self):
+        return f'Fold({self.fn!r}, {self.initial!r})'
+
+ACCUMULATORS: dict[str, type[Accumulator]] = {
+    accumulator.name: accumulator
+    for accumulator in (Count, Sum, Min, Max, Mean, Var, First, Last, AnyTrue, AllTrue, List)
+}
+
+def accumulator(agg: str | Accumulator) -> Accumulator:
+    '''Returns the accumulator for `agg`, the name of a built-in accumulator or an `Accumulator`.'''
+    if isinstance(agg, Accumulator):
+        return agg
+    if agg not in ACCUMULATORS:
+        raise ValueError(f"Unknown aggregation {agg!r}; expected one of {', '.join(ACCUMULATORS)} or an Accumulator.")
+    return ACCUMULATORS[agg]()
+
+#*******************#
+#* Multi-aggregate *#
+#*******************#
+
+@functools.cache
+def _compile(inlines: tuple[tuple[str, tuple[str, ...]], ...]):
+    '''Generates a function that feeds every item to a run of accumulators with the given `inline` updates and `bindings`, in one loop, and returns their states, or `None` if there are no items. Accumulators are passed as arguments, so the result can be reused by every run with the same shape.'''
+    n = len(inlines)
+    params = ''.join(f', acc{i}' for i in range(n))
+    body = [
+        line
+        for i, (inline, bindings) in enumerate(inlines)
+        for line in inline.format(s=f's{i}', add=f'add{i}', acc=f'acc{i}', **{name: f'{name}{i}' for name in bindings}).splitlines()
+    ]
+    source = '\n'.join([
+        f'def run(iterator{params}):',
+        *(f'    add{i} = acc{i}.add' for i in range(n)),
+        *(f'    {name}{i} = acc{i}.{name}' for i, (_, bindings) in enumerate(inlines) for name in bindings),
+        '    for x in iterator:',
+        *(f'        s{i} = acc{i}.start(x)' for i in range(n)),
+        '        break',
+        '    else:',
+        '        return None',
+        '    for x in iterator:',
+        *(' ' * 8 + line for line in body),
+        '        pass',
+        f'    return [{", ".join(f"s{i}" for i in range(n))}]',
+    ])
+    namespace = {}
+    exec(compile(source, f'<aggregate {n} accumulators>', 'exec'), namespace)
+    return namespace['run']
+
+def _inline(acc: Accumulator) -> tuple[str, tuple[str, ...]]:
+    '''The `inline` update of `acc` and its `bindings`, unless a subclass of the class that defined it overrides `add`, in which case `add` is called.'''
+    cls = type(acc)
+    owner = next(base for base in cls.__mro__ if 'inline' in vars(base))
+    return (acc.inline, acc.bindings) if cls.add is owner.add else (Accumulator.inline, ())
+
+def aggregate(iterator: Iterator, aggs: dict[str, str | Accumulator]) -> dict[str, Any]:
+    '''Feeds each item of `iterator` to every accumulator of `aggs` in a single pass and returns their results by name. See `Iter.aggregate`.'''
+    accumulators = {name: accumulator(agg) for name, agg in aggs.items()}
+    run = _compile(tuple(map(_inline, accumulators.values())))
+    states = run(iter(iterator), *accumulators.values())
+    if states is None:
+        return {name: acc.empty() for name, acc in accumulators.items()}
+    return {name: acc.result(state) for (name, acc), state in zip(accumulators.items(), states)}
+
+#*********************#
+#* Group aggregation *#
+#*********************#
+
+class Partitions:
+    '''Items spilled by `group_aggregate`, as `(key, value)` pairs hash-partitioned to temporary files in `spill_dir`. Each partition holds every value of its keys, so partitions can be aggregated independently. Pairs are appended to `pending` and partitioned in bulk by `flush`, about `SPILL_BATCH` pairs per partition at a time.'''
+
+    def __init__(self, n: int, depth: int, spill_dir: str | None):
+        self.n = n
+        self.depth = depth
+        self.spill_dir = spill_dir
+        self.files = [None] * n
+        self.pending = []
+        self.flush_size = SPILL_BATCH * n
+
+    def flush(self):
+        n, depth = self.n, self.depth
+        batches = [[] for _ in range(n)]
+        for pair in self.pending:
+            batches[hash((depth, pair[0])) % n].append(pair)
+        self.pending = []
+        for i, batch in enumerate(batches):
+            if batch:
+                if self.files[i] is None:
+                    self.files[i] = tempfile.TemporaryFile(dir=self.spill_dir)
+                pickle.dump(batch, self.files[i], pickle.HIGHEST_PROTOCOL)
+
+    def read(self, i: int) -> Iterator[tuple]:
+        '''Yields the pairs of partition `i`, closing its file.'''
+        file = self.files[i]
+        if file is None:
+            return
+        self.files[i] = None
+        with file:
+            file.seek(0)
+            while True:
+                try:
+                    batch = pickle.load(file)
+                except EOFError:
+                    break
+                yield from batch
+
+def _aggregate(pairs: Iterable[tuple], acc: Accumulator, max_groups: float, spill_dir: str | None, depth: int = 0) -> Iterator[tuple]:
+    '''Aggregates `(key, value)` pairs in a hash table of at most `max_groups` groups. Once it is full, the values of keys not in it are spilled to `Partitions`, which are aggregated in turn after the groups in memory are yielded.'''
+    start, add = acc.start, acc.add
+    groups = {}
+    partitions = None
+    get = groups.get
+    for key, value in pairs:
+        state = get(key, _MISSING)
+        if state is not _MISSING:
+            groups[key] = add(state, value)
+        elif len(groups) < max_groups:
+            groups[key] = start(value)
+        else:
+            if partitions is None:
+                partitions = Partitions(PARTITIONS, depth, spill_dir)
+            partitions.pending.append((key, value))
+            if len(partitions.pending) >= partitions.flush_size:
+                partitions.flush()
+    if partitions is not None:
+        partitions.flush()
+    result = acc.result
+    for key, state in groups.items():
+        yield key, result(state)
+    groups.clear()
+    if partitions is not None:
+        if depth + 1 >= MAX_DEPTH:
+            max_groups = float('inf')
+        for i in range(partitions.n):
+            yield from _aggregate(partitions.read(i), acc, max_groups, spill_dir, depth + 1)
+
+def group_aggregate(iterator: Iterator, key: Callable, agg: str | Accumulator = 'list', value: Callable | None = None, max_groups_in_memory: int | None = None, spill_dir: str | None = None) -> Iterator[tuple]:
+    '''Yields `(key, result)` for each distinct key of the items, aggregating `value(item)` (the item itself if `value` is `None`) with `agg`. See `Iter.group_aggregate`.'''
+    if max_groups_in_memory is not None and max_groups_in_memory < 1:
+        raise ValueError("max_groups_in_memory must be at least 1.")
+    acc = accumulator(agg)
+    keyed, values = itertools.tee(iterator)
+    pairs = zip(map(key, keyed), values if value is None else map(value, values))
+    max_groups = float('inf') if max_groups_in_memory is None else max_groups_in_memory
+    return _aggregate(pairs, acc, max_groups, spill_dir)
@@ -0,0 +1,407 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Iterator
+import concurrent.futures
+import itertools
+import threading
+from typing import Any
+
+from .fusion import with_options
+from .pipe_iter import IMMUTABLE, MUTABLE, Iter
+
+async def _from_sync(iterable: Iterable):
+    for item in iterable:
+        yield item
+
+async def _from_blocking(iterator: Iterator, executor: concurrent.futures.Executor | None):
+    loop = asyncio.get_running_loop()
+    sentinel = object()
+    while True:
+        item = await loop.run_in_executor(executor, next, iterator, sentinel)
+        if item is sentinel:
+            return
+        yield item
+
+class AsyncIter:
+    '''An asynchronous counterpart of `Iter`, wrapping an async iterator. Lazy methods return `AsyncIter`s and consuming methods are coroutines. Functions passed to lazy methods are synchronous, except for `amap`, and are subject to the same star/doublestar/fallible settings as in `Iter`.'''
+    __slots__ = ('iterator', '_settings')
+
+    def __init__(self, iterable: AsyncIterable | Iterable, and_mut: bool = False) -> None:
+        '''Creates an `AsyncIter` from an async iterable. A synchronous iterable is iterated directly on the event loop, so it should not block; use `Iter.to_async` for blocking sources. If `and_mut` is `True`, lazy methods return the original object.'''
+        if isinstance(iterable, AsyncIterable):
+            self.iterator = aiter(iterable)
+        else:
+            self.iterator = _from_sync(iterable)
+        self._settings = MUTABLE if and_mut else IMMUTABLE
+
+    def _update(self, iterator: AsyncIterator):
+        '''Updates the iterator.'''
+        self.iterator = iterator
+        return self
+
+    #************************#
+    #* Construction methods *#
+    #************************#
+
+    @classmethod
+    def from_blocking(cls, iterable: Iterable, executor: concurrent.futures.Executor | None = None, and_mut: bool = False):
+        '''Creates an `AsyncIter` that pulls each item of `iterable` in `executor` (the loop's default executor if `None`), so that a blocking source does not block the event loop.'''
+        return cls(_from_blocking(iter(iterable), executor), and_mut=and_mut)
+
+    def mirror(self):
+        '''Returns a new `AsyncIter` that shares the same underlying iterator.'''
+        return AsyncIter(self.iterator).copy_settings(self)
+
+    def to_sync(self) -> Iter:
+        '''Returns an `Iter` over the items of this `AsyncIter`. The async iterator is driven by an event loop in a background thread, which is stopped when the `Iter` is exhausted or closed. If it is closed early, the async iterator is closed on that loop first, so that its `finally` blocks run. Settings are preserved.'''
+        iterator = self.iterator
+        def items():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, daemon=True)
+            thread.start()
+            try:
+                while True:
+                    try:
+                        yield asyncio.run_coroutine_threadsafe(anext(iterator), loop).result()
+                    except StopAsyncIteration:
+                        return
+            finally:
+                try:
+                    aclose = getattr(iterator, 'aclose', None)
+                    if aclose is not None:
+                        asyncio.run_coroutine_threadsafe(aclose(), loop).result()
+                finally:
+                    loop.call_soon_threadsafe(loop.stop)
+                    thread.join()
+                    loop.close()
+        new_iter = Iter(items())
+        new_iter._settings = self._settings
+        return new_iter
+
+    #*****************#
+    #* Magic methods *#
+    #*****************#
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await anext(self.iterator)
+
+    #********************#
+    #* Settings methods *#
+    #********************#
+
+    def copy_settings(self, other_iter):
+        '''Copies the settings of another `AsyncIter` or `Iter` object.'''
+        if not isinstance(other_iter, (AsyncIter, Iter)):
+            raise TypeError("Argument must be an AsyncIter or Iter object.")
+        self._settings = other_iter._settings
+        return self
+
+    def doublestar(self):
+        '''Subsequent functions added to the evaluation chain will receive keyword arguments. Overrides `star`.'''
+        self._settings = self._settings._replace(stars=2)
+        return self
+
+    def fallible(self, fail_value=None):
+        '''Subsequent functions added to the evaluation chain will return `fail_value` (default `None`) instead of raising.'''
+        self._settings = self._settings._replace(fallible=True, fail_value=fail_value)
+        return self
+
+    def star(self):
+        '''Subsequent functions added to the evaluation chain will receive unpacked arguments. Overrides `doublestar`.'''
+        self._settings = self._settings._replace(stars=1)
+        return self
+
+    def unset_fallible(self):
+        '''Any errors raised by subsequent functions in the evaluation chain will be propagated.'''
+        self._settings = self._settings._replace(fallible=False)
+        return self
+
+    def unset_stars(self):
+        '''Subsequent functions added to the evaluation chain will receive single arguments.'''
+        self._settings = self._settings._replace(stars=0)
+        return self
+
+    def _mutating(self):
+        if self._settings.mutable:
+            return self
+        else:
+            return self.mirror()
+
+    def func_options(self, fn: Callable):
+        settings = self._settings
+        return with_options(fn, settings.stars, settings.fallible, settings.fail_value)
+
+    def coro_options(self, fn: Callable[..., Awaitable]):
+        '''Like `func_options`, for a coroutine function: errors raised while awaiting are caught if fallible.'''
+        inner = with_options(fn, self._settings.stars)
+        if not self._settings.fallible:
+            return inner
+        fail_value = self._settings.fail_value
+        async def fallible_coro(arg):
+            try:
+                return await inner(arg)
+            except Exception:
+                return fail_value
+        return fallible_coro
+
+    #****************#
+    #* Lazy methods *#
+    #****************#
+
+    def amap(self, fn: Callable[..., Awaitable], concurrency: int = 1, ordered: bool = True):
+        '''Maps a coroutine function onto each element, running up to `concurrency` coroutines at once. No more than `concurrency` items are pulled ahead of the consumer. If `ordered` is `False`, results are yielded as they complete.'''
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        wrapped = self.coro_options(fn)
+        async def amap_generator(iterator):
+            pending = deque() if ordered else set()
+            try:
+                async for item in iterator:
+                    if len(pending) >= concurrency:
+                        if ordered:
+                            yield await pending.popleft()
+                        else:
+                            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                            for task in done:
+                                yield task.result()
+                    task = asyncio.ensure_future(wrapped(item))
+                    if ordered:
+                        pending.append(task)
+                    else:
+                        pending.add(task)
+                if ordered:
+                    while pending:
+                        yield await pending.popleft()
+                else:
+                    while pending:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            yield task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+        return self._mutating()._update(amap_generator(self.iterator))
+
+    def batched(self, n: int, *, fillvalue=...):
+        '''Yields tuples of `n` elements at a time. If `fillvalue` is specified, the last batch will be filled with it if necessary, otherwise the last batch batch might be smaller than `n`.'''
+        if n < 1:
+            raise ValueError("n must be at least 1.")
+        async def batch_generator(iterator):
+            batch = []
+            async for item in iterator:
+                batch.append(item)
+                if len(batch) == n:
+                    yield tuple(batch)
+                    batch = []
+            if batch:
+                if fillvalue is not ...:
+                    batch.extend(itertools.repeat(fillvalue, n - len(batch)))
+                yield tuple(batch)
+        return self._mutating()._update(batch_generator(self.iterator))
+
+    def chain(self, *iterables: AsyncIterable | Iterable):
+        '''Appends one or more other iterables, synchronous or asynchronous, to the iterator.'''
+        async def chain_generator(iterator):
+            async for item in iterator:
+                yield item
+            for iterable in iterables:
+                async for item in AsyncIter(iterable):
+                    yield item
+        return self._mutating()._update(chain_generator(self.iterator))
+
+    def dropwhile(self, predicate: Callable[[Any], bool]):
+        '''Drops elements from the iterator while `predicate` is `True`.'''
+        wrapped = self.func_options(predicate)
+        async def dropwhile_generator(iterator):
+            async for item in iterator:
+                if not wrapped(item):
+                    yield item
+                    break
+            async for item in iterator:
+                yield item
+        return self._mutating()._update(dropwhile_generator(self.iterator))
+
+    def enumerate(self, start=0):
+        '''Enumerates the iterator, starting with `start`.'''
+        async def enumerate_generator(iterator):
+            i = start
+            async for item in iterator:
+                yield i, item
+                i += 1
+        return self._mutating()._update(enumerate_generator(self.iterator))
+
+    def filter(self, fn: Callable | None):
+        '''Returns an `AsyncIter` of elements for which `fn` is (evaluated as) `True`. If `fn` is `None`, filters out `False`-like values.'''
+        wrapped = bool if fn is None else self.func_options(fn)
+        async def filter_generator(iterator):
+            async for item in iterator:
+                if wrapped(item):
+                    yield item
+        return self._mutating()._update(filter_generator(self.iterator))
+
+    def filterfalse(self, fn: Callable | None):
+        '''Inverse of `filter`.'''
+        wrapped = bool if fn is None else self.func_options(fn)
+        async def filterfalse_generator(iterator):
+            async for item in iterator:
+                if not wrapped(item):
+                    yield item
+        return self._mutating()._update(filterfalse_generator(self.iterator))
+
+    def filter_map(self, fn: Callable):
+        '''Applies a function to each element, and filters out `None` results.'''
+        return self.map(fn).somevalue()
+
+    def flatten(self):
+        '''Reduces one level of nesting. Items may be synchronous or asynchronous iterables.'''
+        async def flatten_generator(iterator):
+            async for iterable in iterator:
+                async for item in AsyncIter(iterable):
+                    yield item
+        return self._mutating()._update(flatten_generator(self.iterator))
+
+    def inspect(self, fn: Callable[[Any], Any]):
+        '''Does something with each element of an iterator, passing the **original** value on.'''
+        wrapped = self.func_options(fn)
+        async def inspect_generator(iterator):
+            async for item in iterator:
+                wrapped(item)
+                yield item
+        return self._mutating()._update(inspect_generator(self.iterator))
+
+    def islice(self, *args):
+        '''Slices the iterator, with the same arguments as `itertools.islice`.'''
+        match args:
+            case (stop,):
+                start, stop, step = 0, stop, 1
+            case (start, stop):
+                step = 1
+            case (start, stop, step):
+                pass
+            case _:
+                raise TypeError(f"Invalid arguments {args}")
+        start = start or 0
+        step = step or 1
+        if start < 0 or (stop is not None and stop < 0) or step < 1:
+            raise ValueError("Indices for islice() must be None or non-negative integers, and step must be positive.")
+        async def islice_generator(iterator):
+            if stop is not None and stop <= start:
+                return
+            i = 0
+            wanted = start
+            async for item in iterator:
+                if i == wanted:
+                    yield item
+                    wanted += step
+                    if stop is not None and wanted >= stop:
+                        return
+                i += 1
+        return self._mutating()._update(islice_generator(self.iterator))
+
+    def map(self, fn: Callable[[Any], Any]):
+        '''Maps `fn` onto each element of the iterator. For coroutine functions, use `amap`.'''
+        wrapped = self.func_options(fn)
+        async def map_generator(iterator):
+            async for item in iterator:
+                yield wrapped(item)
+        return self._mutating()._update(map_generator(self.iterator))
+
+    def skip(self, n: int):
+        '''Skips the first `n` items of the iterator.'''
+        return self.islice(n, None)
+
+    def somevalue(self):
+        '''Filters out `None` values.'''
+        async def somevalue_generator(iterator):
+            async for item in iterator:
+                if item is not None:
+                    yield item
+        return self._mutating()._update(somevalue_generator(self.iterator))
+
+    def take(self, n: int):
+        '''Returns the first `n` items of the iterator.'''
+        return self.islice(n)
+
+    def takewhile(self, predicate: Callable[[Any], bool]):
+        '''Returns items from the iterator while `predicate` is `True`.'''
+        wrapped = self.func_options(predicate)
+        async def takewhile_generator(iterator):
+            async for item in iterator:
+                if not wrapped(item):
+                    return
+                yield item
+        return self._mutating()._update(takewhile_generator(self.iterator))
+
+    #*********************#
+    #* Consuming methods *#
+    #*********************#
+
+    async def all(self):
+        '''Returns `True` if all items in the iterator evaluate to `True`.'''
+        async for item in self.iterator:
+            if not item:
+                return False
+        return True
+
+    async def any(self):
+        '''Returns `True` if any items in the iterator evaluate to `True`.'''
+        async for item in self.iterator:
+            if item:
+                return True
+        return False
+
+    async def collect(self, fn: Callable[[Iterable], Any]):
+        '''Gathers the items and calls `fn`, a function that accepts and consumes an iterable, on them.'''
+        return fn([item async for item in self.iterator])
+
+    async def count_if(self, predicate: Callable[[Any], bool]):
+        '''Counts the number of items in the iterator for which `predicate` is `True`.'''
+        return await self.filter(predicate).fold(lambda x, _: x + 1, 0)
+
+    async def find(self, predicate: Callable[[Any], bool]):
+        '''Consumes the iterator up to the first item for which `predicate` is `True`, and returns the item, or `None` if there is none.'''
+        return await self.mirror().filter(predicate).next(default=None)
+
+    async def fold(self, fn: Callable[[Any, Any], Any], initial):
+        '''Reduces the iterator to a single value by applying `fn` to each item and the previous result, beginning with `initial`.'''
+        acc = initial
+        async for item in self.iterator:
+            acc = fn(acc, item)
+        return acc
+
+    async def for_each(self, fn: Callable[[Any], Any]) -> None:
+        '''Eagerly calls `fn` on each item of iterator.'''
+        wrapped = self.func_options(fn)
+        async for item in self.iterator:
+            wrapped(item)
+
+    async def next(self, default: Any = ...):
+        '''Returns the next item in the iterator. If `default` is provided, it is returned if the iterator is exhausted. Otherwise, `StopAsyncIteration` is raised.'''
+        if default is ...:
+            return await anext(self.iterator)
+        else:
+            return await anext(self.iterator, default)
+
+    async def nth(self, n: int):
+        '''Returns the `n`th item in the iterator. If the iterator is exhausted before reaching `n`, returns `None`.'''
+        if n < 1:
+            raise ValueError("n must be at least 1.")
+        item = None
+        for _ in range(n):
+            try:
+                item = await anext(self.iterator)
+            except StopAsyncIteration:
+                return None
+        return item
+
+    async def reduce(self, fn: Callable[[Any, Any], Any], initial: Any = ...):
+        '''Reduces the iterator to a single value by applying `fn` to each item and the previous result. If `initial` is provided, it is used as the initial value.'''
+        if initial is ...:
+            try:
+                initial = await anext(self.iterator)
+            except StopAsyncIteration:
+                raise TypeError("reduce() of empty iterable with no initial value") from None
+        return await self.fold(fn, initial)
@@ -0,0 +1,66 @@
+from collections import deque
+import pickle
+import tempfile
+from typing import Any
+
+OVERFLOW_POLICIES = ('block', 'raise', 'spill')
+
+class BufferOverflowError(RuntimeError):
+    '''Raised when a bounded buffer is full and its overflow policy is `'raise'`.'''
+
+def check_policy(on_overflow: str, allowed: tuple[str, ...] = OVERFLOW_POLICIES):
+    '''Raises `ValueError` if `on_overflow` is not one of `allowed`.'''
+    if on_overflow not in allowed:
+        raise ValueError(f"on_overflow must be one of {', '.join(map(repr, allowed))}, not {on_overflow!r}.")
+
+class SpillQueue:
+    '''A FIFO queue that keeps up to `max_memory_items` items in memory and pickles the rest to a temporary file in `spill_dir`. Supports the subset of the `deque` interface used for buffers: `append`, `popleft`, `len` and truthiness.'''
+
+    def __init__(self, max_memory_items: int, spill_dir: str | None = None):
+        self.max_memory_items = max_memory_items
+        self.spill_dir = spill_dir
+        self.memory = deque()
+        self.file = None
+        self.read_pos = 0
+        self.write_pos = 0
+        self.spilled = 0
+
+    def __len__(self):
+        return len(self.memory) + self.spilled
+
+    def __bool__(self):
+        return bool(self.memory) or self.spilled > 0
+
+    def append(self, item: Any):
+        if not self.spilled and len(self.memory) < self.max_memory_items:
+            self.memory.append(item)
+            return
+        if self.file is None:
+            self.file = tempfile.TemporaryFile(dir=self.spill_dir)
+        self.file.seek(self.write_pos)
+        pickle.dump(item, self.file, pickle.HIGHEST_PROTOCOL)
+        self.write_pos = self.file.tell()
+        self.spilled += 1
+
+    def popleft(self):
+        if self.memory:
+            return self.memory.popleft()
+        if not self.spilled:
+            raise IndexError("pop from an empty SpillQueue")
+        self.file.seek(self.read_pos)
+        item = pickle.load(self.file)
+        self.read_pos = self.file.tell()
+        self.spilled -= 1
+        if not self.spilled:
+            self.file.seek(0)
+            self.file.truncate()
+            self.read_pos = self.write_pos = 0
+        return item
+
+    def close(self):
+        '''Discards the spilled items and deletes the temporary file.'''
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.spilled = 0
+        self.read_pos = self.write_pos = 0
@@ -0,0 +1,131 @@
+from collections.abc import Iterator
+import itertools
+import pickle
+import tempfile
+import threading
+
+from .pipe_iter import Iter
+
+SPILL_BATCH = 1024
+_END = object()
+
+class Cache:
+    '''A replayable source: records the items of an iterator as they are first pulled, so that any number of later iterations replay them without running the upstream stages again. Up to `max_items` items (all of them if `None`) are kept in memory; later items are pickled to a temporary file in `spill_dir`, `spill_batch` items per `pickle.dump`. Iterations may overlap, including from different threads: whichever is ahead pulls the next item from the source. Iterations over a complete cache replay at C speed from memory.'''
+
+    def __init__(self, iterator: Iterator, max_items: int | None = None, spill_dir: str | None = None, spill_batch: int = SPILL_BATCH, settings_from: Iter | None = None):
+        if max_items is not None and max_items < 0:
+            raise ValueError("max_items must not be negative.")
+        if spill_batch < 1:
+            raise ValueError("spill_batch must be at least 1.")
+        self.iterator = iterator
+        self.max_items = max_items
+        self.spill_dir = spill_dir
+        self.spill_batch = spill_batch
+        self.settings_from = settings_from
+        self.lock = threading.Lock()
+        self.memory = []
+        self.segments: list[int] = []
+        self.pending = []
+        self.file = None
+        self.count = 0
+        self.complete = False
+
+    def __len__(self):
+        '''The number of items cached so far.'''
+        return self.count
+
+    def __iter__(self) -> Iterator:
+        if self.complete:
+            return itertools.chain(self.memory, self._segment_items(), self.pending)
+        return self._replay()
+
+    def iter(self) -> Iter:
+        '''Returns a new `Iter` replaying the cache from the start, with the settings of the `Iter` it was created from.'''
+        new_iter = Iter(iter(self))
+        if self.settings_from is not None:
+            new_iter.copy_settings(self.settings_from)
+        return new_iter
+
+    def close(self):
+        '''Deletes the spill file. The cache cannot be replayed afterwards.'''
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.memory = []
+            self.pending = []
+            self.segments = []
+            self.count = 0
+            self.complete = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _store(self, item):
+        '''Appends a newly pulled item. Called with the lock held.'''
+        if not self.segments and not self.pending and (self.max_items is None or len(self.memory) < self.max_items):
+            self.memory.append(item)
+        else:
+            self.pending.append(item)
+            if len(self.pending) >= self.spill_batch:
+                if self.file is None:
+                    self.file = tempfile.TemporaryFile(dir=self.spill_dir)
+                self.file.seek(0, 2)
+                self.segments.append(self.file.tell())
+                pickle.dump(self.pending, self.file, pickle.HIGHEST_PROTOCOL)
+                self.pending = []
+        self.count += 1
+
+    def _load(self, segment: int) -> list:
+        with self.lock:
+            self.file.seek(self.segments[segment])
+            return pickle.load(self.file)
+
+    def _segment_items(self) -> Iterator:
+        return itertools.chain.from_iterable(map(self._load, range(len(self.segments))))
+
+    def _replay(self) -> Iterator:
+        '''Replays the cached items and then extends the cache from the source, for iterations started before the cache was complete. At the end of the cache, items are pulled and yielded one at a time until another iteration moves the end. `self.memory` is looked up under the lock each time, as `close` replaces it.'''
+        lock = self.lock
+        iterator = self.iterator
+        store = self._store
+        memory_limit = float('inf') if self.max_items is None else self.max_items
+        i = 0
+        while True:
+            in_memory = len(self.memory)
+            if i < in_memory:
+                chunk = self.memory[i:in_memory]
+            elif i < in_memory + len(self.segments) * self.spill_batch:
+                segment, offset = divmod(i - in_memory, self.spill_batch)
+                chunk = self._load(segment)[offset:]
+            else:
+                with lock:
+                    pending_start = len(self.memory) + len(self.segments) * self.spill_batch
+                    if i < pending_start:
+                        continue
+                    if i < self.count:
+                        chunk = self.pending[i - pending_start:]
+                    elif self.complete:
+                        return
+                    else:
+                        chunk = ()
+                while not chunk:
+                    with lock:
+                        if self.count != i or self.complete:
+                            break
+                        item = next(iterator, _END)
+                        if item is _END:
+                            self.complete = True
+                            return
+                        if i < memory_limit:
+                            self.memory.append(item)
+                            self.count = i = i + 1
+                        else:
+                            store(item)
+                            i += 1
+                    yield item
+            i += len(chunk)
+            yield from chunk
@@ -0,0 +1,228 @@
+from collections.abc import Callable, Iterable, Iterator
+import contextlib
+import csv
+import functools
+import io
+import itertools
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+from typing import Any, NamedTuple
+
+from .parallel import chunked
+
+BLOCK_SIZE = 1 << 16
+
+def _line_blocks_mmap(mm: mmap.mmap, start: int, stop: int, block_size: int) -> Iterator[bytes]:
+    '''Yields blocks of whole lines from `mm`, covering the lines that start in `[start, stop)`. Block boundaries are found in the map itself, so each block is copied exactly once.'''
+    size = len(mm)
+    pos = start
+    while pos < stop:
+        newline = mm.find(b'\n', min(pos + block_size, stop) - 1)
+        block_end = size if newline == -1 else newline + 1
+        yield mm[pos:block_end]
+        pos = block_end
+
+def _line_blocks_buffered(file, start: int, stop: int, block_size: int) -> Iterator[bytes]:
+    '''Yields blocks of whole lines from `file`, covering the lines that start in `[start, stop)`, with `read` calls of up to `block_size` bytes.'''
+    file.seek(start)
+    pos = start
+    tail = b''
+    while True:
+        data = file.read(min(block_size, stop - pos)) if pos < stop else b''
+        if not data:
+            if tail:
+                yield tail + file.readline()
+            return
+        pos += len(data)
+        if tail:
+            data = tail + data
+        cut = data.rfind(b'\n') + 1
+        if cut:
+            yield data[:cut]
+        tail = data[cut:]
+
+def _split_block(block: bytes, encoding: str | None, errors: str) -> list:
+    '''Splits a block of whole lines, decoding it first if `encoding` is given. `\\r\\n` line ends are replaced first, which costs one scan of the block when it holds no `\\r`.'''
+    if encoding is None:
+        if b'\r' in block:
+            block = block.replace(b'\r\n', b'\n')
+        lines = block.split(b'\n')
+    else:
+        text = block.decode(encoding, errors)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n')
+        lines = text.split('\n')
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+def _first_line_start(file, offset: int) -> int:
+    '''Returns the position of the first line that starts at or after `offset`.'''
+    if offset <= 0:
+        return 0
+    file.seek(offset - 1)
+    if file.read(1) != b'\n':
+        file.readline()
+    return file.tell()
+
+def read_lines(path: str | os.PathLike, encoding: str | None = None, errors: str = 'strict', use_mmap: bool = True, offset: int = 0, end: int | None = None, batched: bool = False, block_size: int = BLOCK_SIZE) -> Iterator:
+    '''Yields the lines of the file at `path`, without their trailing `\\n` or `\\r\\n` (a lone `\\r` is kept). The file is read in blocks of about `block_size` bytes (through a memory map if `use_mmap`, else with buffered reads) and each block is split in one call, so the per-line cost is spread over the block. Lines are `bytes` unless `encoding` is given, in which case each block is decoded as a whole as it is read (the encoding must be ASCII-compatible). If `batched` is `True`, the lines of each block are yielded as a list. Only lines starting in the byte range `[offset, end)` are read, so that `offset`/`end` pairs covering a file split it into shards without splitting any line. The file is opened when iteration starts and closed when it ends.'''
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1.")
+    def blocks():
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            stop = size if end is None else min(end, size)
+            start = _first_line_start(file, offset)
+            if use_mmap and size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    yield from _line_blocks_mmap(mm, start, stop, block_size)
+            else:
+                yield from _line_blocks_buffered(file, start, stop, block_size)
+    line_lists = map(functools.partial(_split_block, encoding=encoding, errors=errors), blocks())
+    return line_lists if batched else itertools.chain.from_iterable(line_lists)
+
+def read_chunks(path: str | os.PathLike, size: int, offset: int = 0, end: int | None = None) -> Iterator[bytes]:
+    '''Yields the bytes of the file at `path` in the range `[offset, end)`, in chunks of `size` bytes (the last one may be shorter).'''
+    if size < 1:
+        raise ValueError("size must be at least 1.")
+    def chunks():
+        with open(path, 'rb') as file:
+            file.seek(offset)
+            if end is None:
+                yield from iter(functools.partial(file.read, size), b'')
+                return
+            remaining = end - offset
+            while remaining > 0:
+                chunk = file.read(min(size, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+    return chunks()
+
+def read_records(path: str | os.PathLike, struct_fmt: str | struct.Struct, offset: int = 0, end: int | None = None, batched: bool = False, block_size: int = BLOCK_SIZE) -> Iterator:
+    '''Yields the fixed-size records of the file at `path` as tuples, unpacked with `struct_fmt` a block at a time with `Struct.iter_unpack`. If `batched` is `True`, the records of each block are yielded as a list. Only records starting in the byte range `[offset, end)` are read, with `offset` rounded up to a record boundary, so that a file can be split into shards. A trailing partial record raises `struct.error`.'''
+    record = struct_fmt if isinstance(struct_fmt, struct.Struct) else struct.Struct(struct_fmt)
+    records_per_block = max(1, block_size // record.size)
+    def blocks():
+        first = -(-offset // record.size)
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            stop = size if end is None else min(size, -(-end // record.size) * record.size)
+            file.seek(first * record.size)
+            remaining = stop - first * record.size
+            while remaining > 0:
+                block = file.read(min(records_per_block * record.size, remaining))
+                if not block:
+                    return
+                remaining -= len(block)
+                yield block
+    unpacked = map(record.iter_unpack, blocks())
+    return map(list, unpacked) if batched else itertools.chain.from_iterable(unpacked)
+
+#***********#
+#* Writers *#
+#***********#
+
+FLUSH_SIZE = 1 << 16
+BATCH_ITEMS = 1024
+
+class Written(NamedTuple):
+    '''The number of items consumed and bytes written by a sink.'''
+    items: int
+    bytes: int
+
+def _coalesce(pieces: Iterator[bytes], flush_size: int) -> Iterator[bytes]:
+    '''Joins `pieces` into chunks of at least `flush_size` bytes (except the last one).'''
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= flush_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+def _write_all(write: Callable[[bytes], Any], chunks: Iterator[bytes]) -> int:
+    total = 0
+    for chunk in chunks:
+        write(chunk)
+        total += len(chunk)
+    return total
+
+def _write_background(write: Callable[[bytes], Any], chunks: Iterator[bytes]) -> int:
+    '''Writes `chunks` from a separate thread, so that producing (and encoding) the next chunks overlaps with I/O. At most two chunks are queued. An exception raised by `write` stops the producer and is re-raised.'''
+    pending = queue.Queue(maxsize=2)
+    errors = []
+    def writer():
+        while (chunk := pending.get()) is not None:
+            if not errors:
+                try:
+                    write(chunk)
+                except BaseException as e:
+                    errors.append(e)
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    total = 0
+    try:
+        for chunk in chunks:
+            if errors:
+                break
+            pending.put(chunk)
+            total += len(chunk)
+    finally:
+        pending.put(None)
+        thread.join()
+    if errors:
+        raise errors[0]
+    return total
+
+def write_encoded(target, items: Iterable, encode_batch: Callable[[list], bytes], header: bytes = b'', flush_size: int = FLUSH_SIZE, background: bool = False, append: bool = False) -> Written:
+    '''Writes `items` to `target` (a path, or a binary file object, which is left open), encoding them `BATCH_ITEMS` at a time with `encode_batch` and writing the results in chunks of about `flush_size` bytes, preceded by `header`.'''
+    if flush_size < 1:
+        raise ValueError("flush_size must be at least 1.")
+    count = 0
+    def pieces():
+        nonlocal count
+        if header:
+            yield header
+        for batch in chunked(iter(items), BATCH_ITEMS):
+            count += len(batch)
+            yield encode_batch(batch)
+    if hasattr(target, 'write'):
+        context = contextlib.nullcontext(target)
+    else:
+        context = open(target, 'ab' if append else 'wb')
+    with context as file:
+        write = _write_background if background else _write_all
+        total = write(file.write, _coalesce(pieces(), flush_size))
+    return Written(count, total)
+
+def line_encoder(encoding: str = 'utf-8', errors: str = 'strict', newline: str = '\n') -> Callable[[list], bytes]:
+    '''Returns a batch encoder for `str` lines, each followed by `newline`.'''
+    def encode_batch(batch):
+        return (newline.join(batch) + newline).encode(encoding, errors)
+    return encode_batch
+
+def jsonl_encoder(**json_options) -> Callable[[list], bytes]:
+    '''Returns a batch encoder for JSON Lines. A single `JSONEncoder` (using the C encoder where possible) is built for all items.'''
+    encode = json.JSONEncoder(**json_options).encode
+    def encode_batch(batch):
+        return ('\n'.join(map(encode, batch)) + '\n').encode('utf-8')
+    return encode_batch
+
+def csv_encoder(encoding: str = 'utf-8', dialect: str | csv.Dialect = 'excel', **fmtparams) -> Callable[[list], bytes]:
+    '''Returns a batch encoder for CSV rows, each batch written with a single `csv.writer.writerows` call.'''
+    def encode_batch(batch):
+        buffer = io.StringIO()
+        csv.writer(buffer, dialect, **fmtparams).writerows(batch)
+        return buffer.getvalue().encode(encoding)
+    return encode_batch
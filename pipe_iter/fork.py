@@ -1,67 +1,134 @@
 from collections import deque
+from collections.abc import Callable, Iterator
+import threading
+
+from .buffer import BufferOverflowError, SpillQueue, check_policy
 from .pipe_iter import Iter
 
+class Router:
+    '''Routes the items of a shared iterator to a set of `Fork`s. Predicates are wrapped once, when the forks are created, and each item is routed with a single pass over them. Thread-safe: forks may be consumed from different threads.'''
+
+    def __init__(self, iterator: Iterator, predicates: list[Callable], first_only: bool, max_buffer: int | None, on_overflow: str, spill_dir: str | None = None):
+        check_policy(on_overflow)
+        if max_buffer is not None and max_buffer < 1:
+            raise ValueError("max_buffer must be at least 1.")
+        self.iterator = iterator
+        self.first_only = first_only
+        self.max_buffer = max_buffer
+        self.blocking = max_buffer is not None and on_overflow == 'block'
+        self.raising = max_buffer is not None and on_overflow == 'raise'
+        self.pending = None
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.routing = False
+        self.exhausted = False
+        self.forks: list[Fork] = []
+        self.rules = []
+        for predicate in predicates:
+            if max_buffer is not None and on_overflow == 'spill':
+                buffer = SpillQueue(max_buffer, spill_dir)
+            else:
+                buffer = deque()
+            fork = Fork(self, buffer)
+            if self.blocking:
+                push = self._push_or_block(buffer)
+            else:
+                push = buffer.append
+            self.forks.append(fork)
+            self.rules.append((predicate, fork, push))
+
+    def _push_or_block(self, buffer):
+        max_buffer = self.max_buffer
+        condition = self.condition
+        def push(item):
+            while len(buffer) >= max_buffer:
+                condition.wait()
+            buffer.append(item)
+        return push
+
+    def _targets(self, item) -> list[tuple['Fork', Callable]]:
+        '''The forks that `item` is routed to, with the functions pushing to their buffers.'''
+        targets = []
+        for predicate, target, push in self.rules:
+            if predicate(item):
+                targets.append((target, push))
+                if self.first_only:
+                    break
+        return targets
+
+    def _deliver(self, item, targets: list[tuple['Fork', Callable]], fork: 'Fork') -> bool:
+        '''Pushes `item` to the buffers of `targets` other than `fork`, returning whether `fork` is one of them. If the overflow policy is `'raise'` and a buffer is full, no buffer is pushed to: the item is kept as `pending`, to be routed again by the next pull, and `BufferOverflowError` is raised.'''
+        if self.raising and any(target is not fork and len(target.buffer) >= self.max_buffer for target, _ in targets):
+            self.pending = item, targets
+            raise BufferOverflowError(f"Fork buffer exceeded max_buffer={self.max_buffer}.")
+        found = False
+        for target, push in targets:
+            if target is fork:
+                found = True
+            else:
+                push(item)
+        return found
+
+    def pull(self, fork: 'Fork'):
+        '''Returns the next item for `fork`, routing items from the shared iterator to the other forks' buffers until one is found.'''
+        buffer = fork.buffer
+        with self.lock:
+            while True:
+                if buffer:
+                    item = buffer.popleft()
+                    if self.blocking:
+                        self.condition.notify_all()
+                    return item
+                if self.exhausted:
+                    raise StopIteration
+                if self.routing:
+                    self.condition.wait()
+                    continue
+                if self.pending is not None:
+                    item, targets = self.pending
+                    self.pending = None
+                else:
+                    try:
+                        item = next(self.iterator)
+                    except StopIteration:
+                        self.exhausted = True
+                        self.condition.notify_all()
+                        raise
+                    targets = None
+                self.routing = True
+                try:
+                    if targets is None:
+                        targets = self._targets(item)
+                    found = self._deliver(item, targets, fork)
+                finally:
+                    self.routing = False
+                    if self.blocking:
+                        self.condition.notify_all()
+                if found:
+                    return item
+
 class Fork:
     '''An Iterator that as part of a set shares an underlying iterator, dividing items among them according to defined rules.'''
 
     @classmethod
-    def fork(cls, iterator: Iter, *predicates):
-        forks: list[Fork] = []
-        rules = []
-        for predicate in predicates:
-            fork = Fork()
-            forks.append(fork)
-            rules.append((predicate, fork))
-        match iterator._stars:
-            case 0:
-                def forker(val):
-                    forks = Iter(rules) \
-                        .star() \
-                        .filter_map(lambda predicate, fork: fork if predicate(val) else None) \
-                        .collect(list)
-                    return val, forks
-            case 1:
-                def forker(*vals):
-                    forks = Iter(rules) \
-                        .star() \
-                        .filter_map(lambda predicate, fork: fork if predicate(*vals) else None) \
-                        .collect(list)
-                    return vals, forks
-            case 2:
-                def forker(**kwargs):
-                    forks = Iter(rules) \
-                        .star() \
-                        .filter_map(lambda predicate, fork: fork if predicate(**kwargs) else None) \
-                        .collect(list)
-                    return kwargs, forks
-            case _:
-                raise ValueError("Corrupted Iter: invalid _stars value")
-        return [fork.setup(iterator.mirror().map(forker)) for fork in forks]
-        
-    def __init__(self):
-        self.iterator: Iter = None
-        self.buffer = deque()
+    def fork(cls, iterator: Iter, *predicates: Callable[..., bool], first_only: bool = False, max_buffer: int | None = None, on_overflow: str = 'raise', spill_dir: str | None = None) -> list['Fork']:
+        '''Splits `iterator` into one `Fork` per predicate. Predicates are wrapped according to the settings of `iterator`. If `first_only` is `True`, an item is sent only to the first fork whose predicate is `True`; otherwise (the default) it is sent to every such fork. Items for forks other than the one being consumed are buffered. If `max_buffer` is set, a full buffer either raises `BufferOverflowError` (`on_overflow='raise'`, the default), spills further items to a temporary file in `spill_dir` (`'spill'`), or blocks until its fork is consumed from another thread (`'block'`); blocking is only for forks consumed by separate threads, as a single consumer would wait forever.'''
+        router = Router(
+            iterator.iterator,
+            [iterator.func_options(predicate) for predicate in predicates],
+            first_only,
+            max_buffer,
+            on_overflow,
+            spill_dir,
+        )
+        return router.forks
+
+    def __init__(self, router: Router, buffer: deque | SpillQueue):
+        self.router = router
+        self.buffer = buffer
 
-    def setup(self, iterator: Iter):
-        self.iterator = iterator
-        return self
-        
     def __iter__(self):
         return self
-    
+
     def __next__(self):
-        if self.iterator is None:
-            raise ValueError("Fork not properly initialized.")
-        found_one = False
-        next_val = None
-        if self.buffer:
-            return self.buffer.popleft()
-        while not found_one:
-            val, forks = next(self.iterator)
-            for fork in forks:
-                if fork is self:
-                    found_one = True
-                    next_val = val
-                else:
-                    fork.buffer.append(val)
-        return next_val
\ No newline at end of file
+        return self.router.pull(self)
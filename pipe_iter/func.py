@@ -3,9 +3,12 @@ from typing import Any
 
 def doublestar_func(fn: Callable[..., Any], convert=True):
     '''Wraps `fn` to unpack mapping arguments. With `convert=True`, the default, tries to convert the argument to a `dict` (e.g. collections of duples).'''
+    if not convert:
+        def new_fn(val: Mapping):
+            return fn(**val)
+        return new_fn
     def new_fn(val: Mapping | Iterable):
-        kwargs = dict(val) if convert else val
-        return fn(**kwargs)
+        return fn(**val) if type(val) is dict else fn(**dict(val))
     return new_fn
 
 def fallible_func(fn: Callable[[Any], Any], fail_value: Any | None = None):
@@ -19,6 +22,10 @@ def fallible_func(fn: Callable[[Any], Any], fail_value: Any | None = None):
 
 def star_func(fn: Callable[..., Any], strict=True):
     '''Wraps `fn` to unpack iterable single arguments. With `strict=True`, the default, follows behavior of `itertools.starmap` by raising `TypeError` if non-iterable arguments is passed. With `strict=False`, non-iterable arguments are passed as is.'''
+    if strict:
+        def new_fn(arg: Iterable):
+            return fn(*arg)
+        return new_fn
     def new_fn(arg: Iterable):
-        return fn(*arg) if strict or isinstance(arg, Iterable) else fn(arg)
+        return fn(*arg) if isinstance(arg, Iterable) else fn(arg)
     return new_fn
\ No newline at end of file
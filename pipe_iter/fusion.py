@@ -0,0 +1,132 @@
+from collections.abc import Callable, Iterator
+import functools
+import itertools
+from typing import Any, NamedTuple
+
+from .func import star_func, doublestar_func, fallible_func
+
+class Stage(NamedTuple):
+    '''A per-element stage recorded by an `Iter`, together with the settings in effect when it was added.'''
+    kind: str
+    fn: Callable | None = None
+    stars: int = 0
+    fallible: bool = False
+    fail_value: Any = None
+
+def with_options(fn: Callable, stars: int = 0, fallible: bool = False, fail_value: Any = None):
+    '''Wraps `fn` according to star/doublestar/fallible settings, as `Iter.func_options` does. Every combination is handled by at most one wrapper, built once.'''
+    match stars, fallible:
+        case 0, False:
+            return fn
+        case 0, True:
+            return fallible_func(fn, fail_value=fail_value)
+        case 1, False:
+            return star_func(fn)
+        case 1, True:
+            def star_fallible(arg):
+                try:
+                    return fn(*arg)
+                except Exception:
+                    return fail_value
+            return star_fallible
+        case 2, False:
+            return doublestar_func(fn)
+        case 2, True:
+            def doublestar_fallible(val):
+                try:
+                    return fn(**val) if type(val) is dict else fn(**dict(val))
+                except Exception:
+                    return fail_value
+            return doublestar_fallible
+        case _:
+            raise ValueError("Corrupted Iter: invalid _stars value")
+
+def _single(iterator: Iterator, stage: Stage) -> Iterator | None:
+    '''Builds a lone stage out of builtin iterators, which beat a generator when there is nothing to fuse, or returns `None` if that would take a Python wrapper around the function. Star-mode maps and filters that are not fallible use `itertools.starmap`, the filter as the selectors of `itertools.compress` over an `itertools.tee` of the items. Other stages that need a wrapper (fallible, doublestar, star `filterfalse` and `takewhile`, `inspect`) are better served by the compiled generator, which inlines the call.'''
+    if stage.fn is not None and (stage.fallible or stage.stars == 2) or stage.kind == 'inspect':
+        return None
+    if stage.stars == 1 and stage.fn is not None:
+        match stage.kind:
+            case 'map':
+                return itertools.starmap(stage.fn, iterator)
+            case 'filter':
+                items, args = itertools.tee(iterator)
+                return itertools.compress(items, itertools.starmap(stage.fn, args))
+            case _:
+                return None
+    match stage.kind:
+        case 'map':
+            return map(stage.fn, iterator)
+        case 'filter':
+            return filter(stage.fn, iterator)
+        case 'filterfalse':
+            return itertools.filterfalse(stage.fn, iterator)
+        case 'takewhile':
+            return itertools.takewhile(stage.fn, iterator)
+        case 'somevalue':
+            return filter(lambda x: x is not None, iterator)
+        case _:
+            raise ValueError(f"Stage {stage.kind!r} cannot be fused")
+
+def _stage_source(i: int, kind: str, stars: int, fallible: bool, has_fn: bool) -> list[str]:
+    '''Generates the loop body lines for stage `i`, operating on the current item `x`.'''
+    if kind == 'somevalue':
+        return ['if x is None:', '    continue']
+    if not has_fn:
+        call = 'x'
+    else:
+        call = (f'f{i}(x)', f'f{i}(*x)', f'(f{i}(**x) if type(x) is dict else f{i}(**dict(x)))')[stars]
+    result = 'x' if kind == 'map' else f'r{i}'
+    if fallible:
+        lines = ['try:', f'    {result} = {call}', 'except Exception:', f'    {result} = v{i}']
+    elif kind == 'map' or kind == 'inspect':
+        lines = [f'{result} = {call}' if kind == 'map' else call]
+    else:
+        lines = []
+        result = call
+    match kind:
+        case 'filter':
+            lines += [f'if not {result}:', '    continue']
+        case 'filterfalse':
+            lines += [f'if {result}:', '    continue']
+        case 'takewhile':
+            lines += [f'if not {result}:', '    return']
+    return lines
+
+@functools.cache
+def _compile(shape: tuple[tuple[str, int, bool, bool], ...]):
+    '''Generates a generator function for a run of stages with the given shape. Functions and fail values are passed as arguments, so the result can be reused by every run with the same shape.'''
+    params = ''.join(f', f{i}, v{i}' for i in range(len(shape)))
+    body = [
+        line
+        for i, stage_shape in enumerate(shape)
+        for line in _stage_source(i, *stage_shape)
+    ]
+    source = '\n'.join([
+        f'def fused(iterator{params}):',
+        '    for x in iterator:',
+        *(' ' * 8 + line for line in body),
+        '        yield x',
+    ])
+    namespace = {}
+    exec(compile(source, f'<fused {len(shape)} stages>', 'exec'), namespace)
+    return namespace['fused']
+
+def fuse(iterator: Iterator, stages: tuple[Stage, ...]) -> Iterator:
+    '''Compiles a run of fusable stages into a single iterator over `iterator`, so that each item passes through one generator frame regardless of the number of stages.'''
+    if not stages:
+        return iterator
+    if len(stages) == 1:
+        single = _single(iterator, stages[0])
+        if single is not None:
+            return single
+    fused = _compile(tuple(
+        (stage.kind, stage.stars, stage.fallible, stage.fn is not None)
+        for stage in stages
+    ))
+    args = [
+        arg
+        for stage in stages
+        for arg in (stage.fn, stage.fail_value)
+    ]
+    return fused(iterator, *args)
@@ -0,0 +1,114 @@
+from collections.abc import Callable, Iterable, Iterator
+import itertools
+import operator
+
+from .aggregate import MAX_DEPTH, PARTITIONS, Partitions
+
+JOIN_TYPES = ('inner', 'left', 'outer')
+JOIN_STRATEGIES = ('hash', 'merge')
+_END = object()
+
+def keyed(iterable: Iterable, key: Callable | None) -> Iterator[tuple]:
+    '''Pairs each item with its key (the item itself if `key` is `None`). The pairs are built by `zip` and `map` over an `itertools.tee` of the items, so the only Python-level call per item is `key` itself.'''
+    keys, items = itertools.tee(iterable)
+    return zip(keys if key is None else map(key, keys), items)
+
+def _spill(pairs: Iterable[tuple], partitions: Partitions):
+    pending = partitions.pending
+    for pair in pairs:
+        pending.append(pair)
+        if len(pending) >= partitions.flush_size:
+            partitions.flush()
+            pending = partitions.pending
+    partitions.flush()
+
+def hash_join(build: Iterator[tuple], probe: Iterator[tuple], build_is_left: bool, keep_build: bool, keep_probe: bool, max_memory: float, spill_dir: str | None, depth: int = 0) -> Iterator[tuple]:
+    '''Joins `(key, item)` pairs: builds a table of the `build` items by key, then streams the `probe` items through it, yielding `(left, right)` tuples, padded with `None` for unmatched items that are kept. If more than `max_memory` build items arrive, both sides are hash-partitioned by key to temporary files in `spill_dir` and each pair of partitions is joined in turn (a grace hash join).'''
+    table = {}
+    get = table.get
+    count = 0
+    for key, item in build:
+        if count >= max_memory:
+            overflow = key, item
+            break
+        items = get(key)
+        if items is None:
+            table[key] = [item]
+        else:
+            items.append(item)
+        count += 1
+    else:
+        yield from _probe(table, probe, build_is_left, keep_build, keep_probe)
+        return
+    build_partitions = Partitions(PARTITIONS, depth, spill_dir)
+    probe_partitions = Partitions(PARTITIONS, depth, spill_dir)
+    _spill(((key, item) for key, items in table.items() for item in items), build_partitions)
+    table.clear()
+    _spill(itertools.chain((overflow,), build), build_partitions)
+    _spill(probe, probe_partitions)
+    if depth + 1 >= MAX_DEPTH:
+        max_memory = float('inf')
+    for i in range(PARTITIONS):
+        yield from hash_join(build_partitions.read(i), probe_partitions.read(i), build_is_left, keep_build, keep_probe, max_memory, spill_dir, depth + 1)
+
+def _probe(table: dict, probe: Iterator[tuple], build_is_left: bool, keep_build: bool, keep_probe: bool) -> Iterator[tuple]:
+    get = table.get
+    matched = set()
+    for key, item in probe:
+        items = get(key)
+        if items is None:
+            if keep_probe:
+                yield (None, item) if build_is_left else (item, None)
+            continue
+        if keep_build:
+            matched.add(key)
+        if build_is_left:
+            for build_item in items:
+                yield build_item, item
+        else:
+            for build_item in items:
+                yield item, build_item
+    if keep_build:
+        for key, items in table.items():
+            if key not in matched:
+                for build_item in items:
+                    yield (build_item, None) if build_is_left else (None, build_item)
+
+def merge_join(left: Iterator[tuple], right: Iterator[tuple], keep_left: bool, keep_right: bool) -> Iterator[tuple]:
+    '''Joins two streams of `(key, item)` pairs sorted by key, holding only the right items of the current key in memory. Raises `ValueError` if either side is out of order.'''
+    left_groups = _checked_groups(left, 'left')
+    right_groups = _checked_groups(right, 'right')
+    left_key, left_items = next(left_groups, (_END, None))
+    right_key, right_items = next(right_groups, (_END, None))
+    while left_key is not _END and right_key is not _END:
+        if left_key < right_key:
+            if keep_left:
+                yield from zip(left_items, itertools.repeat(None))
+            left_key, left_items = next(left_groups, (_END, None))
+        elif right_key < left_key:
+            if keep_right:
+                yield from zip(itertools.repeat(None), right_items)
+            right_key, right_items = next(right_groups, (_END, None))
+        else:
+            right_list = list(right_items)
+            for item in left_items:
+                yield from zip(itertools.repeat(item), right_list)
+            left_key, left_items = next(left_groups, (_END, None))
+            right_key, right_items = next(right_groups, (_END, None))
+    if keep_left:
+        while left_key is not _END:
+            yield from zip(left_items, itertools.repeat(None))
+            left_key, left_items = next(left_groups, (_END, None))
+    if keep_right:
+        while right_key is not _END:
+            yield from zip(itertools.repeat(None), right_items)
+            right_key, right_items = next(right_groups, (_END, None))
+
+def _checked_groups(pairs: Iterator[tuple], side: str) -> Iterator[tuple]:
+    '''Groups `(key, item)` pairs by key, yielding each key with an iterator over its items, and checks that keys increase.'''
+    previous = _END
+    for key, group in itertools.groupby(pairs, operator.itemgetter(0)):
+        if previous is not _END and key < previous:
+            raise ValueError(f"The {side} side of a merge join is not sorted by key.")
+        previous = key
+        yield key, map(operator.itemgetter(1), group)
@@ -0,0 +1,118 @@
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+import atexit
+import concurrent.futures
+import functools
+import itertools
+import os
+import threading
+
+from .fusion import Stage, fuse
+
+def chunked(iterator: Iterator, chunksize: int) -> Iterator[list]:
+    '''Yields lists of up to `chunksize` items, pulling from `iterator` only as each chunk is requested.'''
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1.")
+    return iter(lambda: list(itertools.islice(iterator, chunksize)), [])
+
+DEFAULT_CHUNKSIZE = 64
+MAX_AUTO_CHUNKSIZE = 4096
+
+def auto_chunksize(length: int | None, workers: int | None) -> int:
+    '''Chooses a chunk size that gives each worker about four chunks of a source of known `length`, so that work stays balanced while the per-chunk overhead is paid as few times as possible. Returns `DEFAULT_CHUNKSIZE` if the length is not known.'''
+    if length is None:
+        return DEFAULT_CHUNKSIZE
+    workers = workers or os.cpu_count() or 1
+    return max(1, min(MAX_AUTO_CHUNKSIZE, -(-length // (4 * workers))))
+
+def run_chunk(stages: tuple[Stage, ...], chunk: list) -> list:
+    '''Runs `stages` over `chunk` in a worker. Settings are applied here, so only the user functions need to be picklable.'''
+    return list(fuse(iter(chunk), stages))
+
+def windowed(executor: concurrent.futures.Executor, fn: Callable, args: Iterable, max_in_flight: int, ordered: bool, shutdown: bool = False) -> Iterator:
+    '''Submits `fn(arg)` for each of `args`, keeping at most `max_in_flight` calls outstanding, and yields the results. With `ordered=True`, results are yielded in submission order; otherwise they are yielded as they complete. If `shutdown` is `True`, the executor is shut down when the generator finishes or is closed.'''
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1.")
+    pending = deque() if ordered else set()
+    try:
+        for arg in args:
+            if len(pending) >= max_in_flight:
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            future = executor.submit(fn, arg)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+        if ordered:
+            while pending:
+                yield pending.popleft().result()
+        else:
+            for future in concurrent.futures.as_completed(pending):
+                pending.discard(future)
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if shutdown:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def process_stages(iterator: Iterator, stages: tuple[Stage, ...], workers: int | None, chunksize: int, ordered: bool, max_in_flight: int | None = None) -> Iterator:
+    '''Runs `stages` over `iterator` in a process pool, sending items in chunks. At most `max_in_flight` chunks (default twice the number of workers) are outstanding at any time.'''
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1.")
+    workers = workers or os.cpu_count() or 1
+    def results():
+        executor = concurrent.futures.ProcessPoolExecutor(workers)
+        chunk_results = windowed(
+            executor,
+            functools.partial(run_chunk, stages),
+            chunked(iterator, chunksize),
+            max_in_flight or 2 * workers,
+            ordered,
+            shutdown=True,
+        )
+        try:
+            for chunk in chunk_results:
+                yield from chunk
+        finally:
+            chunk_results.close()
+    return results()
+
+_shared_pools: dict[int, concurrent.futures.ThreadPoolExecutor] = {}
+_shared_pools_lock = threading.Lock()
+
+def shared_thread_pool(workers: int) -> concurrent.futures.ThreadPoolExecutor:
+    '''Returns the module's `ThreadPoolExecutor` with `workers` threads, creating it on first use. Stages that ask for the same number of workers share a pool, so building many `thread_map` stages does not start threads for each; the pools are shut down at interpreter exit.'''
+    with _shared_pools_lock:
+        pool = _shared_pools.get(workers)
+        if pool is None:
+            if not _shared_pools:
+                atexit.register(shutdown_shared_thread_pools)
+            pool = _shared_pools[workers] = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='pipe_iter')
+        return pool
+
+def shutdown_shared_thread_pools():
+    '''Shuts down the pools returned by `shared_thread_pool`, cancelling calls that have not started.'''
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def thread_map(iterator: Iterator, fn: Callable, workers: int | None, max_in_flight: int | None, ordered: bool, executor: concurrent.futures.Executor | None = None) -> Iterator:
+    '''Maps `fn` over `iterator` in a thread pool, one item per task, with at most `max_in_flight` calls (default twice the number of workers) outstanding. If `executor` is `None`, the `shared_thread_pool` with `workers` threads is used; either way the pool is left running.'''
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    def results():
+        return (yield from windowed(
+            executor or shared_thread_pool(workers),
+            fn,
+            iterator,
+            max_in_flight or 2 * workers,
+            ordered,
+        ))
+    return results()
@@ -1,25 +1,106 @@
+import collections
 from collections.abc import Callable, Iterable, Iterator
+import concurrent.futures
+import csv
 import functools
 import itertools
+import math
 import operator
-from typing import Any, overload
+import os
+import random
+import struct
+from typing import TYPE_CHECKING, Any, NamedTuple, overload
 
-from .func import star_func, doublestar_func, fallible_func
+from .func import fallible_func
+from . import aggregate, files, join, sequences, sizing, sketch, sorting
+from .fusion import Stage, fuse, with_options
+from .parallel import auto_chunksize, process_stages, thread_map
+from .profiling import Profiler
+from . import vectorized
+from .windowing import sliding_windows, time_batches
+
+if TYPE_CHECKING:
+    from .cache import Cache
+    from .fork import Fork
+
+def pad(batch: tuple, n: int, fillvalue) -> tuple:
+    '''Pads `batch` to length `n` with `fillvalue`.'''
+    return batch if len(batch) == n else batch + (fillvalue,) * (n - len(batch))
+
+class Settings(NamedTuple):
+    '''The settings of an `Iter`. Settings are immutable, so that derived `Iter`s can share them: settings methods replace the object rather than modify it.'''
+    mutable: bool = False
+    stars: int = 0
+    fallible: bool = False
+    fail_value: Any = None
+    profiler: Profiler | None = None
+
+SIZE_PRESERVING = ('map', 'inspect')
+'''Kinds of fusable stages that yield exactly one item per input item.'''
+STATEFUL = ('takewhile',)
+'''Kinds of fusable stages whose output depends on the items they have already seen, so that a plan holding one cannot be compiled twice over a shared source.'''
+
+IMMUTABLE = Settings()
+MUTABLE = Settings(mutable=True)
 
 class Iter:
+    __slots__ = ('_source', '_stages', '_settings', '_length')
+
     def __init__(self, iterable: Iterable, and_mut: bool = False) -> None:
         '''Creates an `Iter` from an iterable object. Note that this uses `iter` and behaves the same as its 1-argument form: iterators are not copied, so exhaustion of the `Iter` will exhaust the original iterator and vice versa. If `and_mut` is `True`, lazy methods return the original `Iter` object; the default behavior is that such methods return a mirror.'''
-        self.iterator = iter(iterable)
-        self._mutable = and_mut
-        self._stars = 0
-        self._fail_value = None
-        self._fallible = False
-    
-    def _update(self, iterator: Iterator):
-        '''Updates the iterator.'''
+        self._source = iter(iterable)
+        self._stages: tuple[Stage, ...] = ()
+        self._settings = MUTABLE if and_mut else IMMUTABLE
+        self._length = sizing.source_length(iterable, self._source)
+
+    @property
+    def iterator(self) -> Iterator:
+        '''The underlying iterator. Per-element stages (`map`, `filter`, `inspect`, ...) are recorded as a plan and only fused into a single iterator when this is first accessed.'''
+        if self._stages:
+            self._source = fuse(self._source, self._stages)
+            self._stages = ()
+        return self._source
+
+    @iterator.setter
+    def iterator(self, iterator: Iterator):
+        self._source = iterator
+        self._stages = ()
+        self._length = None
+    
+    def _update(self, iterator: Iterator, name: str | None = None, length: sizing.Length | None = None, total: int | None = None):
+        '''Updates the iterator. If profiling, the new iterator is recorded as a stage named `name` (by default, after the iterator). `length` gives the remaining length of the new iterator, if it is known. Alternatively, `total` gives the number of items the new iterator yields, for stages whose remaining length cannot be derived from upstream; the iterator is then paired with a counter.'''
+        if total is not None:
+            name = name or type(iterator).__name__
+            iterator, length = sizing.counted(iterator, total)
+        profiler = self._settings.profiler
+        if profiler is not None:
+            iterator = profiler.wrap(iterator, self._source, name)
         self.iterator = iterator
+        self._length = length
         return self
 
+    def _make_stage(self, kind: str, fn: Callable | None = None, timed: bool = True):
+        '''Describes a per-element stage, capturing the current settings. If profiling, `fn` is timed unless `timed` is `False`, as for stages run in worker processes, where the timer would be out of reach and `fn` must stay picklable.'''
+        settings = self._settings
+        return Stage(kind, self._timed(fn) if timed else fn, settings.stars, settings.fallible, settings.fail_value)
+
+    def _stage(self, kind: str, fn: Callable | None = None):
+        '''Adds a fusable per-element stage to the plan, capturing the current settings.'''
+        return self._add_stage(self._make_stage(kind, fn))
+
+    def _add_stage(self, stage: Stage):
+        '''Adds a fusable per-element stage to the plan as is. If profiling, stages are not fused, so that each can be measured.'''
+        length = self._length if stage.kind in SIZE_PRESERVING else None
+        if self._settings.profiler is not None:
+            return self._update(fuse(self.iterator, (stage,)), stage.kind, length)
+        self._stages += (stage,)
+        self._length = length
+        return self
+
+    def _seekable(self) -> bool:
+        '''Whether the source is still the iterator of a built-in sequence (`range`, `list`, `tuple`, `str`, ...) with no stages planned after it, so that positional methods can index into the sequence instead of stepping through it.'''
+        return not self._stages and sequences.seekable(self._source)
+
     #************************#
     #* Construction methods *#
     #************************#
@@ -44,6 +125,11 @@ class Iter:
         '''Creates an `Iter` from a positional arguments.'''
         return cls(elements, and_mut=and_mut)
     
+    @classmethod
+    def from_chunks(cls, path: str | os.PathLike, size: int, offset: int = 0, end: int | None = None, and_mut: bool = False):
+        '''Creates an `Iter` over the bytes of a file in chunks of `size` bytes, starting at byte `offset` and stopping at byte `end` if given.'''
+        return cls(files.read_chunks(path, size, offset, end), and_mut=and_mut)
+
     @classmethod
     def from_fn(cls, fn: Callable[[], Any], sentinel, and_mut: bool = False):
         '''Creates an `Iter` from a function that returns elements until a sentinel value is returned. This reflects the 2-argument version of the built-in `iter` function.'''
@@ -54,6 +140,16 @@ class Iter:
         '''Creates an `Iter` from keyword arguments.'''
         return cls(elements.items(), and_mut=and_mut)
 
+    @classmethod
+    def from_lines(cls, path: str | os.PathLike, encoding: str | None = None, mmap: bool = True, offset: int = 0, end: int | None = None, batched: bool = False, errors: str = 'strict', block_size: int = files.BLOCK_SIZE, and_mut: bool = False):
+        '''Creates an `Iter` over the lines of a file, without their trailing `\\n` or `\\r\\n`, reading it in large blocks (through a memory map if `mmap` is `True`) and splitting each block in one call. Lines are `bytes`, unless `encoding` is given, in which case each block is decoded as it is read. If `batched` is `True`, the lines are yielded as one list per block. Only lines starting in the byte range `[offset, end)` are read, so a file can be split into shards by byte ranges.'''
+        return cls(files.read_lines(path, encoding, errors, mmap, offset, end, batched, block_size), and_mut=and_mut)
+
+    @classmethod
+    def from_records(cls, path: str | os.PathLike, struct_fmt: str | struct.Struct, offset: int = 0, end: int | None = None, batched: bool = False, and_mut: bool = False):
+        '''Creates an `Iter` over the fixed-size binary records of a file, unpacked to tuples with the `struct` format `struct_fmt` a block at a time. If `batched` is `True`, the records are yielded as one list per block. Only records starting in the byte range `[offset, end)` are read.'''
+        return cls(files.read_records(path, struct_fmt, offset, end, batched), and_mut=and_mut)
+
     @classmethod
     def range(cls, range_arg: int, stop: int | None = None, step: int = 1, and_mut: bool = False):
         '''Creates an `Iter` that behaves like `range`, except that `step` can be set even if `stop` is not. That is to say, if `stop` is not provided, it produces integers from 0 up to `range_arg` (exclusive) by `step`. If `stop` is provided, it produces integers from `range_arg` up to `stop` (exclusive) by `step`.'''
@@ -66,15 +162,25 @@ class Iter:
         '''Creates an `Iter` that yields tuples of elements from the provided iterables. If `strict` is `False`, the default, iteration stops when the shortest iterable is exhausted. If `strict` is `True`, a `ValueError` is raised instead of `StopIteration` if not all of the iteratables are exhausted together.'''
         return cls(zip(*iterables, strict=strict), and_mut=and_mut)
 
-    def clone(self):
-        '''Uses `itertools.tee` to create an independent copy of the iterator, preserving this `Iter`'s settings.'''
-        self.iterator, new_iterator = itertools.tee(self.iterator)
+    def clone(self, max_lag: int | None = None, on_overflow: str = 'raise'):
+        '''Uses `itertools.tee` to create an independent copy of the iterator, preserving this `Iter`'s settings. If `max_lag` is set, a bounded `Tee` is used instead: see `tee`.'''
+        if max_lag is None:
+            self.iterator, new_iterator = itertools.tee(self.iterator)
+        else:
+            from .tee import Tee
+            self.iterator, new_iterator = Tee.tee(self.iterator, 2, max_lag, on_overflow)
         new_iter = Iter(new_iterator).copy_settings(self)
         return new_iter
     
+    def to_async(self, executor: concurrent.futures.Executor | None = None):
+        '''Returns an `AsyncIter` over the items of this `Iter`, preserving its settings. Each item is pulled in `executor` (the event loop's default executor if `None`), so blocking stages do not block the loop.'''
+        from .async_iter import AsyncIter
+        return AsyncIter.from_blocking(self.iterator, executor).copy_settings(self)
+
     def mirror(self):
         '''Returns a new `Iter` that shares the same underlying iterator.'''
         new_iter = Iter(self.iterator).copy_settings(self)
+        new_iter._length = self._length
         return new_iter
     
     @classmethod
@@ -84,7 +190,10 @@ class Iter:
             case None:
                 return cls(itertools.repeat(item), and_mut=and_mut)
             case int():
-                return cls(itertools.repeat(item, n), and_mut=and_mut)
+                repeated = itertools.repeat(item, n)
+                new_iter = cls(repeated, and_mut=and_mut)
+                new_iter._length = repeated.__length_hint__
+                return new_iter
             case _:
                 raise TypeError("If not provided and not None, n must be an integer.")
     
@@ -105,7 +214,12 @@ class Iter:
         return self
     
     def __next__(self):
-        return next(self.iterator)
+        return next(self._source if not self._stages else self.iterator)
+
+    def __length_hint__(self):
+        '''Lets `list`, `collect(list)` and other consumers preallocate when the remaining length is known: see `len_if_known`.'''
+        length = self.len_if_known()
+        return NotImplemented if length is None else length
 
     #********************#
     #* Settings methods *#
@@ -115,55 +229,75 @@ class Iter:
         '''Copies the settings of another `Iter` object.'''
         if not isinstance(other_iter, Iter):
             raise TypeError("Argument must be an Iter object.")
-        self._stars = other_iter._stars
-        self._fail_value = other_iter._fail_value
-        self._fallible = other_iter._fallible
-        self._mutable = other_iter._mutable
+        self._settings = other_iter._settings
         return self
 
     def doublestar(self):
         '''Subsequent functions added to the evaluation chain will be wrapped with `doublestar_func`, receiving keyword arguments. Overrides `star`.'''
-        self._stars = 2
+        self._settings = self._settings._replace(stars=2)
         return self
     
     def fallible(self, fail_value=None):
         '''Subsequent functions added to the evaluation chain will be wrapped with `fallible_func`, catching any errors raised and instead returning return of `fail_value` (default `None`).'''
-        self._fallible = True
-        self._fail_value = fail_value
+        self._settings = self._settings._replace(fallible=True, fail_value=fail_value)
         return self
     
+    def profile(self):
+        '''Records statistics for the stages subsequently added to the evaluation chain, for retrieval with `stats`. Profiled stages are not fused, and every item and function call is timed, so this is meant for diagnosis; unprofiled chains are unaffected.'''
+        if self._settings.profiler is None:
+            self._settings = self._settings._replace(profiler=Profiler())
+            self._update(self.iterator, 'source')
+        return self
+
     def star(self):
         '''Subsequent functions added to the evaluation change will be wrapped with `star_func`, receiving unpacked arguments. Overrides `doublestar`.'''
-        self._stars = 1
+        self._settings = self._settings._replace(stars=1)
         return self
     
     def unset_fallible(self):
         '''Any errors raised by subsequent functions in the evaluation chain will be propagated.'''
-        self._fallible = True
+        self._settings = self._settings._replace(fallible=False)
         return self
     
     def unset_stars(self):
         '''Subsequent functions added to the evaluation change will receive single arguments.'''
-        self._stars = 0
+        self._settings = self._settings._replace(stars=0)
         return self
     
     def _mutating(self):
-        if self._mutable:
+        if self._settings.mutable:
             return self
         else:
-            return self.mirror()
+            return self._derive()
+
+    def _derive(self):
+        '''Like `mirror`, but carries over the pending plan instead of compiling it, so that chained stages can still be fused. A plan with a stateful stage is compiled first, so that this `Iter` and the new one advance the same stage.'''
+        if any(stage.kind in STATEFUL for stage in self._stages):
+            self.iterator
+        new_iter = Iter.__new__(Iter)
+        new_iter._source = self._source
+        new_iter._stages = self._stages
+        new_iter._settings = self._settings
+        new_iter._length = self._length
+        return new_iter
     
+    def _timed(self, fn: Callable | None):
+        profiler = self._settings.profiler
+        if profiler is None or fn is None:
+            return fn
+        return profiler.timed(fn)
+
     def wrap_fallible(self, fn: Callable):
-        if self._fallible:
-            return fallible_func(fn, fail_value=self._fail_value)
+        fn = self._timed(fn)
+        if self._settings.fallible:
+            return fallible_func(fn, fail_value=self._settings.fail_value)
         else:
             return fn
         
     def func_options(self, fn: Callable):
-        def identity(x: Callable):
-            return x
-        inner = doublestar_func if self._stars == 2 else star_func if self._stars == 1 else identity
-        return self.wrap_fallible(inner(fn))
+        '''Wraps `fn` according to the current settings. The wrapper is built once, here, and does no per-call dispatch on the settings.'''
+        settings = self._settings
+        return with_options(self._timed(fn), settings.stars, settings.fallible, settings.fail_value)
 
     #****************#
     #* Lazy methods *#
@@ -187,56 +321,90 @@ class Iter:
         return self._mutating()._update(fn(self.iterator))
     
     def batched(self, n: int, *, fillvalue=...):
-        '''Yields tuples of `n` elements at a time. If `fillvalue` is specified, the last batch will be filled with it if necessary, otherwise the last batch batch might be smaller than `n`.'''
+        '''Yields tuples of `n` elements at a time. If `fillvalue` is specified, the last batch will be filled with it if necessary, otherwise the last batch batch might be smaller than `n`. Batches are cut with `itertools.islice` (or `itertools.batched` where available), so there is no Python-level work per element.'''
+        if n < 1:
+            raise ValueError("n must be at least 1.")
+        def batch_generator(iterator):
+            if fillvalue is ... and hasattr(itertools, 'batched'):
+                return itertools.batched(iterator, n)
+            batches = iter(lambda: tuple(itertools.islice(iterator, n)), ())
+            if fillvalue is ...:
+                return batches
+            return map(functools.partial(pad, n=n, fillvalue=fillvalue), batches)
+        return self._mutating()._update(
+            batch_generator(self.iterator),
+            'batched',
+            sizing.scaled(self._length, lambda length: sizing.ceil_div(length, n))
+        )
+
+    def batched_by(self, max_items: int | None = None, max_weight: float | None = None, weight: Callable[[Any], float] = len):
+        '''Yields tuples of consecutive elements, closing a batch when it holds `max_items` elements or when adding the next element would take the total `weight` of the batch over `max_weight` (e.g. a byte budget with the default `weight=len`). An element heavier than `max_weight` forms a batch of its own. At least one of `max_items` and `max_weight` must be given.'''
+        if max_items is None and max_weight is None:
+            raise TypeError("batched_by requires max_items, max_weight or both.")
+        if max_items is not None and max_items < 1:
+            raise ValueError("max_items must be at least 1.")
+        if max_weight is None:
+            return self.batched(max_items)
+        max_items = max_items or float('inf')
         def batch_generator(iterator):
-            exhausted = False
-            while not exhausted:
-                batch = []
-                for _ in range(n):
-                    try:
-                        batch.append(next(iterator))
-                    except StopIteration:
-                        exhausted = True
-                        if fillvalue is not ...:
-                            batch.append(fillvalue)
-                        else:
-                            break
+            batch = []
+            total = 0
+            for item in iterator:
+                item_weight = weight(item)
+                if batch and (total + item_weight > max_weight or len(batch) >= max_items):
+                    yield tuple(batch)
+                    batch = []
+                    total = 0
+                batch.append(item)
+                total += item_weight
+            if batch:
                 yield tuple(batch)
         return self.apply(batch_generator)
     
+    def cache(self, max_items: int | None = None, spill_dir: str | None = None) -> 'Cache':
+        '''Returns a `Cache`: a replayable source that records items as they are first pulled, so that the stages up to here run only once however many times it is iterated. Up to `max_items` items (all of them if `None`) are kept in memory, and the rest are pickled in bulk to a temporary file in `spill_dir`. Use `Cache.iter()` to start a new pass as an `Iter` with this `Iter`'s settings.'''
+        from .cache import Cache
+        return Cache(self.iterator, max_items, spill_dir, settings_from=self)
+
     def chain(self, *iterables):
         '''Appends one or more other iterables to the iterator.'''
+        iterators, lengths = sizing.sources(iterables)
         return (self
             ._mutating()
             ._update(
                 itertools.chain(
                     self.iterator, 
-                    *iterables
-                )
+                    *iterators
+                ),
+                length=sizing.combined([self._length, *lengths], lambda *ns: sum(ns))
             )
         )
     
     def combinations(self, r: int):
         '''Yields all combinations of `r` elements from the iterator.'''
+        n = self.len_if_known()
         return (self
             ._mutating()
             ._update(
                 itertools.combinations(
                     self.iterator, 
                     r
-                )
+                ),
+                total=None if n is None else math.comb(n, r)
             )
         )
     
     def combinations_with_replacement(self, r: int):
         '''Yields all combinations of `r` elements from the iterator, including repeated elements.'''
+        n = self.len_if_known()
         return (self
             ._mutating()
             ._update(
                 itertools.combinations_with_replacement(
                     self.iterator, 
                     r
-                )
+                ),
+                total=None if n is None else math.comb(n + r - 1, r) if n else int(r == 0)
             )
         )
 
@@ -253,7 +421,9 @@ class Iter:
         )
 
     def cycle(self):
-        '''Cycles through the iterator indefinitely.'''
+        '''Cycles through the iterator indefinitely. If the source is a sequence, it is iterated again on each cycle rather than copied.'''
+        if self._seekable():
+            return self._mutating()._update(sequences.cycling(self._source), 'cycle')
         return (self
             ._mutating()
             ._update(
@@ -281,52 +451,38 @@ class Iter:
                 enumerate(
                     self.iterator, 
                     start
-                )
+                ),
+                length=self._length
             )
         )
 
     def evenitems(self):
         '''Returns every other item of the iterator, starting with the second.'''
-        selector = Iter([False, True]).cycle()
-        return (self
-            ._mutating()
-            ._update(
-                itertools.compress(
-                    self.iterator, 
-                    selector
-                )
-            )
-        )
+        return self.islice(1, None, 2)
 
     def filter(self, fn: Callable | None):
         '''Returns an `Iter` of elements for which `fn` is (evaluated as) `True`. If `fn` is `None`, filters out `False`-like values.'''
-        return (self
-            ._mutating()
-            ._update(
-                filter(
-                    None if fn is None else self.func_options(fn), 
-                    self.iterator
-                )
-            )
-        )
+        return self._mutating()._stage('filter', fn)
     
     def filterfalse(self, fn: Callable | None):
         '''Invers of `filter`: returns an `Iter` of elements for which `fn` is (evaluated as) `False`. If `fn` is `None`, filters out `True`-like values.'''
+        return self._mutating()._stage('filterfalse', fn)
+    
+    def filter_batches(self, predicate: Callable, size: int = 1024, dtype=None):
+        '''Filters items with a vectorized `predicate` that receives a NumPy array of up to `size` items (see `map_batches`) and returns a boolean mask. The original items selected by the mask are yielded. The `fallible` setting does not apply, as an error cannot be traced to a single item of the batch. Requires NumPy.'''
+        vectorized.require_numpy('filter_batches')
+        stars = self._settings.stars
         return (self
-            ._mutating()
-            ._update(
-                itertools.filterfalse(
-                    None if fn is None else self.func_options(fn), 
-                    self.iterator
-                )
-            )
+            .batched(size)
+            .apply(lambda batches: vectorized.filter_batches(batches, predicate, stars, dtype))
         )
-    
+
     def filter_map(self, fn: Callable):
         '''Applies a function to each element, and filters out `None` results.'''
         return (self
-            .map(self.func_options(fn))
-            .somevalue()
+            ._mutating()
+            ._stage('map', fn)
+            ._stage('somevalue')
         )
     
     def flat_map(self, fn: Callable):
@@ -334,10 +490,31 @@ class Iter:
         # note: this makes an unecessary copy of the iterator
         return self.map(fn).flatten()
     
-    # def fork(self, *predicates: Callable[..., bool], first_only=True) -> list[Fork]:
-    #     '''Splits the iterator into a number of iterators equal to the number of predicates. If `first_only=True` (the default) an item is sent to the first iterator for which the predicate is `True`. Otherwise, each iterator contains all elements for which the corresponding predicate is `True`.'''
-    #     ...
+    def fork(self, *predicates: Callable[..., bool], first_only: bool = False, max_buffer: int | None = None, on_overflow: str = 'raise', spill_dir: str | None = None) -> list['Fork']:
+        '''Splits the iterator into a number of iterators equal to the number of predicates. If `first_only=True`, an item is sent to the first iterator for which the predicate is `True`. Otherwise (the default), each iterator contains all elements for which the corresponding predicate is `True`. See `Fork.fork` for `max_buffer`, `on_overflow` and `spill_dir`.'''
+        from .fork import Fork
+        forks = Fork.fork(
+            self,
+            *predicates,
+            first_only=first_only,
+            max_buffer=max_buffer,
+            on_overflow=on_overflow,
+            spill_dir=spill_dir
+        )
+        if self._settings.profiler is not None:
+            self._settings.profiler.drop_pending()
+        return forks
     
+    def filter_in(self, other: Iterable, key: Callable | None = None):
+        '''Keeps the items whose `key` (the item itself if `None`) is in `other`, an iterable of keys: a semi-join. A `set`, `frozenset` or `dict` is used as is; other iterables are collected into a `set` first.'''
+        keys = other if isinstance(other, (set, frozenset, dict)) else set(other)
+        if key is None:
+            is_in = keys.__contains__
+        else:
+            def is_in(item):
+                return key(item) in keys
+        return self._mutating()._add_stage(Stage('filter', self._timed(is_in)))
+
     def flatten(self):
         '''Reduces one level of nesting. Raises `TypeError` if the items of the iterator are not themselves iterable. To keep drop non-iterable items, combine with `filter`. To include non-iterable items as part of the flattening, use `stretch`.'''
         return (self
@@ -359,21 +536,26 @@ class Iter:
             )
         )
 
-    def inspect(self, fn: Callable[[Any], Any]):
-        '''Does something with each element of an iterator, passing the **original** value on. This can be used to introduce side-effects to the consumption of the iterator, e.g. to log something for each element. If the iterator is fallible, any exceptions raised by `fn` will be caught and the iterator will continue.'''
-        wrapped_function = self.func_options(fn)
-        def inspector(x):
-            wrapped_function(x)
-            return x
+    def group_aggregate(self, key: Callable, agg: 'str | aggregate.Accumulator' = 'list', value: Callable | None = None, max_groups_in_memory: int | None = None, spill_dir: str | None = None):
+        '''Groups the items by `key`, whether or not equal keys are consecutive, and yields a `(key, result)` tuple per group, aggregating `value(item)` (or the item itself) with `agg`: the name of a built-in accumulator (see `aggregate`), or an `Accumulator` such as `Fold(fn, initial)`. The groups are kept in a hash table, so the whole input is consumed, in one pass, when the first result is pulled. If `max_groups_in_memory` is set, the items of keys beyond that many groups are spilled to temporary files in `spill_dir`, hash-partitioned by key, and each partition is aggregated in turn once the groups in memory have been yielded. Groups in memory are yielded in order of first appearance.'''
         return (self
             ._mutating()
             ._update(
-                map(
-                    inspector, 
-                    self.iterator
-                )
+                aggregate.group_aggregate(
+                    self.iterator,
+                    key,
+                    agg,
+                    value,
+                    max_groups_in_memory,
+                    spill_dir,
+                ),
+                'group_aggregate'
             )
         )
+
+    def inspect(self, fn: Callable[[Any], Any]):
+        '''Does something with each element of an iterator, passing the **original** value on. This can be used to introduce side-effects to the consumption of the iterator, e.g. to log something for each element. If the iterator is fallible, any exceptions raised by `fn` will be caught and the iterator will continue.'''
+        return self._mutating()._stage('inspect', fn)
     
     @overload
     def islice(self, stop: int | None) -> 'Iter':
@@ -393,39 +575,62 @@ class Iter:
     def islice(self, *args):
         match args:
             case (start, stop, step):
-                new_iter = itertools.islice(self.iterator, start, stop, step)
+                pass
             case (start, stop):
-                new_iter = itertools.islice(self.iterator, start, stop)
-            case (step,):
-                new_iter = itertools.islice(self.iterator, step)
+                step = None
+            case (stop,):
+                start = step = None
             case _:
                 raise TypeError(f"Invalid arguments {args}")
-        return self._mutating()._update(new_iter)
+        if (self._seekable() and (start or 0) >= 0 and (stop is None or stop > (start or 0))
+                and (step is None or step >= 1) and (start or (step or 1) >= sequences.SEEK_STEP)):
+            new_iter = sequences.stepping(self._source, start or 0, stop, step or 1)
+            return self._mutating()._update(new_iter, 'islice', sizing.islice_length(self._length, start, stop, step))
+        new_iter = itertools.islice(self.iterator, start, stop, step)
+        return self._mutating()._update(new_iter, length=sizing.islice_length(self._length, start, stop, step))
     
+    def join(self, other: Iterable, left_key: Callable | None = None, right_key: Callable | None = None, how: str = 'inner', strategy: str = 'hash', max_memory: int | None = None, spill_dir: str | None = None):
+        '''Joins the items with those of `other` on equal keys, computed by `left_key` and `right_key` (the items themselves if `None`; `right_key` defaults to `left_key`), yielding `(left, right)` tuples. `how='left'` also yields unmatched items of this `Iter` as `(left, None)`, and `how='outer'` unmatched items of either side, padded with `None`. With `strategy='hash'`, a table is built on the smaller side, if both lengths are known, otherwise on `other`, and the other side is streamed through it. If more than `max_memory` items are to be kept in the table, both sides are hash-partitioned by key to temporary files in `spill_dir` and joined partition by partition (a grace hash join). With `strategy='merge'`, both sides must be sorted by key: they are streamed side by side, holding only the items of `other` with the current key, and `ValueError` is raised on finding a key out of order.'''
+        if how not in join.JOIN_TYPES:
+            raise ValueError(f"Invalid join type {how!r}; expected one of {', '.join(join.JOIN_TYPES)}.")
+        if right_key is None:
+            right_key = left_key
+        keep_left = how != 'inner'
+        keep_right = how == 'outer'
+        match strategy:
+            case 'hash':
+                left_length = self.len_if_known()
+                right_length = sizing.len_if_known(other)
+                build_is_left = left_length is not None and right_length is not None and left_length < right_length
+                left = join.keyed(self.iterator, left_key)
+                right = join.keyed(other, right_key)
+                max_items = float('inf') if max_memory is None else max_memory
+                if build_is_left:
+                    joined = join.hash_join(left, right, True, keep_left, keep_right, max_items, spill_dir)
+                else:
+                    joined = join.hash_join(right, left, False, keep_right, keep_left, max_items, spill_dir)
+            case 'merge':
+                joined = join.merge_join(join.keyed(self.iterator, left_key), join.keyed(other, right_key), keep_left, keep_right)
+            case _:
+                raise ValueError(f"Invalid strategy {strategy!r}; expected one of {', '.join(join.JOIN_STRATEGIES)}.")
+        return self._mutating()._update(joined, 'join')
+
     def map(self, fn: Callable[[Any], Any]):
         '''Maps `fn` onto each element of the iterator.'''
+        return self._mutating()._stage('map', fn)
+
+    def map_batches(self, fn: Callable, size: int = 1024, dtype=None):
+        '''Maps a vectorized `fn` over the iterator, calling it once per batch of up to `size` items. Each batch is converted to a NumPy array with `dtype`, or to a structured array with fields `f0`, `f1`, ... if the items are tuples. `fn` must return an array of the same length, whose elements are yielded one by one as Python objects. With `star` (`doublestar`), the fields of a structured array are passed as separate positional (keyword) arguments, so the items must be tuples or `dtype` structured; otherwise `ValueError` is raised. The `fallible` setting does not apply, as an error cannot be traced to a single item of the batch. Requires NumPy.'''
+        vectorized.require_numpy('map_batches')
+        stars = self._settings.stars
         return (self
-            ._mutating()
-            ._update(
-                map(
-                    self.func_options(fn), 
-                    self.iterator
-                )
-            )
+            .batched(size)
+            .apply(lambda batches: vectorized.map_batches(batches, fn, stars, dtype))
         )
 
     def odditems(self):
         '''Returns every other item of the iterator, starting with the first.'''
-        selector = Iter([True, False]).cycle()
-        return (self
-            ._mutating()
-            ._update(
-                itertools.compress(
-                    self.iterator, 
-                    selector
-                )
-            )
-        )
+        return self.islice(0, None, 2)
     
     def pairwise(self):
         '''Returns pairs of consecutive items from the iterator.'''
@@ -442,8 +647,13 @@ class Iter:
     
     def somevalue(self):
         '''Filters out `None` values.'''
-        return self.filter(lambda x: x is not None)
+        return self._mutating()._stage('somevalue')
     
+    def sorted(self, key: Callable | None = None, reverse: bool = False, max_memory: int | None = None, spill_dir: str | None = None):
+        '''Sorts the items, consuming the iterator when called, like `sorted`. Sorted in memory, the result is a `list` iterator, so positional methods such as `skip` index into it. If more than `max_memory` items arrive (by default, there is no limit), they are sorted in runs of `max_memory` items which are written to a temporary file in `spill_dir`, and the result lazily merges the runs with `heapq.merge`, reading them back in batches. The sort is stable either way.'''
+        new_iter, length = sorting.external_sorted(self.iterator, key, reverse, max_memory, spill_dir)
+        return self._mutating()._update(new_iter, 'sorted', length)
+
     def starmap(self, fn: Callable):
         '''Maps `fn` onto each element of the iterator, unpacking the arguments. Ignores `star` settings.'''
         return (self
@@ -452,7 +662,8 @@ class Iter:
                 itertools.starmap(
                     self.wrap_fallible(fn), 
                     self.iterator
-                )
+                ),
+                length=self._length
             )
         )
     
@@ -478,9 +689,33 @@ class Iter:
         
         return self._mutating()._update(stretch_generator(self.iterator))
     
-    # def switch_map(self, *conditions: tuple[None | Callable[..., bool], Callable]):
-    #     '''Selectively applies functions to elements with a virtual switch statement. The arguments are tuples of a predicate and a function: a given item is transformed by the first function for which the predicate is `True`. If the predicate is `None`, the function is applied to all (remaining) elements.'''
-    #     ...
+    def switch_map(self, *conditions: tuple[None | Callable[..., bool], Callable], key: Callable | None = None, cases: dict | None = None, default: Callable | None = None):
+        '''Selectively applies functions to elements with a virtual switch statement. The arguments are tuples of a predicate and a function: a given item is transformed by the first function for which the predicate is `True`. If the predicate is `None`, the function is applied to all (remaining) elements. Items matched by no predicate are passed on unchanged. Alternatively, `key` and `cases` select the function with a dictionary lookup of `key(item)` in `cases`, which takes constant time however many cases there are. Items whose key is not in `cases` are transformed by `default`, or passed on unchanged if it is `None`. Predicates, keys and functions all follow the star/doublestar/fallible settings.'''
+        if key is not None or cases is not None:
+            if conditions or key is None or cases is None:
+                raise TypeError("switch_map takes either (predicate, function) pairs, or both key and cases.")
+            get_case = {
+                value: self.func_options(fn)
+                for value, fn in cases.items()
+            }.get
+            wrapped_key = self.func_options(key)
+            wrapped_default = None if default is None else self.func_options(default)
+            def dispatch(x):
+                fn = get_case(wrapped_key(x), wrapped_default)
+                return x if fn is None else fn(x)
+        else:
+            if default is not None:
+                raise TypeError("default can only be used with key and cases; use a None predicate instead.")
+            rules = tuple(
+                (None if predicate is None else self.func_options(predicate), self.func_options(fn))
+                for predicate, fn in conditions
+            )
+            def dispatch(x):
+                for predicate, fn in rules:
+                    if predicate is None or predicate(x):
+                        return fn(x)
+                return x
+        return self._mutating()._add_stage(Stage('map', dispatch))
 
     def take(self, n: int):
         '''Returns the first `n` items of the iterator. Alias for `Iter.islice(n)`.'''
@@ -488,41 +723,162 @@ class Iter:
     
     def takewhile(self, predicate: Callable[[Any], bool]):
         '''Returns items from the iterator while `predicate` is `True`. If `fallible`, then the predicate raising an exception will trigger to stop returning values.'''
+        return self._mutating()._stage('takewhile', predicate)
+    
+    def tee(self, n: int = 2, max_lag: int | None = None, on_overflow: str = 'raise') -> tuple['Iter', ...]:
+        '''Creates `n` independent clones. By default, these share an `itertools.tee` buffer, which grows without limit while one clone is ahead of another. If `max_lag` is set, no clone may get more than `max_lag` items ahead of another: the one ahead raises `BufferOverflowError` (`on_overflow='raise'`, the default), drops the oldest items from the clones behind (`'drop'`), or blocks until the others are consumed from other threads (`'block'`, for clones consumed by separate threads only). The `iterator` of each bounded clone is then its `TeeBranch`, whose `lag`, `max_lag` and `dropped` report how far it has fallen behind; read it before adding stages to a mutable clone, which replace it.'''
+        if max_lag is None:
+            iterators = itertools.tee(self.iterator, n)
+        else:
+            from .tee import Tee
+            iterators = Tee.tee(self.iterator, n, max_lag, on_overflow)
+        return tuple(Iter(iterator).copy_settings(self) for iterator in iterators)
+    
+    def time_batched(self, max_items: int, max_latency_s: float):
+        '''Yields tuples of up to `max_items` items, emitting a partial batch once `max_latency_s` seconds have passed since its first item arrived, even if the source is slow. The source is read in a background thread, so a blocking source (e.g. a polling `Iter.from_fn`) cannot delay a flush.'''
         return (self
             ._mutating()
             ._update(
-                itertools.takewhile(
-                    self.func_options(predicate), 
-                    self.iterator
-                )
+                time_batches(self.iterator, max_items, max_latency_s),
+                'time_batched'
             )
         )
-    
-    def tee(self, n: int = 2) -> tuple['Iter', ...]:
-        '''Creates `n` independent clones.'''
-        iterators = itertools.tee(self.iterator, n)
-        return tuple(Iter(iterator).copy_settings(self) for iterator in iterators)
-    
+
+    def unbatched(self):
+        '''Inverse of `batched` and `batched_by`: yields the elements of each batch in turn. Equivalent to `flatten`.'''
+        return self.flatten()
+
+    def unique(self, key: Callable | None = None, mode: str = 'exact', capacity: int | None = None, error_rate: float = 0.01):
+        '''Filters out items whose `key` (the item itself if `None`) was seen before. With `mode='exact'`, the keys seen are kept in a `set`, which grows with the number of distinct keys. With `mode='bloom'`, they are recorded in a Bloom filter sized for `capacity` distinct keys, which takes a fixed `-capacity * ln(error_rate) / ln(2)**2` bits: no duplicate gets through, but about `error_rate` of the new keys are wrongly dropped once `capacity` keys are seen, and more beyond. Keys must be hashable.'''
+        match mode:
+            case 'exact':
+                seen = set()
+                add = seen.add
+                if key is None:
+                    def is_duplicate(item):
+                        return item in seen or add(item)
+                else:
+                    def is_duplicate(item):
+                        k = key(item)
+                        return k in seen or add(k)
+            case 'bloom':
+                if capacity is None:
+                    raise ValueError("capacity is required in 'bloom' mode.")
+                bloom = sketch.BloomFilter(capacity, error_rate)
+                if key is None:
+                    is_duplicate = bloom.add
+                else:
+                    def is_duplicate(item):
+                        return bloom.add(key(item))
+            case _:
+                raise ValueError(f"Invalid mode {mode!r}; expected 'exact' or 'bloom'.")
+        return self._mutating()._add_stage(Stage('filterfalse', self._timed(is_duplicate)))
+
+    def unique_consecutive(self, key: Callable | None = None):
+        '''Filters out items whose `key` (the item itself if `None`) equals that of the previous item, keeping the first of each run: on sorted input, this yields each distinct item once, in O(1) memory.'''
+        return (self
+            ._mutating()
+            ._update(
+                map(
+                    next,
+                    map(
+                        operator.itemgetter(1),
+                        itertools.groupby(self.iterator, key)
+                    )
+                ),
+                'unique_consecutive'
+            )
+        )
+
+    def window(self, n: int, step: int = 1):
+        '''Yields sliding windows of `n` consecutive items as tuples, each starting `step` items after the previous one. Windows are kept in a ring buffer, so each step only appends the new items. Trailing items that do not fill a window are dropped. `window(2)` is equivalent to `pairwise`.'''
+        return (self
+            ._mutating()
+            ._update(
+                sliding_windows(self.iterator, n, step),
+                'window'
+            )
+        )
+
     def zip(self, *others: Iterable):
+        iterators, lengths = sizing.sources(others)
         return (self
             ._mutating()
             ._update(
                 zip(
                     self.iterator,
-                    *others
-                )
+                    *iterators
+                ),
+                length=sizing.combined([self._length, *lengths], min)
             )
         )
 
     def zip_longest(self, *others: Iterable, fillvalue=None):
+        iterators, lengths = sizing.sources(others)
         return (self
             ._mutating()
             ._update(
                 itertools.zip_longest(
                     self.iterator,
-                    *others,
+                    *iterators,
                     fillvalue=fillvalue
-                )
+                ),
+                length=sizing.combined([self._length, *lengths], max)
+            )
+        )
+
+    #********************#
+    #* Parallel methods *#
+    #********************#
+
+    def _process_pool(self, stages: tuple[Stage, ...], workers: int | None, chunksize: int | None, ordered: bool, max_in_flight: int | None):
+        n = self.len_if_known()
+        if chunksize is None:
+            chunksize = auto_chunksize(n, workers)
+        size_preserving = all(stage.kind in SIZE_PRESERVING for stage in stages)
+        return (self
+            ._mutating()
+            ._update(
+                process_stages(
+                    self.iterator,
+                    stages,
+                    workers,
+                    chunksize,
+                    ordered,
+                    max_in_flight
+                ),
+                total=n if size_preserving else None
+            )
+        )
+
+    def par_map(self, fn: Callable[[Any], Any], workers: int | None = None, chunksize: int | None = None, ordered: bool = True, max_in_flight: int | None = None):
+        '''Like `map`, but runs `fn` in a `concurrent.futures.ProcessPoolExecutor` with `workers` processes (default `os.cpu_count()`). Items are sent in chunks of `chunksize`; by default, chunks are sized to give each worker about four of them if the length of the source is known (see `len_if_known`), otherwise they hold 64 items. At most `max_in_flight` chunks (default `2 * workers`) are pulled ahead of the consumer, so infinite sources are safe. If `ordered` is `False`, chunks are yielded as they complete. Settings are applied in the workers, so `fn` must be picklable. When profiling, the calls to `fn` in the workers are not timed.'''
+        return self._process_pool((self._make_stage('map', fn, timed=False),), workers, chunksize, ordered, max_in_flight)
+
+    def par_filter(self, fn: Callable[[Any], bool], workers: int | None = None, chunksize: int | None = None, ordered: bool = True, max_in_flight: int | None = None):
+        '''Like `filter`, but evaluates `fn` in a process pool. See `par_map` for the parameters.'''
+        return self._process_pool((self._make_stage('filter', fn, timed=False),), workers, chunksize, ordered, max_in_flight)
+
+    def par_filter_map(self, fn: Callable[[Any], Any], workers: int | None = None, chunksize: int | None = None, ordered: bool = True, max_in_flight: int | None = None):
+        '''Like `filter_map`, but evaluates `fn` in a process pool. See `par_map` for the parameters.'''
+        stages = (self._make_stage('map', fn, timed=False), Stage('somevalue'))
+        return self._process_pool(stages, workers, chunksize, ordered, max_in_flight)
+
+    def thread_map(self, fn: Callable[[Any], Any], workers: int | None = None, max_in_flight: int | None = None, ordered: bool = True, executor: concurrent.futures.Executor | None = None):
+        '''Like `map`, but runs `fn` in a thread pool, which suits blocking I/O. At most `max_in_flight` calls (default `2 * workers`) are outstanding, so memory use stays fixed on unbounded sources. If `ordered` is `False`, results are yielded as they complete. By default the stage runs in a thread pool shared by all `thread_map` stages with the same number of `workers`, created on first use and shut down at exit; pass `executor` to use another pool. `fn` should not itself wait on a `thread_map` stage using the same shared pool, as that can exhaust its threads.'''
+        n = self.len_if_known()
+        return (self
+            ._mutating()
+            ._update(
+                thread_map(
+                    self.iterator,
+                    self.func_options(fn),
+                    workers,
+                    max_in_flight,
+                    ordered,
+                    executor
+                ),
+                total=n
             )
         )
 
@@ -532,30 +888,38 @@ class Iter:
     
     def permutations(self, r: int = None):
         '''Yields all permutations of `r` elements from the iterator. This consumes the original iterator. If `r` is not provided, it defaults to the length of the iterator.'''
+        n = self.len_if_known()
         return self._update(
             itertools.permutations(
                 self.iterator, 
                 r
-            )
+            ),
+            total=None if n is None else math.perm(n, r)
         )
 
     def product(self, *iterables, repeat: int = 1):
         '''Yields the cartesian product of the iterator and any number of other iterables. This consumes the iterators (accordingly, `mutating` option is ignored). If `repeat` is provided, each iterator will be repeated that many times.'''
+        ns = [self.len_if_known(), *map(sizing.len_if_known, iterables)]
         return self._update(
             itertools.product(
                 self.iterator, 
                 *iterables, 
                 repeat=repeat
-            )
+            ),
+            total=None if None in ns else math.prod(ns) ** repeat
         )
 
     #*********************#
     #* Consuming methods *#
     #*********************#
 
+    def aggregate(self, **named_aggs: 'str | aggregate.Accumulator') -> dict[str, Any]:
+        '''Computes several aggregates in a single pass, returning a dict of their results by name, e.g. `aggregate(low='min', high='max', odd=CountIf(is_odd))`. Each aggregate is the name of a built-in accumulator (`'count'`, `'sum'`, `'min'`, `'max'`, `'mean'`, `'var'` (sample variance), `'first'`, `'last'`, `'any'`, `'all'`, `'list'`) or an `Accumulator`, such as `CountIf(predicate)` or `Fold(fn, initial)`. The updates of all accumulators are compiled into one loop, and memory stays proportional to the number of aggregates (except for `'list'`). On an empty iterator, counts and sums are 0, `any` is `False`, `all` is `True`, `fold` is its initial value, and the others are `None`.'''
+        return aggregate.aggregate(self.iterator, named_aggs)
+
     def all(self):
         '''Returns `True` if all items in the iterator evaluate to `True`.'''
-        return all(self)
+        return all(self.iterator)
     
     def all_not(self):
         '''Returns `True` if all items in the iterator evaluate to `False`.'''
@@ -563,23 +927,33 @@ class Iter:
     
     def any(self):
         '''Returns `True` if any items in the iterator evaluate to `True`.'''
-        return any(self)
+        return any(self.iterator)
+
+    def approx_distinct(self, precision: int = 14) -> int:
+        '''Estimates the number of distinct items with a HyperLogLog sketch of `2**precision` bytes, whose relative standard error is about `1.04 / sqrt(2**precision)` (0.8% by default). Items must be hashable.'''
+        return sketch.HyperLogLog(precision).update(self.iterator).estimate()
+
+    def approx_quantiles(self, qs: Iterable[float], eps: float = 0.01, seed=None) -> list:
+        '''Estimates the items at quantiles `qs` (between 0 and 1, e.g. `(0.5, 0.99)`) with a KLL sketch, which holds about `8 / eps` items whatever the length of the iterator. The rank of each estimate is within `eps` of the requested one with about 99% probability. Returns a `None` per quantile if the iterator is empty. Items must be comparable.'''
+        return sketch.QuantileSketch(eps, random.Random(seed)).update(self.iterator).quantiles(qs)
 
     def collect(self, fn: Callable[[Iterable], Any]):
-        '''Calls `fn`, function that accepts and consumes an iterable, on itself. For functions that transform an iterable into an `Iterator`, use `apply`.'''
-        return fn(self)
+        '''Calls `fn`, function that accepts and consumes an iterable, on itself. `fn` receives the underlying iterator, so that consumers such as `list` and `sum` run at its speed. For functions that transform an iterable into an `Iterator`, use `apply`.'''
+        return fn(self.iterator)
     
     def collect_args(self, fn: Callable[..., Any]):
         '''Calls `fn`, a function that accepts positional arguments, by unpacking itself.'''
-        return fn(*self)
+        return fn(*self.iterator)
     
     def count_if(self, predicate: Callable[[Any], bool]):
         '''Counts the number of items in the iterator for which `predicate` is `True`.'''
-        return self.filter(predicate).reduce(lambda x, _: x + 1, initial=0)
+        counter = itertools.count()
+        collections.deque(zip(self.filter(predicate).iterator, counter), maxlen=0)
+        return next(counter)
     
     def find(self, predicate: Callable[[Any], bool]):
         '''Consumes the iterator up to the first item for which `predicate` is `True`, and returns the item. If the iterator is exhausted before finding any such item, returns `None`.'''
-        return self.mirror().filter(predicate).next(default=None)
+        return next(self.mirror().filter(predicate).iterator, None)
     
     def fold(self, fn: Callable[[Any, Any], Any], initial):
         '''Reduces the iterator to a single value by applying `fn` to each item and the previous result, beginning with `initial`.'''
@@ -590,25 +964,31 @@ class Iter:
         )
     
     def for_each(self, fn: Callable[[Any], Any]) -> None:
-        '''Eargerly calls `fn` on each item of iterator.'''
-        for item in self:
-            self.func_options(fn)(item)
+        '''Eargerly calls `fn` on each item of iterator. The calls are built like a `map` stage, so star mode uses `itertools.starmap` and fallible and doublestar modes a compiled loop, with no wrapper around `fn`.'''
+        settings = self._settings
+        calls = fuse(self.iterator, (Stage('map', fn, settings.stars, settings.fallible, settings.fail_value),))
+        collections.deque(calls, maxlen=0)
+
+    def len_if_known(self) -> int | None:
+        '''Returns the exact number of remaining items, if it is known, otherwise `None`. Lengths start from sized sources (`range`, lists, tuples, dicts, ...; `Iter.range`, `from_args`, `from_kwargs` and `repeat` with `n`), and are carried through stages with a known number of items (`map`, `starmap`, `inspect`, `enumerate`, `zip`, `chain`, `islice`, `batched`, `evenitems`/`odditems`, the combinatoric methods, ...). They stay exact as long as the underlying iterator is only advanced through this `Iter`. Does not consume the iterator.'''
+        length = self._length
+        return None if length is None else length()
 
     def next(self, default: Any = ...):
         '''Returns the next item in the iterator. If `default` is provided, it is returned if the iterator is exhausted. Otherwise, `StopIteration` is raised.'''
         if default is ...:
-            return next(self)
+            return next(self.iterator)
         else:
-            return next(self, default)
+            return next(self.iterator, default)
         
     def nth(self, n: int):
         '''Returns the `n`th item in the iterator. If the iterator is exhausted before reaching `n`, returns `None`.'''
-        for _ in range(n):
-            try:
-                item = next(self)
-            except StopIteration:
-                return None
-        return item
+        if n < 1:
+            raise ValueError("n must be at least 1.")
+        if self._seekable():
+            sequences.seek(self._source, n - 1)
+            return next(self._source, None)
+        return next(itertools.islice(self.iterator, n - 1, None), None)
         
     def reduce(self, fn: Callable[[Any, Any], Any], initial: Any = ...):
         '''Reduces the iterator to a single value by applying `fn` to each item and the previous result. If `initial` is provided, it is used as the initial value.'''
@@ -618,4 +998,53 @@ class Iter:
                 self.iterator
             )
         else:
-            return self.fold(fn, initial)
\ No newline at end of file
+            return self.fold(fn, initial)
+
+    def sample(self, k: int, seed=None) -> list:
+        '''Returns `k` items chosen uniformly at random (all of them, in order, if there are fewer), in a single pass holding only `k` items, by reservoir sampling. The order of the sample is arbitrary. `seed` seeds a private `random.Random`.'''
+        return sketch.reservoir_sample(self.iterator, k, random.Random(seed))
+
+    def stats(self) -> list[dict]:
+        '''Returns the statistics recorded since `profile` was called, one dict per stage in the order they were added: items in and out, `selectivity` (out/in), total `time` spent in `next` (including upstream stages), `exclusive_time` spent in the stage itself, split into `fn_time` spent in user functions and `overhead_time`, `time_to_first_item`, and throughput in `items_per_s`. Does not consume the iterator.'''
+        if self._settings.profiler is None:
+            raise ValueError("Profiling is not enabled; call profile() first.")
+        return self._settings.profiler.report()
+
+    def top_k(self, k: int, key: Callable | None = None, reverse: bool = False) -> list:
+        '''Returns a list of the `k` largest items, largest first, or of the `k` smallest, smallest first, if `reverse` is `True`. Only `k` items are held in memory, in a heap.'''
+        return sorting.top_k(self.iterator, k, key, reverse)
+
+    def write_csv(self, target, header: Iterable[str] | None = None, *, encoding: str = 'utf-8', dialect: str | csv.Dialect = 'excel', flush_size: int = files.FLUSH_SIZE, background: bool = False, append: bool = False, **fmtparams) -> files.Written:
+        '''Writes the items, which must be sequences, as CSV rows to `target` (a path, or a binary file object, which is left open), preceded by `header` if given. Rows are formatted in batches with `csv.writer.writerows` and written in chunks of about `flush_size` bytes; if `background` is `True`, writes happen in a separate thread. Returns the number of items and bytes written.'''
+        encode_batch = files.csv_encoder(encoding, dialect, **fmtparams)
+        return files.write_encoded(
+            target,
+            self.iterator,
+            encode_batch,
+            encode_batch([header]) if header is not None else b'',
+            flush_size,
+            background,
+            append,
+        )
+
+    def write_jsonl(self, target, *, flush_size: int = files.FLUSH_SIZE, background: bool = False, append: bool = False, **json_options) -> files.Written:
+        '''Writes the items as JSON Lines to `target` (a path, or a binary file object, which is left open). `json_options` are passed to `json.JSONEncoder`. Items are encoded in batches and written in chunks of about `flush_size` bytes; if `background` is `True`, writes happen in a separate thread. Returns the number of items and bytes written.'''
+        return files.write_encoded(
+            target,
+            self.iterator,
+            files.jsonl_encoder(**json_options),
+            flush_size=flush_size,
+            background=background,
+            append=append,
+        )
+
+    def write_lines(self, target, *, encoding: str = 'utf-8', errors: str = 'strict', newline: str = '\n', flush_size: int = files.FLUSH_SIZE, background: bool = False, append: bool = False) -> files.Written:
+        '''Writes the items, which must be strings, to `target` (a path, or a binary file object, which is left open), each followed by `newline`. Lines are joined and encoded in batches and written in chunks of about `flush_size` bytes; if `background` is `True`, writes happen in a separate thread. Returns the number of items and bytes written.'''
+        return files.write_encoded(
+            target,
+            self.iterator,
+            files.line_encoder(encoding, errors, newline),
+            flush_size=flush_size,
+            background=background,
+            append=append,
+        )
@@ -0,0 +1,110 @@
+from collections.abc import Callable, Iterator
+import time
+
+class Timer:
+    '''Accumulates the time spent in, and the number of calls to, a user callable.'''
+    __slots__ = ('calls', 'time')
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0
+
+class StageRecord:
+    '''Counters for one profiled stage.'''
+
+    def __init__(self, name: str, upstream: 'StageRecord | None'):
+        self.name = name
+        self.upstream = upstream
+        self.items_out = 0
+        self.time = 0.0
+        self.timers: list[Timer] = []
+        self.started: float | None = None
+        self.first_item: float | None = None
+
+    def report(self) -> dict:
+        upstream_time = self.upstream.time if self.upstream is not None else 0.0
+        items_in = self.upstream.items_out if self.upstream is not None else None
+        exclusive_time = max(0.0, self.time - upstream_time)
+        fn_time = sum(timer.time for timer in self.timers)
+        return {
+            'stage': self.name,
+            'items_in': items_in,
+            'items_out': self.items_out,
+            'selectivity': self.items_out / items_in if items_in else None,
+            'time': self.time,
+            'exclusive_time': exclusive_time,
+            'fn_calls': sum(timer.calls for timer in self.timers),
+            'fn_time': fn_time,
+            'overhead_time': max(0.0, exclusive_time - fn_time),
+            'time_to_first_item': None if self.first_item is None else self.first_item - self.started,
+            'items_per_s': self.items_out / self.time if self.time else None,
+        }
+
+class ProfiledIterator:
+    '''Wraps a stage's iterator, counting the items it yields and timing the calls to `next` (including the time spent upstream).'''
+
+    def __init__(self, iterator: Iterator, record: StageRecord):
+        self.iterator = iterator
+        self.record = record
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        record = self.record
+        start = time.perf_counter()
+        if record.started is None:
+            record.started = start
+        try:
+            item = next(self.iterator)
+        finally:
+            record.time += time.perf_counter() - start
+        if record.first_item is None:
+            record.first_item = time.perf_counter()
+        record.items_out += 1
+        return item
+
+def stage_name(iterator: Iterator) -> str:
+    '''Names a stage after its iterator: the enclosing method for generators defined in `Iter` methods, otherwise the iterator's type.'''
+    qualname = getattr(iterator, '__qualname__', None)
+    if qualname is not None and '.<locals>.' in qualname:
+        return qualname.split('.<locals>.')[0].rpartition('.')[2]
+    return type(iterator).__name__
+
+class Profiler:
+    '''Collects per-stage statistics for the stages of an `Iter` chain added after `Iter.profile` was called. Shared by all `Iter`s derived from the profiled one.'''
+
+    def __init__(self):
+        self.records: list[StageRecord] = []
+        self.pending: list[Timer] = []
+
+    def timed(self, fn: Callable) -> Callable:
+        '''Wraps a user callable to record its calls and time in the next stage that is added.'''
+        timer = Timer()
+        self.pending.append(timer)
+        perf_counter = time.perf_counter
+        def timed_fn(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timer.time += perf_counter() - start
+                timer.calls += 1
+        return timed_fn
+
+    def drop_pending(self):
+        '''Forgets the timers of functions that no stage was added for (such as the predicates of `Iter.fork`), so that they are not counted in the next stage.'''
+        self.pending = []
+
+    def wrap(self, iterator: Iterator, upstream: Iterator, name: str | None = None) -> ProfiledIterator:
+        '''Wraps the iterator of a new stage built on top of `upstream`.'''
+        record = StageRecord(
+            name or stage_name(iterator),
+            upstream.record if isinstance(upstream, ProfiledIterator) else None,
+        )
+        record.timers, self.pending = self.pending, []
+        self.records.append(record)
+        return ProfiledIterator(iterator, record)
+
+    def report(self) -> list[dict]:
+        return [record.report() for record in self.records]
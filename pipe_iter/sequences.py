@@ -0,0 +1,86 @@
+from collections.abc import Callable, Iterator, Sequence
+import itertools
+import operator
+
+SEEK_STEP = 16
+'''Steps at least this long are taken with `seek` by `stepping`, rather than by stepping through the items between.'''
+_SAMPLES = ([0, 1, 2, 3, 4, 5, 6, 7], (0, 1, 2, 3, 4, 5, 6, 7), range(8), range(1 << 64, (1 << 64) + 8), 'abcdefgh', 'abcdefgé', b'abcdefgh', bytearray(b'abcdefgh'))
+
+def position(iterator: Iterator) -> tuple[Sequence, int]:
+    '''Returns a sequence and an index such that the items left in a seekable iterator are `sequence[index:]`, from its `__reduce__`. Depending on the type and the Python version, the index is absolute, or `None` and the sequence is just what is left. An exhausted iterator may no longer hold its sequence, and reports an empty one.'''
+    state = iterator.__reduce__()
+    if len(state) < 3:
+        return (), 0
+    return state[1][0], state[2] or 0
+
+def seek(iterator: Iterator, n: int):
+    '''Moves a seekable iterator `n` items forward, or to its end, without stepping through the items. `__setstate__` takes an index of the same kind as `position` reports.'''
+    _, index = position(iterator)
+    iterator.__setstate__(index + n)
+
+def _probe(sample: Sequence) -> type | None:
+    '''Returns the type of the iterators of `sample` if `position` and `seek` behave as described for it on this Python version, otherwise `None`. This is checked rather than assumed, as the pickle state of these iterators is an implementation detail (Python 3.12 changed it for `range`).'''
+    try:
+        iterator = iter(sample)
+        next(iterator)
+        sequence, index = position(iterator)
+        if list(sequence[index:]) != list(sample[1:]):
+            return None
+        seek(iterator, 2)
+        if next(iterator) != sample[3]:
+            return None
+        seek(iterator, 1)
+        if next(iterator) != sample[5]:
+            return None
+        seek(iterator, 100)
+        if next(iterator, None) is not None:
+            return None
+    except Exception:
+        return None
+    return type(iterator)
+
+SEEKABLE = frozenset(filter(None, map(_probe, _SAMPLES)))
+'''Types of the iterators of built-in sequences that can be moved to any index of their sequence with `__setstate__` (the hook `pickle` uses), which makes positional methods O(1). Only types whose behavior was checked by `_probe` are included; others fall back to stepping through items.'''
+
+def seekable(iterator: Iterator) -> bool:
+    return type(iterator) in SEEKABLE
+
+def _deferred(fn: Callable[[], Iterator]) -> Iterator:
+    '''Yields the items of the iterator returned by `fn`, which is only called when the result is first advanced, as `itertools` stages only read their input then. The call goes through `starmap` and `chain.from_iterable`, which cost nothing per item.'''
+    return itertools.chain.from_iterable(itertools.starmap(fn, [()]))
+
+def seeking(iterator: Iterator, n: int) -> Iterator:
+    '''Equivalent to `itertools.islice(iterator, n, None)` for a seekable iterator: skips `n` items with `seek` when first advanced, then yields from `iterator` itself.'''
+    def skipped():
+        seek(iterator, n)
+        return iterator
+    return _deferred(skipped)
+
+def stepping(iterator: Iterator, start: int, stop: int | None, step: int) -> Iterator:
+    '''Equivalent to `itertools.islice(iterator, start, stop, step)` for a seekable iterator, consuming the same items at the same points, so that other readers of `iterator` see no difference. The first `start` items are skipped with `seek`. Steps shorter than `SEEK_STEP` are then taken by `islice` itself; longer ones seek past the items between those yielded, which costs a Python call per item yielded rather than a C call per item skipped.'''
+    if step < SEEK_STEP:
+        return itertools.islice(seeking(iterator, start), None, None if stop is None else stop - start, step)
+    def item_after(skip):
+        seek(iterator, skip)
+        return next(iterator)
+    skips = itertools.chain((start,), itertools.repeat(step - 1))
+    if stop is None:
+        return map(item_after, skips)
+    n = len(range(start, stop, step))
+    def finish():
+        seek(iterator, stop - (start + (n - 1) * step) - 1)
+        return iter(())
+    return itertools.chain(map(item_after, itertools.islice(skips, n)), _deferred(finish))
+
+def cycling(iterator: Iterator) -> Iterator:
+    '''Equivalent to `itertools.cycle(iterator)` for a seekable iterator, but repeats the items by iterating their sequence again instead of saving them as they are yielded. The items to repeat are those left when the result is first advanced. A `list` source is iterated in place, so later changes to it show in later cycles. This trades the memory of `cycle` for some speed: iterating a `range` again creates its `int`s again.'''
+    rest = []
+    def first_pass():
+        sequence, index = position(iterator)
+        rest.append(sequence if index == 0 else sequence[index:])
+        return iterator
+    passes = itertools.chain(
+        itertools.starmap(first_pass, [()]),
+        itertools.takewhile(bool, map(operator.itemgetter(0), itertools.repeat(rest))),
+    )
+    return itertools.chain.from_iterable(passes)
@@ -0,0 +1,74 @@
+from collections.abc import Callable, Iterable, Iterator, Sized
+import itertools
+
+Length = Callable[[], int | None]
+'''The remaining length of an `Iter`: a function returning the number of items left, or `None` if it is not known. Lengths are exact as long as the underlying iterator is only advanced through the `Iter` chain.'''
+
+def source_length(iterable: Iterable, iterator: Iterator) -> Length | None:
+    '''Returns the length of a new source, if `iterable` is a sized collection whose iterator reports its exact remaining length (as the iterators of built-in collections and `range` do), or an `Iter` with a known length.'''
+    length = _iter_length(iterable)
+    if length is not None:
+        return length
+    if iterator is iterable or not isinstance(iterable, Sized):
+        return None
+    return getattr(iterator, '__length_hint__', None)
+
+def sources(iterables: tuple[Iterable, ...]) -> tuple[list[Iterator], list[Length | None]]:
+    '''Calls `iter` on each of `iterables`, returning the iterators and their lengths.'''
+    iterators = [iter(iterable) for iterable in iterables]
+    return iterators, [source_length(iterable, iterator) for iterable, iterator in zip(iterables, iterators)]
+
+def len_if_known(iterable: Iterable) -> int | None:
+    '''The length of an iterable that `product` and similar stages will consume as a whole: `len` of sized collections, or the known length of an `Iter`.'''
+    if isinstance(iterable, Sized):
+        return len(iterable)
+    length = _iter_length(iterable)
+    return None if length is None else length()
+
+def _iter_length(iterable: Iterable) -> Length | None:
+    '''The length of `iterable` if it is an `Iter`, which is imported here as it depends on this module.'''
+    from .pipe_iter import Iter
+    return iterable._length if isinstance(iterable, Iter) else None
+
+def scaled(length: Length | None, fn: Callable[[int], int]) -> Length | None:
+    '''The length of a stage yielding `fn(n)` items when `n` items are left upstream.'''
+    if length is None:
+        return None
+    def scaled_length():
+        n = length()
+        return None if n is None else fn(n)
+    return scaled_length
+
+def combined(lengths: list[Length | None], fn: Callable[..., int]) -> Length | None:
+    '''The length of a stage over several sources (such as `zip` or `chain`), if all of their lengths are known.'''
+    if any(length is None for length in lengths):
+        return None
+    def combined_length():
+        ns = [length() for length in lengths]
+        return None if None in ns else fn(*ns)
+    return combined_length
+
+def islice_length(length: Length | None, start: int | None, stop: int | None, step: int | None) -> Length | None:
+    '''The length of `itertools.islice(iterator, start, stop, step)`. The number of items consumed from upstream since the slice was created tells which of its indices were already yielded.'''
+    if length is None:
+        return None
+    initial = length()
+    if initial is None:
+        return None
+    indices = range(start or 0, initial if stop is None else min(stop, initial), step or 1)
+    def islice_length():
+        n = length()
+        if n is None:
+            return None
+        yielded = range(indices.start, min(initial - n, indices.stop), indices.step)
+        return len(indices) - len(yielded)
+    return islice_length
+
+def counted(iterator: Iterator, total: int) -> tuple[Iterator, Length]:
+    '''Pairs `iterator`, which is expected to yield `total` items, with a counter of the items left, for stages whose remaining length cannot be derived from upstream (e.g. `combinations`, which consumes its input at once). The counter is `itertools.repeat(True, total)`, followed by an endless `repeat(True)` so that it never cuts the items short, used as the selectors of `itertools.compress`, which passes the items through unchanged, in C. If the source grows after the stage is built, the extra items are still yielded and the length bottoms out at 0.'''
+    countdown = itertools.repeat(True, total)
+    selectors = itertools.chain(countdown, itertools.repeat(True))
+    return itertools.compress(iterator, selectors), countdown.__length_hint__
+
+def ceil_div(n: int, d: int) -> int:
+    return -(-n // d)
@@ -0,0 +1,182 @@
+import bisect
+from collections.abc import Hashable, Iterable, Iterator
+import itertools
+import math
+import random
+
+MASK64 = (1 << 64) - 1
+_END = object()
+
+def spread(item: Hashable) -> int:
+    '''Spreads the `hash` of `item` over 64 bits by Fibonacci hashing (one multiplication by 2**64 divided by the golden ratio). Python hashes small `int`s to themselves, which would otherwise fill nearby bits.'''
+    return hash(item) * 0x9e3779b97f4a7c15 & MASK64
+
+class BloomFilter:
+    '''A set membership sketch of fixed size: `add` reports whether an item may have been added before, with no false negatives and false positives at about `error_rate` once `capacity` distinct items have been added. Uses `ceil(-capacity * ln(error_rate) / ln(2)**2)` bits, and derives its bit positions from one 64-bit hash (see `spread`) by double hashing. Hashes come from `hash`, so a filter is only meaningful within one process.'''
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1.")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def add(self, item: Hashable) -> bool:
+        '''Adds `item`, returning `True` if it was (probably) already present. `spread` is inlined, as this runs once per item.'''
+        h = hash(item) * 0x9e3779b97f4a7c15 & MASK64
+        h1 = h >> 32
+        h2 = h & 0xffffffff | 1
+        bits = self.bits
+        size = self.size
+        present = True
+        for position in range(h1, h1 + self.hashes * h2, h2):
+            position %= size
+            byte = bits[position >> 3]
+            mask = 1 << (position & 7)
+            if not byte & mask:
+                bits[position >> 3] = byte | mask
+                present = False
+        return present
+
+    def __contains__(self, item: Hashable) -> bool:
+        h = spread(item)
+        h1 = h >> 32
+        h2 = h & 0xffffffff | 1
+        for position in range(h1, h1 + self.hashes * h2, h2):
+            position %= self.size
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+class HyperLogLog:
+    '''A distinct count sketch (HyperLogLog) of `2**precision` one-byte registers, with a relative standard error of about `1.04 / sqrt(2**precision)`: 0.8% for the default precision of 14, in 16 KiB. Hashes come from `hash`, so a sketch is only meaningful within one process.'''
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18.")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def update(self, iterable: Iterable[Hashable]):
+        '''Adds the items of `iterable`. Hashes are scrambled with the SplitMix64 finalizer, inlined, so that every bit depends on every bit of `hash`; the first `precision` bits pick a register, which keeps the highest rank (position of the first 1 bit) among the rest of the hashes that pick it.'''
+        registers = self.registers
+        shift = 64 - self.precision
+        low = (1 << shift) - 1
+        for item in iterable:
+            h = (hash(item) + 0x9e3779b97f4a7c15) & MASK64
+            h = ((h ^ (h >> 30)) * 0xbf58476d1ce4e5b9) & MASK64
+            h = ((h ^ (h >> 27)) * 0x94d049bb133111eb) & MASK64
+            h ^= h >> 31
+            i = h >> shift
+            rank = shift + 1 - (h & low).bit_length()
+            if rank > registers[i]:
+                registers[i] = rank
+        return self
+
+    def estimate(self) -> int:
+        '''The estimated number of distinct items, with linear counting for small cardinalities.'''
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / math.fsum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+class QuantileSketch:
+    '''A streaming quantile sketch (KLL). Items are kept in a hierarchy of compactors whose capacities shrink by 2/3 per level below the top one, of `k` items; when the sketch is full, the lowest full compactor is sorted and every other item, from a random offset, is promoted with twice the weight. `k = ceil(2.7 / eps)` keeps the rank error of each quantile within `eps` with about 99% probability, retaining about `3k` items.'''
+
+    def __init__(self, eps: float = 0.01, rng: random.Random | None = None):
+        if not 0 < eps < 1:
+            raise ValueError("eps must be between 0 and 1.")
+        self.k = max(8, math.ceil(2.7 / eps))
+        self.rng = rng or random.Random()
+        self.compactors: list[list] = []
+        self.count = 0
+        self._grow()
+
+    def _capacity(self, level: int) -> int:
+        return math.ceil(self.k * (2 / 3) ** (len(self.compactors) - level - 1)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_size = sum(map(self._capacity, range(len(self.compactors))))
+
+    @property
+    def size(self) -> int:
+        '''The number of items retained.'''
+        return sum(map(len, self.compactors))
+
+    def update(self, iterable: Iterable):
+        '''Adds the items of `iterable`, taking them in slices that fill the sketch with `list.extend`.'''
+        iterator = iter(iterable)
+        while True:
+            room = self.max_size - self.size
+            before = len(self.compactors[0])
+            self.compactors[0].extend(itertools.islice(iterator, max(room, 1)))
+            added = len(self.compactors[0]) - before
+            self.count += added
+            if added < max(room, 1):
+                return self
+            self._compress()
+
+    def _compress(self):
+        for level, compactor in enumerate(self.compactors):
+            if len(compactor) >= self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self._grow()
+                compactor.sort()
+                kept = compactor.pop() if len(compactor) % 2 else None
+                self.compactors[level + 1].extend(compactor[self.rng.getrandbits(1)::2])
+                compactor.clear()
+                if kept is not None:
+                    compactor.append(kept)
+                return
+
+    def quantiles(self, qs: Iterable[float]) -> list:
+        '''Returns the estimated item at each quantile in `qs` (between 0 and 1), or `None`s if no items were added.'''
+        qs = list(qs)
+        if any(not 0 <= q <= 1 for q in qs):
+            raise ValueError("Quantiles must be between 0 and 1.")
+        weighted = sorted(
+            (item, 1 << level)
+            for level, compactor in enumerate(self.compactors)
+            for item in compactor
+        )
+        if not weighted:
+            return [None] * len(qs)
+        items = [item for item, _ in weighted]
+        ranks = list(itertools.accumulate(weight for _, weight in weighted))
+        total = ranks[-1]
+        return [items[min(bisect.bisect_left(ranks, q * total), len(items) - 1)] for q in qs]
+
+def reservoir_sample(iterator: Iterator, k: int, rng: random.Random) -> list:
+    '''Returns `k` items chosen uniformly at random from `iterator` (all of them, if there are fewer), in no particular order. Uses Algorithm L, which draws the number of items to skip before the next replacement, so that skipped items are consumed by `itertools.islice` in C and only O(k log(n/k)) random numbers are drawn.'''
+    if k < 0:
+        raise ValueError("k must not be negative.")
+    reservoir = list(itertools.islice(iterator, k))
+    if len(reservoir) < k or k == 0:
+        return reservoir
+    w = math.exp(math.log(_open_unit(rng)) / k)
+    while True:
+        skip = math.floor(math.log(_open_unit(rng)) / math.log1p(-w)) if w < 1 else 0
+        item = next(itertools.islice(iterator, skip, None), _END)
+        if item is _END:
+            return reservoir
+        reservoir[rng.randrange(k)] = item
+        w *= math.exp(math.log(_open_unit(rng)) / k)
+
+def _open_unit(rng: random.Random) -> float:
+    '''A uniform random number in (0, 1).'''
+    while True:
+        u = rng.random()
+        if u:
+            return u
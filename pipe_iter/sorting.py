@@ -0,0 +1,66 @@
+from collections.abc import Callable, Iterable, Iterator
+import heapq
+import itertools
+import pickle
+import tempfile
+
+from .sizing import Length, counted
+
+RUN_BATCH = 1024
+'''Number of items per `pickle.dump` when a sorted run is written to disk, and so per read when runs are merged.'''
+
+def top_k(iterable: Iterable, k: int, key: Callable | None = None, reverse: bool = False) -> list:
+    '''Returns the `k` largest items in descending order, or the `k` smallest in ascending order if `reverse` is `True`, keeping only `k` items in a heap at any time. Equal items keep their order, as with `sorted`.'''
+    if k < 0:
+        raise ValueError("k must not be negative.")
+    if reverse:
+        return heapq.nsmallest(k, iterable, key)
+    return heapq.nlargest(k, iterable, key)
+
+class Runs:
+    '''Sorted runs pickled to one temporary file. Each run is a list of offsets of its batches, which are read back one at a time.'''
+
+    def __init__(self, spill_dir: str | None, batch: int):
+        self.file = tempfile.TemporaryFile(dir=spill_dir)
+        self.batch = batch
+        self.runs: list[list[int]] = []
+
+    def write(self, run: list):
+        file = self.file
+        offsets = []
+        for i in range(0, len(run), self.batch):
+            offsets.append(file.tell())
+            pickle.dump(run[i:i + self.batch], file, pickle.HIGHEST_PROTOCOL)
+        self.runs.append(offsets)
+
+    def _load(self, offset: int) -> list:
+        self.file.seek(offset)
+        return pickle.load(self.file)
+
+    def read(self) -> list[Iterator]:
+        return [itertools.chain.from_iterable(map(self._load, offsets)) for offsets in self.runs]
+
+def external_sorted(iterator: Iterator, key: Callable | None = None, reverse: bool = False, max_memory: int | None = None, spill_dir: str | None = None, batch: int = RUN_BATCH) -> tuple[Iterator, Length]:
+    '''Sorts the items of `iterator`, holding at most `max_memory` of them in memory (all of them if `None`), and returns an iterator over the sorted items and its length. Larger inputs are split into sorted runs of `max_memory` items, which are written to a temporary file in `spill_dir` and merged lazily with `heapq.merge`; the last run stays in memory. The sort is stable. The temporary file is deleted once the returned iterator is garbage collected.'''
+    if max_memory is None:
+        items = iter(sorted(iterator, key=key, reverse=reverse))
+        return items, items.__length_hint__
+    if max_memory < 1:
+        raise ValueError("max_memory must be at least 1.")
+    runs = None
+    count = 0
+    carried = []
+    while True:
+        run = carried + list(itertools.islice(iterator, max_memory - len(carried)))
+        carried = list(itertools.islice(iterator, 1))
+        run.sort(key=key, reverse=reverse)
+        count += len(run)
+        if not carried:
+            break
+        if runs is None:
+            runs = Runs(spill_dir, batch)
+        runs.write(run)
+    if runs is None:
+        items = iter(run)
+        return items, items.__length_hint__
+    return counted(heapq.merge(*runs.read(), run, key=key, reverse=reverse), count)
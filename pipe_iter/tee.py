@@ -0,0 +1,152 @@
+from collections.abc import Iterator
+import threading
+
+from .buffer import BufferOverflowError, check_policy
+from .pipe_iter import Iter
+
+TEE_POLICIES = ('block', 'raise', 'drop')
+_DETACHED = float('inf')
+_EMPTY = object()
+
+class Tee:
+    '''Splits an iterator into `n` branches that each yield every item, like `itertools.tee`, but with a shared buffer bounded by `max_lag`: no branch may fall more than `max_lag` items behind the one furthest ahead. Thread-safe: branches may be consumed from different threads. Records the current and maximum lag of each branch, and the number of items dropped from it.'''
+
+    @classmethod
+    def tee(cls, iterator: Iter | Iterator, n: int = 2, max_lag: int = 1024, on_overflow: str = 'raise') -> list['TeeBranch']:
+        '''Splits `iterator` into `n` `TeeBranch`es. When the branch furthest ahead would take another branch more than `max_lag` items behind, it either raises `BufferOverflowError` (`on_overflow='raise'`, the default), drops the oldest items from the lagging branches (`'drop'`), or blocks until that branch is consumed from another thread (`'block'`); blocking is only for branches consumed by separate threads, as a single consumer would wait forever.'''
+        if isinstance(iterator, Iter):
+            iterator = iterator.iterator
+        return cls(iter(iterator), n, max_lag, on_overflow).branches
+
+    def __init__(self, iterator: Iterator, n: int, max_lag: int, on_overflow: str):
+        check_policy(on_overflow, TEE_POLICIES)
+        if n < 1:
+            raise ValueError("n must be at least 1.")
+        if max_lag < 1:
+            raise ValueError("max_lag must be at least 1.")
+        self.iterator = iterator
+        self.max_lag = max_lag
+        self.on_overflow = on_overflow
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.buffer = []
+        self.base = 0
+        self.offset = 0
+        self.head = 0
+        self.exhausted = False
+        self.lookahead = _EMPTY
+        self.waiting = 0
+        self.positions = [0] * n
+        self.max_lags = [0] * n
+        self.dropped = [0] * n
+        self.branches = [TeeBranch(self, i) for i in range(n)]
+
+    def _trim(self):
+        '''Discards the buffered items that every branch has passed. The buffer is a list holding the items from position `base`, of which the first `offset` have been passed; they are deleted together once they make up half of the list, so that reading any position stays O(1) and trimming is O(1) amortized.'''
+        self.offset = min(min(self.positions), self.head) - self.base
+        if 2 * self.offset >= len(self.buffer):
+            del self.buffer[:self.offset]
+            self.base += self.offset
+            self.offset = 0
+
+    def _drop(self):
+        '''Moves the branches that are more than `max_lag` items behind forward, dropping the oldest items.'''
+        first_kept = self.head - self.max_lag
+        for i, position in enumerate(self.positions):
+            if position < first_kept:
+                self.max_lags[i] = self.max_lag
+                self.dropped[i] += first_kept - position
+                self.positions[i] = first_kept
+        self._trim()
+
+    def pull(self, i: int):
+        '''Returns the next item for branch `i`, from the buffer if it is behind, otherwise from the shared iterator. A new item is pulled before the lag is checked, so that the end of the iterator is never reported as an overflow; if it cannot be yielded yet, it is held as the lookahead.'''
+        positions = self.positions
+        with self.lock:
+            while True:
+                position = positions[i]
+                if position == _DETACHED:
+                    raise StopIteration
+                if position < self.head:
+                    if self.head - position > self.max_lags[i]:
+                        self.max_lags[i] = self.head - position
+                    item = self.buffer[position - self.base]
+                    positions[i] = position + 1
+                    if position == self.base + self.offset:
+                        self._trim()
+                        if self.waiting:
+                            self.condition.notify_all()
+                    return item
+                if self.lookahead is _EMPTY:
+                    if self.exhausted:
+                        raise StopIteration
+                    try:
+                        self.lookahead = next(self.iterator)
+                    except StopIteration:
+                        self.exhausted = True
+                        raise
+                if self.on_overflow != 'drop' and self.head + 1 - min(positions) > self.max_lag:
+                    if self.on_overflow == 'raise':
+                        raise BufferOverflowError(f"Tee branch would lag by more than max_lag={self.max_lag}.")
+                    self.waiting += 1
+                    self.condition.wait()
+                    self.waiting -= 1
+                    continue
+                item, self.lookahead = self.lookahead, _EMPTY
+                self.head += 1
+                positions[i] = self.head
+                if len(positions) == 1:
+                    return item
+                self.buffer.append(item)
+                if self.on_overflow == 'drop' and self.head - min(positions) > self.max_lag:
+                    self._drop()
+                return item
+
+    def detach(self, i: int):
+        '''Stops buffering items for branch `i`, so that it no longer holds back the others.'''
+        with self.lock:
+            self.positions[i] = _DETACHED
+            self._trim()
+            self.condition.notify_all()
+
+    def lag(self, i: int) -> int:
+        '''The number of items branch `i` is behind the branch furthest ahead.'''
+        position = self.positions[i]
+        return 0 if position == _DETACHED else self.head - position
+
+    def stats(self) -> list[dict]:
+        '''Returns, for each branch, its current `lag`, the maximum lag it has had, and the number of items `dropped` from it. The maximum lag of a branch is recorded when it catches up, which is when its lag is at a peak.'''
+        with self.lock:
+            return [
+                {'lag': self.lag(i), 'max_lag': max(self.max_lags[i], self.lag(i)), 'dropped': self.dropped[i]}
+                for i in range(len(self.positions))
+            ]
+
+class TeeBranch:
+    '''One of the iterators created by `Tee.tee`.'''
+
+    def __init__(self, tee: Tee, index: int):
+        self.tee = tee
+        self.index = index
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.tee.pull(self.index)
+
+    @property
+    def lag(self) -> int:
+        return self.tee.lag(self.index)
+
+    @property
+    def max_lag(self) -> int:
+        return max(self.tee.max_lags[self.index], self.lag)
+
+    @property
+    def dropped(self) -> int:
+        return self.tee.dropped[self.index]
+
+    def close(self):
+        '''Detaches this branch, which yields no further items.'''
+        self.tee.detach(self.index)
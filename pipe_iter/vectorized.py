@@ -0,0 +1,47 @@
+from collections.abc import Callable, Iterable
+import itertools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def require_numpy(method: str):
+    '''Raises `ImportError` if NumPy is not installed.'''
+    if np is None:
+        raise ImportError(f"Iter.{method} requires NumPy, which is not installed.")
+
+def to_array(batch: tuple, dtype=None):
+    '''Converts a batch to a NumPy array. Batches of tuples become structured arrays with fields `f0`, `f1`, ... unless `dtype` says otherwise.'''
+    if dtype is None and batch and isinstance(batch[0], tuple):
+        return np.rec.fromrecords(list(batch)).view(np.ndarray)
+    return np.array(batch, dtype=dtype)
+
+def batch_call(fn: Callable, array, stars: int):
+    '''Calls `fn` on a batch array. With star settings, the fields of a structured array are passed as separate positional (`stars=1`) or keyword (`stars=2`) arguments.'''
+    if stars and array.dtype.names is None:
+        raise ValueError(f"star/doublestar batches need tuple items or a structured dtype, got an array of {array.dtype}.")
+    match stars:
+        case 0:
+            return fn(array)
+        case 1:
+            return fn(*(array[name] for name in array.dtype.names))
+        case 2:
+            return fn(**{name: array[name] for name in array.dtype.names})
+        case _:
+            raise ValueError("Corrupted Iter: invalid _stars value")
+
+def map_batches(batches: Iterable[tuple], fn: Callable, stars: int, dtype=None):
+    '''Calls `fn` once per batch and yields the elements of the results as Python objects.'''
+    def run(batch):
+        return np.asarray(batch_call(fn, to_array(batch, dtype), stars)).tolist()
+    return itertools.chain.from_iterable(map(run, batches))
+
+def filter_batches(batches: Iterable[tuple], predicate: Callable, stars: int, dtype=None):
+    '''Calls `predicate` once per batch to get a boolean mask, and yields the original items it selects.'''
+    def run(batch):
+        mask = np.asarray(batch_call(predicate, to_array(batch, dtype), stars), dtype=bool)
+        if mask.shape != (len(batch),):
+            raise ValueError(f"Mask of shape {mask.shape} does not match batch of {len(batch)} items.")
+        return itertools.compress(batch, mask.tolist())
+    return itertools.chain.from_iterable(map(run, batches))
@@ -0,0 +1,110 @@
+from collections import deque
+from collections.abc import Iterator
+import itertools
+import queue
+import threading
+import time
+
+_END = object()
+
+class _Raised:
+    '''Carries an exception raised by the source from the reader thread to the consumer.'''
+    __slots__ = ('exception',)
+
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+def _read_into(iterator: Iterator, items: queue.Queue, stop: threading.Event):
+    '''Reader thread body: puts the items of `iterator` into `items`, followed by `_END` or the exception raised by the source. Gives up as soon as `stop` is set.'''
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+    try:
+        for item in iterator:
+            if not put(item):
+                return
+    except Exception as e:
+        put(_Raised(e))
+    else:
+        put(_END)
+
+def time_batches(iterator: Iterator, max_items: int, max_latency_s: float) -> Iterator[tuple]:
+    '''Yields tuples of up to `max_items` items, emitting a partial batch once `max_latency_s` seconds have passed since its first item arrived. The source is read by a daemon thread, so a blocking `next` cannot delay a flush; at most `2 * max_items` items are read ahead. The thread is started on the first `next` and stopped when the generator finishes or is closed.'''
+    if max_items < 1:
+        raise ValueError("max_items must be at least 1.")
+    if max_latency_s <= 0:
+        raise ValueError("max_latency_s must be positive.")
+    def batches():
+        items = queue.Queue(maxsize=2 * max_items)
+        stop = threading.Event()
+        reader = threading.Thread(target=_read_into, args=(iterator, items, stop), daemon=True)
+        reader.start()
+        get = items.get
+        monotonic = time.monotonic
+        batch = []
+        deadline = None
+        try:
+            while True:
+                if deadline is None:
+                    item = get()
+                else:
+                    remaining = deadline - monotonic()
+                    try:
+                        if remaining <= 0:
+                            raise queue.Empty
+                        item = get(timeout=remaining)
+                    except queue.Empty:
+                        yield tuple(batch)
+                        batch = []
+                        deadline = None
+                        continue
+                if item is _END:
+                    break
+                if type(item) is _Raised:
+                    if batch:
+                        yield tuple(batch)
+                    raise item.exception
+                if not batch:
+                    deadline = monotonic() + max_latency_s
+                batch.append(item)
+                if len(batch) >= max_items:
+                    yield tuple(batch)
+                    batch = []
+                    deadline = None
+            if batch:
+                yield tuple(batch)
+        finally:
+            stop.set()
+    return batches()
+
+def sliding_windows(iterator: Iterator, n: int, step: int = 1) -> Iterator[tuple]:
+    '''Yields tuples of `n` consecutive items, each window starting `step` items after the previous one. Items are kept in a ring buffer (a `deque` with `maxlen=n`), so moving the window costs `step` appends rather than rebuilding it. Trailing items that do not fill a window are dropped.'''
+    if n < 1:
+        raise ValueError("n must be at least 1.")
+    if step < 1:
+        raise ValueError("step must be at least 1.")
+    if n == 2 and step == 1:
+        return itertools.pairwise(iterator)
+    def windows():
+        window = deque(itertools.islice(iterator, n), maxlen=n)
+        if len(window) < n:
+            return
+        yield tuple(window)
+        if step == 1:
+            append = window.append
+            for item in iterator:
+                append(item)
+                yield tuple(window)
+            return
+        while True:
+            chunk = tuple(itertools.islice(iterator, step))
+            if len(chunk) < step:
+                return
+            window.extend(chunk)
+            yield tuple(window)
+    return windows()
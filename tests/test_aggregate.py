@@ -0,0 +1,165 @@
+import collections
+import math
+import operator
+import statistics
+
+from pipe_iter import CountIf, Fold, Iter
+from pipe_iter.aggregate import Accumulator, Sum
+from pytest import mark, raises
+
+ITEMS = [(f'k{(i * 37) % 101}', i) for i in range(3000)]
+
+def grouped(agg):
+    groups = collections.defaultdict(list)
+    for key, value in ITEMS:
+        groups[key].append(value)
+    return {key: agg(values) for key, values in groups.items()}
+
+def first(item):
+    return item[0]
+
+def second(item):
+    return item[1]
+
+@mark.parametrize('max_groups', [None, 1, 10, 100, 101, 1000])
+@mark.parametrize('agg, expected', [
+    ('count', len),
+    ('sum', sum),
+    ('min', min),
+    ('max', max),
+    ('list', list),
+])
+def test_group_aggregate(tmp_path, max_groups, agg, expected):
+    result = Iter(ITEMS).group_aggregate(first, agg, value=second, max_groups_in_memory=max_groups, spill_dir=tmp_path).collect(list)
+    assert len(result) == 101
+    assert dict(result) == grouped(expected)
+
+def test_group_aggregate_items_and_order():
+    words = 'the quick brown fox jumps over the lazy dog'.split()
+    assert Iter(words).group_aggregate(len).collect(list) == [
+        (3, ['the', 'fox', 'the', 'dog']),
+        (5, ['quick', 'brown', 'jumps']),
+        (4, ['over', 'lazy']),
+    ]
+    assert Iter(words).group_aggregate(len, 'count', max_groups_in_memory=1).collect(list)[0] == (3, 4)
+
+def test_group_aggregate_fold():
+    assert dict(Iter(ITEMS).group_aggregate(first, Fold(operator.mul, 1), value=lambda item: item[1] % 3 + 1, max_groups_in_memory=7).collect(list)) == grouped(lambda values: math.prod(value % 3 + 1 for value in values))
+
+def test_group_aggregate_custom_accumulator():
+    class Mean(Accumulator):
+        def start(self, value):
+            return [value, 1]
+        def add(self, state, value):
+            state[0] += value
+            state[1] += 1
+            return state
+        def result(self, state):
+            return state[0] / state[1]
+    result = dict(Iter(ITEMS).group_aggregate(first, Mean(), value=second, max_groups_in_memory=5).collect(list))
+    assert result == grouped(lambda values: sum(values) / len(values))
+
+def test_group_aggregate_is_lazy_and_validates():
+    consumed = []
+    itr = Iter(ITEMS).inspect(consumed.append).group_aggregate(first)
+    assert consumed == []
+    itr.next()
+    assert len(consumed) == len(ITEMS)
+    with raises(ValueError):
+        Iter(ITEMS).group_aggregate(first, 'median')
+    with raises(ValueError):
+        Iter(ITEMS).group_aggregate(first, max_groups_in_memory=0)
+
+def test_aggregate():
+    data = [3, -1, 4, 1, -5, 9, 2, 6]
+    result = Iter(data).aggregate(
+        n='count',
+        total='sum',
+        low='min',
+        high='max',
+        mean='mean',
+        var='var',
+        head='first',
+        tail='last',
+        some='any',
+        every='all',
+        negative=CountIf(lambda x: x < 0),
+        product=Fold(operator.mul, 1),
+    )
+    assert result == {
+        'n': 8,
+        'total': 19,
+        'low': -5,
+        'high': 9,
+        'mean': statistics.mean(data),
+        'var': result['var'],
+        'head': 3,
+        'tail': 6,
+        'some': True,
+        'every': True,
+        'negative': 2,
+        'product': math.prod(data),
+    }
+    assert math.isclose(result['var'], statistics.variance(data))
+
+def test_aggregate_empty_and_single():
+    assert Iter([]).aggregate(n='count', total='sum', low='min', mean='mean', some='any', every='all', product=Fold(operator.mul, 1)) == {
+        'n': 0, 'total': 0, 'low': None, 'mean': None, 'some': False, 'every': True, 'product': 1,
+    }
+    assert Iter([5]).aggregate(var='var', items='list', every='all') == {'var': None, 'items': [5], 'every': True}
+    assert Iter([0, '', 1]).aggregate(some='any', every='all') == {'some': True, 'every': False}
+
+def test_aggregate_custom_accumulator():
+    class Range(Accumulator):
+        def start(self, value):
+            return value, value
+        def add(self, state, value):
+            return min(state[0], value), max(state[1], value)
+        def result(self, state):
+            return state[1] - state[0]
+    consumed = []
+    result = Iter(range(100)).inspect(consumed.append).aggregate(spread=Range(), odd=CountIf(lambda x: x % 2))
+    assert result == {'spread': 99, 'odd': 50}
+    assert consumed == list(range(100))
+    with raises(ValueError):
+        Iter([]).aggregate(x='median')
+
+def test_aggregate_subclass_overriding_add():
+    class Capped(Sum):
+        def add(self, state, value):
+            return min(state + value, 10)
+    assert Iter(range(1, 6)).aggregate(total=Capped()) == {'total': 10}
+    assert Iter(range(1, 6)).group_aggregate(bool, Capped()).collect(list) == [(True, 10)]
+
+def test_accumulator_abstract():
+    with raises(TypeError):
+        Accumulator()
+    class StartOnly(Accumulator):
+        def start(self, value):
+            return value
+    with raises(TypeError):
+        StartOnly()
+
+def test_aggregate_custom_bindings():
+    class SumOf(Accumulator):
+        inline = '{s} = {s} + {fn}(x)'
+        bindings = ('fn',)
+        def __init__(self, fn):
+            self.fn = fn
+        def start(self, value):
+            return self.fn(value)
+        def add(self, state, value):
+            return state + self.fn(value)
+    assert Iter(range(5)).aggregate(squares=SumOf(lambda x: x * x), cubes=SumOf(lambda x: x ** 3), odd=CountIf(lambda x: x % 2)) == {'squares': 30, 'cubes': 100, 'odd': 2}
+    assert Iter(range(5)).group_aggregate(bool, SumOf(abs)).collect(list) == [(False, 0), (True, 10)]
+
+def test_aggregate_keeps_items():
+    items = [[1], [2], [3]]
+    assert Iter(items).aggregate(total='sum', all_items=Fold(operator.add, [])) == {'total': [1, 2, 3], 'all_items': [1, 2, 3]}
+    assert items == [[1], [2], [3]]
+    assert dict(Iter(items).group_aggregate(len, 'sum').collect(list)) == {1: [1, 2, 3]}
+    assert items == [[1], [2], [3]]
+
+def test_group_aggregate_new_accumulators():
+    assert dict(Iter(ITEMS).group_aggregate(first, 'mean', value=second, max_groups_in_memory=10).collect(list)) == grouped(statistics.mean)
+    assert dict(Iter(ITEMS).group_aggregate(first, 'last', value=second).collect(list)) == grouped(lambda values: values[-1])
@@ -0,0 +1,94 @@
+import asyncio
+from pipe_iter import AsyncIter, Iter
+from pytest import raises
+
+async def agen(n):
+    for i in range(n):
+        await asyncio.sleep(0)
+        yield i
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_lazy_methods():
+    assert run(AsyncIter(agen(10)).map(lambda x: x * 2).filter(lambda x: x % 3).collect(list)) == [2, 4, 8, 10, 14, 16]
+    assert run(AsyncIter(agen(7)).batched(3).collect(list)) == [(0, 1, 2), (3, 4, 5), (6,)]
+    assert run(AsyncIter(agen(5)).batched(2, fillvalue=None).collect(list)) == [(0, 1), (2, 3), (4, None)]
+    assert run(AsyncIter(agen(10)).skip(2).take(3).collect(list)) == [2, 3, 4]
+    assert run(AsyncIter(agen(10)).islice(1, 8, 3).collect(list)) == [1, 4, 7]
+    assert run(AsyncIter('ab').enumerate(1).collect(list)) == [(1, 'a'), (2, 'b')]
+    assert run(AsyncIter(agen(6)).takewhile(lambda x: x < 3).collect(list)) == [0, 1, 2]
+    assert run(AsyncIter(agen(6)).dropwhile(lambda x: x < 3).collect(list)) == [3, 4, 5]
+    assert run(AsyncIter([[1, 2], agen(2)]).flatten().collect(list)) == [1, 2, 0, 1]
+    assert run(AsyncIter(agen(2)).chain([5], agen(1)).collect(list)) == [0, 1, 5, 0]
+    assert run(AsyncIter([1, None, 2]).filter_map(lambda x: x).collect(list)) == [1, 2]
+
+def test_settings():
+    assert run(AsyncIter([(1, 2), (3, 4)]).star().map(lambda x, y: x * y).collect(list)) == [2, 12]
+    assert run(AsyncIter([1, 'a']).fallible(0).map(lambda x: x + 1).collect(list)) == [2, 0]
+
+def test_consuming_methods():
+    assert run(AsyncIter(agen(10)).fold(lambda acc, x: acc + x, 0)) == 45
+    assert run(AsyncIter(agen(10)).reduce(lambda acc, x: acc + x)) == 45
+    assert run(AsyncIter(agen(10)).count_if(lambda x: x % 2)) == 5
+    assert run(AsyncIter(agen(10)).nth(3)) == 2
+    with raises(ValueError):
+        run(AsyncIter(agen(10)).nth(0))
+    assert run(AsyncIter([1, 1, 0]).all()) is False
+    assert run(AsyncIter([0, 0, 1]).any()) is True
+    assert run(AsyncIter(agen(10)).find(lambda x: x > 4)) == 5
+    with raises(TypeError):
+        run(AsyncIter([]).reduce(lambda acc, x: acc + x))
+
+def test_amap():
+    async def slow_square(x):
+        await asyncio.sleep(0.01 * (5 - x))
+        return x * x
+    assert run(AsyncIter(agen(5)).amap(slow_square, concurrency=5).collect(list)) == [0, 1, 4, 9, 16]
+    done = [asyncio.Event() for _ in range(5)]
+    async def last_first(x):
+        if x < 4:
+            await done[x + 1].wait()
+        done[x].set()
+        return x * x
+    unordered = run(AsyncIter(agen(5)).amap(last_first, concurrency=5, ordered=False).collect(list))
+    assert sorted(unordered) == [0, 1, 4, 9, 16]
+
+def test_amap_concurrency_limit():
+    running = 0
+    peak = 0
+    async def track(x):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return x
+    assert run(AsyncIter(agen(20)).amap(track, concurrency=3).collect(list)) == list(range(20))
+    assert peak == 3
+
+def test_amap_settings():
+    async def add(x, y):
+        return x + y
+    assert run(AsyncIter([(1, 2), (3, 'a')]).star().fallible(-1).amap(add, concurrency=2).collect(list)) == [3, -1]
+
+def test_to_async():
+    assert run(Iter(range(5)).map(lambda x: x + 1).to_async().map(lambda x: x * 2).collect(list)) == [2, 4, 6, 8, 10]
+
+def test_to_sync():
+    assert AsyncIter(agen(5)).map(lambda x: x + 1).to_sync().map(str).collect(list) == ['1', '2', '3', '4', '5']
+    assert AsyncIter(agen(100)).to_sync().take(3).collect(list) == [0, 1, 2]
+
+def test_to_sync_closes_early():
+    closed = []
+    async def guarded():
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            closed.append(True)
+    source = guarded()
+    itr = AsyncIter(source).to_sync()
+    assert itr.take(2).collect(list) == [0, 1]
+    itr.iterator.close()
+    assert closed == [True]
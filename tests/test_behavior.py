@@ -68,4 +68,23 @@ def test_lazy_eval():
 def test_inheritance():
     x = Iter([])
     assert isinstance(x, Iterable)
-    assert isinstance(x, Iterator)
\ No newline at end of file
+    assert isinstance(x, Iterator)
+    assert iter(x) is x
+
+def test_slots():
+    itr = Iter(range(3))
+    assert not hasattr(itr, '__dict__')
+
+def test_settings_shared_until_changed():
+    parent = Iter([(1, 2), (3, 4)], and_mut=True).star()
+    child = parent.mirror().map(lambda x, y: x + y)
+    child.unset_stars()
+    assert child.map(lambda t: t * 2).next() == 6
+    assert parent.map(lambda x, y: x * y).collect(list) == [12]
+
+def test_collect_advances_iter():
+    itr = Iter(range(5)).map(lambda x: x * 2)
+    assert next(itr) == 0
+    assert itr.collect(lambda items: next(iter(items))) == 2
+    assert list(itr) == [4, 6, 8]
+    assert itr.collect(list) == []
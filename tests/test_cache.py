@@ -0,0 +1,63 @@
+import threading
+from pipe_iter import Cache, Iter
+from pytest import mark
+
+def counting(n, calls):
+    for i in range(n):
+        calls.append(i)
+        yield i
+
+@mark.parametrize('max_items', [None, 0, 10, 5000])
+def test_cache_replay(max_items):
+    calls = []
+    cache = Iter(counting(3000, calls)).map(lambda x: x * 2).cache(max_items=max_items)
+    expected = [x * 2 for x in range(3000)]
+    assert list(cache) == expected
+    assert list(cache) == expected
+    assert cache.iter().filter(lambda x: x % 3 == 0).collect(list) == [x for x in expected if x % 3 == 0]
+    assert len(calls) == 3000
+    assert len(cache) == 3000
+    cache.close()
+
+def test_cache_spills(tmp_path):
+    with Iter(range(5000)).cache(max_items=100, spill_dir=tmp_path) as cache:
+        assert list(cache) == list(range(5000))
+        assert len(cache.memory) == 100
+        assert cache.file is not None
+        assert list(cache) == list(range(5000))
+
+def test_cache_interleaved():
+    calls = []
+    cache = Iter(counting(2500, calls)).cache(max_items=10)
+    first = iter(cache)
+    assert [next(first) for _ in range(1500)] == list(range(1500))
+    second = iter(cache)
+    assert [next(second) for _ in range(2000)] == list(range(2000))
+    assert list(first) == list(range(1500, 2500))
+    assert list(second) == list(range(2000, 2500))
+    assert len(calls) == 2500
+
+def test_cache_close_during_replay():
+    cache = Iter(range(10)).cache()
+    replay = iter(cache)
+    assert next(replay) == 0
+    cache.close()
+    assert list(replay) == []
+    assert (len(cache), cache.memory) == (0, [])
+
+def test_cache_settings():
+    cache = Iter([(1, 2), (3, 4)]).star().cache()
+    assert cache.iter().map(lambda a, b: a + b).collect(list) == [3, 7]
+    assert isinstance(cache, Cache)
+
+def test_cache_threads():
+    cache = Iter(range(20000)).cache(max_items=1000)
+    results = [None] * 4
+    def consume(i):
+        results[i] = list(cache)
+    threads = [threading.Thread(target=consume, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(result == list(range(20000)) for result in results)
@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+import struct
+from pipe_iter import Iter
+from pytest import fixture, mark, raises
+
+LINES = [f'line {i} ' + 'é' * (i % 5) for i in range(200)]
+
+@fixture
+def text_file(tmp_path):
+    path = tmp_path / 'lines.txt'
+    path.write_bytes('\n'.join(LINES).encode('utf-8') + b'\n')
+    return path
+
+@mark.parametrize('mmap', [True, False])
+@mark.parametrize('block_size', [1, 7, 64, 1 << 20])
+def test_from_lines(text_file, mmap, block_size):
+    assert Iter.from_lines(text_file, encoding='utf-8', mmap=mmap, block_size=block_size).collect(list) == LINES
+    assert Iter.from_lines(text_file, mmap=mmap, block_size=block_size).collect(list) == [line.encode('utf-8') for line in LINES]
+
+@mark.parametrize('mmap', [True, False])
+def test_from_lines_no_trailing_newline(tmp_path, mmap):
+    path = tmp_path / 'lines.txt'
+    path.write_bytes(b'a\n\nb')
+    assert Iter.from_lines(path, mmap=mmap, block_size=2).collect(list) == [b'a', b'', b'b']
+    path.write_bytes(b'')
+    assert Iter.from_lines(path, mmap=mmap).collect(list) == []
+
+@mark.parametrize('mmap', [True, False])
+def test_from_lines_crlf(tmp_path, mmap):
+    path = tmp_path / 'lines.txt'
+    path.write_bytes(b'a\r\nb\rc\r\n\r\nd\r')
+    assert Iter.from_lines(path, mmap=mmap, block_size=3).collect(list) == [b'a', b'b\rc', b'', b'd\r']
+    assert Iter.from_lines(path, encoding='utf-8', mmap=mmap).collect(list) == ['a', 'b\rc', '', 'd\r']
+
+def test_from_lines_batched(text_file):
+    batches = Iter.from_lines(text_file, encoding='utf-8', batched=True, block_size=256).collect(list)
+    assert len(batches) > 1
+    assert all(type(batch) is list for batch in batches)
+    assert Iter(batches).flatten().collect(list) == LINES
+
+@mark.parametrize('mmap', [True, False])
+def test_from_lines_shards(text_file, mmap):
+    size = text_file.stat().st_size
+    bounds = [0, 1, size // 3, size // 2 + 5, size - 1, size]
+    shards = [
+        Iter.from_lines(text_file, encoding='utf-8', mmap=mmap, offset=start, end=end, block_size=50).collect(list)
+        for start, end in zip(bounds, bounds[1:])
+    ]
+    assert [line for shard in shards for line in shard] == LINES
+    assert shards[0] == LINES[:1]
+
+def test_from_chunks(tmp_path):
+    path = tmp_path / 'data.bin'
+    data = bytes(range(256)) * 4
+    path.write_bytes(data)
+    chunks = Iter.from_chunks(path, 100).collect(list)
+    assert b''.join(chunks) == data
+    assert [len(chunk) for chunk in chunks] == [100] * 10 + [24]
+    assert b''.join(Iter.from_chunks(path, 64, offset=10, end=500).collect(list)) == data[10:500]
+    with raises(ValueError):
+        Iter.from_chunks(path, 0)
+
+def test_from_records(tmp_path):
+    path = tmp_path / 'records.bin'
+    records = [(i, i / 2) for i in range(1000)]
+    path.write_bytes(b''.join(struct.pack('<id', *record) for record in records))
+    assert Iter.from_records(path, '<id').collect(list) == records
+    batches = Iter.from_records(path, '<id', batched=True).collect(list)
+    assert [record for batch in batches for record in batch] == records
+    size = struct.calcsize('<id')
+    assert Iter.from_records(path, '<id', offset=size + 1, end=5 * size).collect(list) == records[2:5]
+    path.write_bytes(path.read_bytes() + b'\x00')
+    with raises(struct.error):
+        Iter.from_records(path, '<id').collect(list)
+
+@mark.parametrize('background', [False, True])
+def test_write_lines(tmp_path, background):
+    path = tmp_path / 'out.txt'
+    written = Iter(LINES).write_lines(path, flush_size=100, background=background)
+    assert written.items == len(LINES)
+    assert written.bytes == path.stat().st_size
+    assert Iter.from_lines(path, encoding='utf-8').collect(list) == LINES
+    assert Iter(['more']).write_lines(path, append=True) == (1, 5)
+    assert path.read_text(encoding='utf-8').endswith('\nmore\n')
+
+def test_write_lines_file_object():
+    buffer = io.BytesIO()
+    assert Iter(['a', 'b']).write_lines(buffer, newline='\r\n') == (2, 6)
+    assert not buffer.closed
+    assert buffer.getvalue() == b'a\r\nb\r\n'
+    assert Iter([]).write_lines(buffer) == (0, 0)
+
+@mark.parametrize('background', [False, True])
+def test_write_jsonl(tmp_path, background):
+    path = tmp_path / 'out.jsonl'
+    records = [{'id': i, 'name': f'item {i}', 'tags': ['x'] * (i % 3)} for i in range(3000)]
+    written = Iter(records).write_jsonl(path, background=background, separators=(',', ':'))
+    assert written == (3000, path.stat().st_size)
+    assert [json.loads(line) for line in path.read_text().splitlines()] == records
+
+def test_write_csv(tmp_path):
+    path = tmp_path / 'out.csv'
+    rows = [(i, f'a,{i}', i / 4) for i in range(2500)]
+    written = Iter(rows).write_csv(path, header=['id', 'text', 'value'], background=True)
+    assert written.items == 2500
+    with open(path, newline='') as file:
+        read = list(csv.reader(file))
+    assert read[0] == ['id', 'text', 'value']
+    assert read[1:] == [[str(value) for value in row] for row in rows]
+
+def test_write_background_error():
+    class Failing(io.BytesIO):
+        def write(self, data):
+            raise OSError('disk full')
+    with raises(OSError):
+        Iter(map(str, range(100000))).write_lines(Failing(), flush_size=10, background=True)
@@ -0,0 +1,61 @@
+import threading
+from pipe_iter import BufferOverflowError, Fork, Iter
+from pytest import raises
+
+def test_fork_all_matching():
+    evens, threes = Fork.fork(Iter(range(10)), lambda x: x % 2 == 0, lambda x: x % 3 == 0)
+    assert list(threes) == [0, 3, 6, 9]
+    assert list(evens) == [0, 2, 4, 6, 8]
+
+def test_fork_first_only():
+    evens, threes, rest = Iter(range(10)).fork(lambda x: x % 2 == 0, lambda x: x % 3 == 0, lambda x: True, first_only=True)
+    assert next(rest) == 1
+    assert list(threes) == [3, 9]
+    assert list(evens) == [0, 2, 4, 6, 8]
+    assert list(rest) == [5, 7]
+
+def test_fork_interleaved():
+    low, high = Iter(range(6)).fork(lambda x: x < 3, lambda x: x >= 3)
+    assert next(high) == 3
+    assert next(low) == 0
+    assert list(high) == [4, 5]
+    assert list(low) == [1, 2]
+
+def test_fork_settings():
+    small, large = Iter([(1, 2), (5, 6), (0, 1)]).star().fork(lambda x, y: x + y < 5, lambda x, y: x + y >= 5)
+    assert list(large) == [(5, 6)]
+    assert list(small) == [(1, 2), (0, 1)]
+
+def test_fork_max_buffer_raise():
+    evens, odds = Iter(range(10)).fork(lambda x: x % 2 == 0, lambda x: x % 2, max_buffer=2)
+    assert next(evens) == 0
+    assert next(evens) == 2
+    with raises(BufferOverflowError):
+        list(evens)
+    with raises(BufferOverflowError):
+        next(evens)
+    assert list(odds) == [1, 3, 5, 7, 9]
+    assert list(evens) == [6, 8]
+
+def test_fork_max_buffer_spill(tmp_path):
+    evens, odds = Iter(range(1000)).fork(lambda x: x % 2 == 0, lambda x: x % 2, max_buffer=10, on_overflow='spill', spill_dir=tmp_path)
+    assert list(evens) == list(range(0, 1000, 2))
+    assert len(odds.buffer) == 500
+    assert list(odds) == list(range(1, 1000, 2))
+
+def test_fork_max_buffer_block():
+    evens, odds = Iter(range(200)).fork(lambda x: x % 2 == 0, lambda x: x % 2, max_buffer=3, on_overflow='block')
+    results = {}
+    def consume(name, fork):
+        results[name] = list(fork)
+    threads = [threading.Thread(target=consume, args=args) for args in (('evens', evens), ('odds', odds))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert results == {'evens': list(range(0, 200, 2)), 'odds': list(range(1, 200, 2))}
+    assert len(evens.buffer) == len(odds.buffer) == 0
+
+def test_fork_invalid_policy():
+    with raises(ValueError):
+        Iter(range(3)).fork(bool, max_buffer=1, on_overflow='ignore')
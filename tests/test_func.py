@@ -2,10 +2,14 @@ from pipe_iter import star_func, doublestar_func, fallible_func, Iter
 from pytest import raises
 
 def test_doublestarfunc():
-    ...
+    records = [{'x': 1, 'y': 2}, (('x', 3), ('y', 4))]
+    assert Iter(records).map(doublestar_func(lambda x, y: x * y)).collect(list) == [2, 12]
 
 def test_doublestarfunc_invalid():
-    ...
+    with raises(TypeError):
+        Iter([(('x', 1),)]).map(doublestar_func(lambda x: x, convert=False)).collect(list)
+    with raises(TypeError):
+        Iter([{'x': 1, 'z': 2}]).map(doublestar_func(lambda x, y: x)).collect(list)
 
 def test_falliblefunc():
     lst = [0, 1, None, 2, 3]
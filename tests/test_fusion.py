@@ -0,0 +1,94 @@
+from pipe_iter import Iter
+from pipe_iter.fusion import Stage, fuse
+from pytest import raises
+
+def test_fused_chain():
+    seen = []
+    itr = (Iter(range(20))
+        .map(lambda x: x + 1)
+        .filter(lambda x: x % 2)
+        .inspect(seen.append)
+        .map(lambda x: x * 10)
+        .filterfalse(lambda x: x == 50)
+        .takewhile(lambda x: x < 150)
+    )
+    assert itr.collect(list) == [10, 30, 70, 90, 110, 130]
+    assert seen == [1, 3, 5, 7, 9, 11, 13, 15]
+
+def test_fused_settings_per_stage():
+    itr = (Iter([(1, 2), (3, 4), (5, 'a')])
+        .star()
+        .fallible(fail_value=-1)
+        .map(lambda x, y: (x, y * 2))
+        .unset_stars()
+        .map(lambda t: t[0] + t[1])
+    )
+    assert itr.collect(list) == [5, 11, -1]
+
+def test_fused_doublestar():
+    itr = (Iter.from_args({'a': 1, 'b': 2}, [('a', 3), ('b', 4)])
+        .doublestar()
+        .map(lambda a, b: {'a': b, 'b': a})
+        .filter(lambda a, b: a > 2)
+    )
+    assert itr.collect(list) == [{'a': 4, 'b': 3}]
+
+def test_fused_errors_propagate():
+    itr = Iter([1, 0, 2]).map(lambda x: x + 1).map(lambda x: 1 / (x - 1))
+    with raises(ZeroDivisionError):
+        itr.collect(list)
+
+def test_fused_fallible_filter_and_takewhile():
+    assert Iter([1, 'a', 2]).fallible().map(lambda x: x).filter(lambda x: x > 0).collect(list) == [1, 2]
+    assert Iter([1, 'a', 2]).fallible().map(lambda x: x).takewhile(lambda x: x > 0).collect(list) == [1]
+
+def test_single_stage_settings():
+    pairs = [(1, 2), (3, 3), (0, 'a'), (4, 4)]
+    assert Iter(pairs).star().filter(lambda x, y: x == y).collect(list) == [(3, 3), (4, 4)]
+    assert Iter(pairs[:2]).star().filterfalse(lambda x, y: x == y).collect(list) == [(1, 2)]
+    assert Iter(pairs).star().takewhile(lambda x, y: x).collect(list) == [(1, 2), (3, 3)]
+    assert Iter(pairs).star().fallible(-1).map(lambda x, y: x + y).collect(list) == [3, 6, -1, 8]
+    assert Iter([None, 1, 0]).fallible().filter(None).collect(list) == [1]
+    calls = []
+    Iter(pairs).star().fallible().for_each(lambda x, y: calls.append(x + y))
+    assert calls == [3, 6, 8]
+
+def test_single_star_filter_shares_source():
+    source = Iter([(1, 1), (1, 2), (2, 2), (3, 4)])
+    equal = source.star().filter(lambda x, y: x == y)
+    assert next(equal) == (1, 1)
+    assert next(source) == (1, 2)
+    assert next(equal) == (2, 2)
+    assert source.collect(list) == [(3, 4)]
+
+def test_filter_map_star():
+    itr = Iter([(1, 2), (3, None)]).star().filter_map(lambda x, y: None if y is None else x + y)
+    assert itr.collect(list) == [3]
+
+def test_fused_shares_source():
+    source = Iter(range(10))
+    doubled = source.map(lambda x: x * 2).filter(lambda x: x % 3)
+    assert next(source) == 0
+    assert next(doubled) == 2
+    assert next(source) == 2
+    assert next(doubled) == 8
+
+def test_fused_stateful_stage_shared():
+    taken = Iter(range(10)).takewhile(lambda x: x % 5 != 3)
+    mapped = taken.map(lambda x: x * 10)
+    assert taken.collect(list) == [0, 1, 2]
+    assert mapped.collect(list) == []
+
+def test_fused_mutable():
+    itr = Iter.and_mut(range(6))
+    itr.map(lambda x: x + 1).filter(lambda x: x % 2)
+    assert next(itr) == 1
+    itr.map(str).map(lambda s: s * 2)
+    assert itr.collect(list) == ['33', '55']
+
+def test_fuse_reuses_compiled_shape():
+    stages = (Stage('map', str), Stage('filter', None))
+    first = fuse(iter(range(3)), stages)
+    second = fuse(iter(range(3)), (Stage('map', repr), Stage('filter', None)))
+    assert first.gi_code is second.gi_code
+    assert list(first) == ['0', '1', '2']
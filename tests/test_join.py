@@ -0,0 +1,63 @@
+from pipe_iter import Iter
+from pytest import mark, raises
+
+USERS = [(i, f'user {i}') for i in range(0, 60, 2)]
+ORDERS = [(i * 7 % 50, f'order {i}') for i in range(100)]
+
+def first(item):
+    return item[0]
+
+def expected_join(left, right, how):
+    pairs = [(l, r) for l in left for r in right if l[0] == r[0]]
+    if how in ('left', 'outer'):
+        pairs += [(l, None) for l in left if all(l[0] != r[0] for r in right)]
+    if how == 'outer':
+        pairs += [(None, r) for r in right if all(l[0] != r[0] for l in left)]
+    return sorted(pairs, key=repr)
+
+@mark.parametrize('how', ['inner', 'left', 'outer'])
+@mark.parametrize('max_memory', [None, 1, 10, 1000])
+def test_hash_join(tmp_path, how, max_memory):
+    for left, right in [(USERS, ORDERS), (ORDERS, USERS)]:
+        joined = Iter(left).join(right, first, how=how, max_memory=max_memory, spill_dir=tmp_path).collect(list)
+        assert sorted(joined, key=repr) == expected_join(left, right, how)
+        joined = Iter(iter(left)).join(iter(right), first, how=how, max_memory=max_memory).collect(list)
+        assert sorted(joined, key=repr) == expected_join(left, right, how)
+
+def test_hash_join_streams_probe_side_in_order():
+    joined = Iter(ORDERS).join(USERS, first).collect(list)
+    assert [order for order, _ in joined] == [order for order in ORDERS if order[0] % 2 == 0]
+
+def test_join_keys():
+    names = ['ann', 'bob', 'cy']
+    ages = [(3, 'three'), (2, 'two')]
+    assert Iter(names).join(ages, len, first).collect(list) == [('ann', (3, 'three')), ('bob', (3, 'three')), ('cy', (2, 'two'))]
+    assert Iter([1, 2, 3]).join([3, 1, 1]).collect(list) == [(1, 1), (1, 1), (3, 3)]
+
+@mark.parametrize('how', ['inner', 'left', 'outer'])
+def test_merge_join(how):
+    left = sorted(USERS)
+    right = sorted(ORDERS, key=first)
+    joined = Iter(left).join(right, first, how=how, strategy='merge').collect(list)
+    assert sorted(joined, key=repr) == expected_join(left, right, how)
+    keys = [(l or r)[0] for l, r in joined]
+    assert keys == sorted(keys)
+
+def test_merge_join_is_streaming():
+    joined = Iter.count().map(lambda i: (i, i)).join(Iter.count(0, 3).map(lambda i: (i, -i)), first, strategy='merge')
+    assert joined.take(3).collect(list) == [((0, 0), (0, 0)), ((3, 3), (3, -3)), ((6, 6), (6, -6))]
+
+def test_merge_join_unsorted():
+    with raises(ValueError):
+        Iter([1, 3, 2]).join([1, 2, 3], strategy='merge', how='outer').collect(list)
+
+def test_join_invalid():
+    with raises(ValueError):
+        Iter([]).join([], how='cross')
+    with raises(ValueError):
+        Iter([]).join([], strategy='nested')
+
+def test_filter_in():
+    assert Iter(range(10)).filter_in({2, 3, 11}).collect(list) == [2, 3]
+    assert Iter(ORDERS).filter_in(Iter(USERS).map(first), key=first).map(first).collect(list) == [order[0] for order in ORDERS if order[0] % 2 == 0]
+    assert Iter('abcABC').filter_in('ab', key=str.lower).collect(''.join) == 'abAB'
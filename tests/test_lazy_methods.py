@@ -1,3 +1,5 @@
+import time
+
 from pipe_iter import Iter
 from pytest import raises
 
@@ -19,6 +21,21 @@ def test_batched():
     assert Iter(lst).batched(3, fillvalue=None).collect(list) == batch_3_nonefille
     with raises(TypeError):
         Iter(lst).batched(0, None).collect(list)
+    with raises(ValueError):
+        Iter(lst).batched(0)
+    assert Iter(range(6)).batched(3).collect(list) == [(0, 1, 2), (3, 4, 5)]
+    assert Iter(range(6)).batched(3, fillvalue=None).collect(list) == [(0, 1, 2), (3, 4, 5)]
+    assert Iter([]).batched(3).collect(list) == []
+
+def test_batched_by():
+    words = ['ab', 'cde', 'f', 'ghij', 'k', 'lmnopq', 'r']
+    assert Iter(words).batched_by(max_weight=5).collect(list) == [('ab', 'cde'), ('f', 'ghij'), ('k',), ('lmnopq',), ('r',)]
+    assert Iter(words).batched_by(max_items=2, max_weight=6).collect(list) == [('ab', 'cde'), ('f', 'ghij'), ('k',), ('lmnopq',), ('r',)]
+    assert Iter(words).batched_by(max_items=3, max_weight=100).collect(list) == [('ab', 'cde', 'f'), ('ghij', 'k', 'lmnopq'), ('r',)]
+    assert Iter(range(5)).batched_by(max_items=2).collect(list) == [(0, 1), (2, 3), (4,)]
+    assert Iter(range(5)).batched_by(max_weight=3, weight=lambda x: 1).collect(list) == [(0, 1, 2), (3, 4)]
+    with raises(TypeError):
+        Iter(words).batched_by()
 
 def test_chain():
     lst1 = ['a', 'b', 'c']
@@ -184,8 +201,58 @@ def test_stretch():
     with raises(TypeError):
         Iter(multilevel).stretch(0).collect(list)
 
-# def test_switch_map():
-#     ...
+def test_switch_map():
+    assert (
+        Iter(range(7))
+            .switch_map(
+                (lambda x: x % 3 == 0, lambda x: 'fizz'),
+                (lambda x: x % 2 == 0, lambda x: x * 10),
+            )
+            .collect(list)
+        == ['fizz', 1, 20, 'fizz', 40, 5, 'fizz']
+    )
+    assert (
+        Iter(range(4))
+            .switch_map(
+                (lambda x: x < 2, str),
+                (None, lambda x: -x),
+                (lambda x: True, lambda x: 'unreachable'),
+            )
+            .collect(list)
+        == ['0', '1', -2, -3]
+    )
+    assert (
+        Iter([(1, 2), (3, 4)])
+            .star()
+            .switch_map((lambda x, y: x > 1, lambda x, y: x * y), (None, lambda x, y: x + y))
+            .collect(list)
+        == [3, 12]
+    )
+    assert (
+        Iter([1, 'a', 2])
+            .fallible(0)
+            .switch_map((lambda x: x > 1, lambda x: x * 100), (None, lambda x: x + 1))
+            .collect(list)
+        == [2, 0, 200]
+    )
+
+def test_switch_map_cases():
+    assert (
+        Iter(['apple', 'banana', 'cherry', 'avocado'])
+            .switch_map(key=lambda s: s[0], cases={'a': str.upper, 'b': len})
+            .collect(list)
+        == ['APPLE', 6, 'cherry', 'AVOCADO']
+    )
+    assert (
+        Iter(range(5))
+            .switch_map(key=lambda x: x % 2, cases={0: lambda x: x // 2}, default=lambda x: None)
+            .collect(list)
+        == [0, None, 1, None, 2]
+    )
+    with raises(TypeError):
+        Iter(range(5)).switch_map((None, str), key=str, cases={})
+    with raises(TypeError):
+        Iter(range(5)).switch_map(key=str)
 
 def test_takewhile():
     assert Iter([1,4,6,3,8]).takewhile(lambda x: x < 5).collect(list) == [1, 4]
@@ -198,6 +265,46 @@ def test_tee():
     iters = original.tee(3)
     assert all(itr.collect(list) == [0, 1, 2, 3, 4] for itr in iters)
 
+def test_time_batched():
+    assert Iter(range(7)).time_batched(3, 10).collect(list) == [(0, 1, 2), (3, 4, 5), (6,)]
+    def slow():
+        for i in range(4):
+            if i == 2:
+                time.sleep(0.3)
+            yield i
+    assert Iter(slow()).time_batched(10, 0.05).collect(list) == [(0, 1), (2, 3)]
+    with raises(ValueError):
+        Iter(range(3)).time_batched(0, 1)
+
+def test_time_batched_from_fn():
+    source = iter(range(5))
+    def poll():
+        time.sleep(0.01)
+        return next(source, None)
+    assert Iter.from_fn(poll, None).time_batched(2, 5).unbatched().collect(list) == [0, 1, 2, 3, 4]
+
+def test_time_batched_error():
+    def failing():
+        yield 1
+        raise KeyError('boom')
+    itr = Iter(failing()).time_batched(5, 10)
+    assert itr.next() == (1,)
+    with raises(KeyError):
+        itr.next()
+
+def test_unbatched():
+    assert Iter(range(7)).batched(3).unbatched().collect(list) == list(range(7))
+    assert Iter(['ab', 'cde', 'f']).batched_by(max_weight=4).unbatched().collect(list) == ['ab', 'cde', 'f']
+
+def test_window():
+    assert Iter(range(5)).window(3).collect(list) == [(0, 1, 2), (1, 2, 3), (2, 3, 4)]
+    assert Iter(range(7)).window(3, step=2).collect(list) == [(0, 1, 2), (2, 3, 4), (4, 5, 6)]
+    assert Iter(range(10)).window(2, step=4).collect(list) == [(0, 1), (4, 5), (8, 9)]
+    assert Iter(range(4)).window(2).collect(list) == Iter(range(4)).pairwise().collect(list)
+    assert Iter(range(2)).window(3).collect(list) == []
+    with raises(ValueError):
+        Iter(range(3)).window(0)
+
 def test_zip():
     assert Iter('ABCD').zip('xy',).collect(list) == [('A','x',), ('B','y',)]
 
@@ -0,0 +1,93 @@
+import operator
+from pipe_iter import Iter
+from pytest import mark
+
+def test_sources():
+    assert Iter(range(10)).len_if_known() == 10
+    assert Iter.range(2, 10, 3).len_if_known() == 3
+    assert Iter.from_args(1, 2, 3).len_if_known() == 3
+    assert Iter.from_kwargs(a=1, b=2).len_if_known() == 2
+    assert Iter.repeat('x', 4).len_if_known() == 4
+    assert Iter([1, 2, 3]).len_if_known() == 3
+    assert Iter(Iter([1, 2])).len_if_known() == 2
+    assert Iter.repeat('x').len_if_known() is None
+    assert Iter.count().len_if_known() is None
+    assert Iter(x for x in range(3)).len_if_known() is None
+    assert Iter(iter([1, 2])).len_if_known() is None
+
+def test_length_hint():
+    assert operator.length_hint(Iter(range(7)).map(str)) == 7
+    assert operator.length_hint(Iter(x for x in range(3)), -1) == -1
+    assert Iter(range(5)).map(str).collect(list) == ['0', '1', '2', '3', '4']
+
+@mark.parametrize('make', [
+    lambda: Iter(range(10)).map(str),
+    lambda: Iter(range(10)).inspect(lambda x: None).map(str),
+    lambda: Iter(range(10)).enumerate(1),
+    lambda: Iter(range(10)).zip(range(5)).starmap(operator.add),
+    lambda: Iter(range(10)).zip_longest([1, 2]),
+    lambda: Iter(range(10)).chain([1, 2], 'abc'),
+    lambda: Iter(range(10)).islice(3),
+    lambda: Iter(range(10)).islice(2, 8),
+    lambda: Iter(range(10)).islice(1, None, 3),
+    lambda: Iter(range(10)).islice(1, 100, 4),
+    lambda: Iter(range(10)).skip(4),
+    lambda: Iter(range(10)).skip(40),
+    lambda: Iter(range(10)).batched(3),
+    lambda: Iter(range(9)).batched(3, fillvalue=None),
+    lambda: Iter(range(10)).evenitems(),
+    lambda: Iter(range(10)).odditems(),
+    lambda: Iter(range(11)).odditems().batched(2),
+    lambda: Iter(range(6)).combinations(2),
+    lambda: Iter(range(6)).combinations(8),
+    lambda: Iter(range(3)).combinations_with_replacement(2),
+    lambda: Iter(range(4)).permutations(2),
+    lambda: Iter(range(3)).product('ab', repeat=2),
+    lambda: Iter.range(20).thread_map(str, workers=2),
+])
+def test_size_propagation(make):
+    expected = list(make())
+    itr = make()
+    for i in range(len(expected) + 1):
+        assert itr.len_if_known() == len(expected) - i
+        itr.next(None)
+    assert operator.length_hint(make()) == len(expected)
+
+@mark.parametrize('make', [
+    lambda: Iter(range(10)).filter(bool),
+    lambda: Iter(range(10)).takewhile(bool),
+    lambda: Iter(range(10)).map(str).filter_map(int),
+    lambda: Iter(range(10)).flatten(),
+    lambda: Iter(range(10)).zip(x for x in range(3)),
+    lambda: Iter(x for x in range(3)).combinations(2),
+])
+def test_unknown_length(make):
+    assert make().len_if_known() is None
+
+def test_mutable_length():
+    itr = Iter.and_mut(range(10))
+    itr.map(str).batched(4)
+    assert itr.len_if_known() == 3
+    itr.filter(None)
+    assert itr.len_if_known() is None
+
+def test_foreign_length_attribute():
+    class Stream:
+        _length = 3
+        def __iter__(self):
+            return iter('abc')
+    assert Iter(Stream()).len_if_known() is None
+    assert Iter(range(2)).product(Stream()).collect(list) == [(0, 'a'), (0, 'b'), (0, 'c'), (1, 'a'), (1, 'b'), (1, 'c')]
+    assert Iter(Stream()).combinations(2).collect(list) == [('a', 'b'), ('a', 'c'), ('b', 'c')]
+
+def test_counted_source_grows():
+    items = [1, 2, 3]
+    mapped = Iter(items).thread_map(abs, workers=1)
+    items.append(4)
+    assert mapped.collect(list) == [1, 2, 3, 4]
+    items = [1, 2, 3]
+    mapped = Iter(items).par_map(abs, workers=1)
+    items.append(4)
+    assert mapped.len_if_known() == 3
+    assert mapped.collect(list) == [1, 2, 3, 4]
+    assert mapped.len_if_known() == 0
@@ -0,0 +1,91 @@
+from pipe_iter import Iter
+from pipe_iter.parallel import auto_chunksize, shared_thread_pool
+from pytest import raises
+
+def square(x):
+    return x * x
+
+def add(x, y):
+    return x + y
+
+def is_even(x):
+    return x % 2 == 0
+
+def half_if_even(x):
+    return x // 2 if x % 2 == 0 else None
+
+def test_par_map():
+    assert Iter(range(100)).par_map(square, workers=2, chunksize=7).collect(list) == [x * x for x in range(100)]
+    unordered = Iter(range(100)).par_map(square, workers=2, chunksize=7, ordered=False).collect(list)
+    assert sorted(unordered) == [x * x for x in range(100)]
+
+def test_par_map_settings():
+    assert Iter.zipped(range(5), range(5)).star().par_map(add, workers=2, chunksize=2).collect(list) == [0, 2, 4, 6, 8]
+    assert Iter([1, 'a', 3]).fallible(0).par_map(square, workers=2, chunksize=1).collect(list) == [1, 0, 9]
+    with raises(TypeError):
+        Iter([1, 'a', 3]).par_map(square, workers=2).collect(list)
+
+def test_par_map_infinite():
+    assert Iter.count().par_map(square, workers=2, chunksize=4, max_in_flight=2).take(10).collect(list) == [x * x for x in range(10)]
+
+def test_par_filter():
+    assert Iter(range(20)).par_filter(is_even, workers=2, chunksize=3).collect(list) == list(range(0, 20, 2))
+
+def test_par_filter_map():
+    assert Iter(range(10)).par_filter_map(half_if_even, workers=2, chunksize=3).collect(list) == [0, 1, 2, 3, 4]
+
+def test_par_invalid_chunksize():
+    with raises(ValueError):
+        Iter(range(10)).par_map(square, chunksize=0)
+
+def test_thread_map():
+    assert Iter(range(50)).thread_map(lambda x: x + 1, workers=4).collect(list) == list(range(1, 51))
+    assert Iter(range(50)).thread_map(lambda x: x + 1, workers=4, ordered=False).collect(set) == set(range(1, 51))
+    assert Iter.zipped(range(3), 'abc').star().thread_map(lambda i, c: c * i).collect(list) == ['', 'b', 'cc']
+    assert Iter([1, 'a']).fallible(-1).thread_map(lambda x: x + 1).collect(list) == [2, -1]
+
+def test_thread_map_unordered_completion():
+    import threading
+    release = threading.Event()
+    def slow_first(x):
+        if x == 0:
+            release.wait(5)
+        return x
+    itr = Iter(range(4)).thread_map(slow_first, workers=4, ordered=False)
+    first = itr.take(3).collect(list)
+    assert sorted(first) == [1, 2, 3]
+    release.set()
+    assert itr.collect(list) == [0]
+
+def test_thread_map_bounded():
+    pulled = []
+    source = Iter.count().inspect(pulled.append)
+    assert source.thread_map(lambda x: x, workers=2, max_in_flight=3).take(5).collect(list) == [0, 1, 2, 3, 4]
+    assert len(pulled) <= 5 + 3
+
+def test_thread_map_shared_executor():
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(2) as executor:
+        first = Iter(range(5)).thread_map(lambda x: x * 2, executor=executor).collect(list)
+        second = Iter(range(5)).thread_map(lambda x: x * 3, executor=executor).collect(list)
+    assert first == [0, 2, 4, 6, 8]
+    assert second == [0, 3, 6, 9, 12]
+
+def test_thread_map_shared_pool():
+    import threading
+    threads = set()
+    def record(x):
+        threads.add(threading.current_thread())
+        return x
+    assert Iter(range(20)).thread_map(record, workers=3).collect(list) == list(range(20))
+    assert Iter(range(20)).thread_map(record, workers=3, ordered=False).collect(set) == set(range(20))
+    assert len(threads) <= 3
+    assert shared_thread_pool(3) is shared_thread_pool(3)
+    assert shared_thread_pool(3) is not shared_thread_pool(2)
+
+def test_auto_chunksize():
+    assert auto_chunksize(None, 4) == 64
+    assert auto_chunksize(1000, 4) == 63
+    assert auto_chunksize(3, 4) == 1
+    assert auto_chunksize(10**9, 4) == 4096
+    assert Iter(range(100)).par_map(square, workers=2).len_if_known() == 100
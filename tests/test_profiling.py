@@ -0,0 +1,64 @@
+from pipe_iter import Iter
+from pytest import raises
+
+def square(x):
+    return x * x
+
+def test_profile_stats():
+    itr = (Iter(range(100))
+        .profile()
+        .map(lambda x: x + 1)
+        .filter(lambda x: x % 4 == 0)
+        .enumerate()
+    )
+    assert itr.collect(list)[:2] == [(0, 4), (1, 8)]
+    stats = itr.stats()
+    assert [stage['stage'] for stage in stats] == ['source', 'map', 'filter', 'enumerate']
+    source, mapped, filtered, enumerated = stats
+    assert source['items_in'] is None
+    assert source['items_out'] == mapped['items_in'] == 100
+    assert mapped['items_out'] == filtered['items_in'] == 100
+    assert filtered['items_out'] == 25
+    assert filtered['selectivity'] == 0.25
+    assert mapped['fn_calls'] == 100
+    assert filtered['fn_calls'] == 100
+    assert enumerated['fn_calls'] == 0
+    for stage in stats:
+        assert stage['time'] >= stage['exclusive_time'] >= stage['fn_time'] >= 0
+        assert stage['time_to_first_item'] is not None
+
+def test_profile_generator_stage_names():
+    itr = Iter(range(10)).profile().batched(3).starmap(lambda *xs: sum(xs))
+    assert itr.collect(list) == [3, 12, 21, 9]
+    assert [stage['stage'] for stage in itr.stats()] == ['source', 'batched', 'starmap']
+    assert itr.stats()[2]['fn_calls'] == 4
+
+def test_profile_shared_by_derived_iters():
+    base = Iter(range(5)).profile()
+    derived = base.map(str)
+    assert derived.collect(list) == ['0', '1', '2', '3', '4']
+    assert base.stats() == derived.stats()
+    assert base.stats()[-1]['items_out'] == 5
+
+def test_profile_mutable():
+    itr = Iter.and_mut(range(10)).profile()
+    itr.map(str).take(3)
+    assert itr.collect(list) == ['0', '1', '2']
+    assert [stage['items_out'] for stage in itr.stats()] == [3, 3, 3]
+
+def test_profile_consumers_not_counted():
+    itr = Iter.and_mut(range(5)).profile()
+    itr.mirror().take(2).for_each(lambda x: None)
+    itr.fork(lambda x: x % 2)
+    itr.map(str)
+    assert itr.collect(list) == ['2', '3', '4']
+    assert itr.stats()[-1]['fn_calls'] == 3
+
+def test_profile_par_map():
+    itr = Iter(range(10)).profile().par_map(square, workers=2, chunksize=3)
+    assert itr.collect(list) == [x * x for x in range(10)]
+    assert itr.stats()[-1]['items_out'] == 10
+
+def test_stats_without_profile():
+    with raises(ValueError):
+        Iter(range(3)).stats()
@@ -0,0 +1,98 @@
+import itertools
+
+from pipe_iter import Iter, sequences
+from pytest import mark
+
+SOURCES = [list(range(20)), tuple(range(20)), range(20), range(3, 60, 3), 'ABCDEFGHIJKLMNOPQRST', b'abcdefghijklmnopqrst']
+SLICES = [(5,), (3, None), (3, 9), (3, 2), (0, None, 2), (1, None, 2), (2, 11, 3), (4, 100, 5), (25, None), (0, 0, 3), (1, 19, 16), (2, None, 17), (0, None, 30)]
+
+@mark.parametrize('source', SOURCES)
+@mark.parametrize('args', SLICES)
+def test_islice_sequence(source, args):
+    itr = Iter(source)
+    next(itr.iterator)
+    sliced = itr.islice(*args)
+    expected = list(itertools.islice(itertools.islice(source, 1, None), *args))
+    assert sliced.len_if_known() == len(expected)
+    assert sliced.collect(list) == expected
+
+def test_islice_sequence_shares_iterator():
+    itr = Iter(range(10), and_mut=True)
+    mirror = itr.mirror()
+    itr.skip(3)
+    assert mirror.next() == 0
+    assert itr.next() == 4
+    assert mirror.next() == 5
+    assert Iter([1, 2, 3, 4, 5], and_mut=True).islice(1, 3).collect(list) == [2, 3]
+    stepped = Iter(range(10), and_mut=True)
+    stepped_mirror = stepped.mirror()
+    assert stepped.islice(0, 6, 2).collect(list) == [0, 2, 4]
+    assert stepped_mirror.collect(list) == [6, 7, 8, 9]
+
+def test_islice_sequence_is_lazy():
+    itr = Iter(range(10))
+    sliced = itr.islice(0, None, 2)
+    items = Iter(list(range(10)))
+    skipped = items.skip(2)
+    next(itr)
+    next(items)
+    assert sliced.collect(list) == [1, 3, 5, 7, 9]
+    assert skipped.collect(list) == [3, 4, 5, 6, 7, 8, 9]
+    items = Iter(list(range(10)))
+    stepped = items.islice(0, 5, 2)
+    assert next(stepped) == 0
+    assert items.collect(list) == list(range(1, 10))
+
+@mark.parametrize('step', [2, 40])
+def test_islice_sequence_interleaved(step):
+    itr = Iter(list(range(200)))
+    sliced = itr.islice(3, 150, step)
+    reference = iter(range(200))
+    reference_sliced = itertools.islice(reference, 3, 150, step)
+    while True:
+        item = next(sliced, None)
+        assert item == next(reference_sliced, None)
+        assert next(itr, None) == next(reference, None)
+        if item is None:
+            break
+    assert itr.collect(list) == list(reference)
+
+def test_skip_range():
+    n = 10**18 if sequences.seekable(iter(range(1))) else 10**5
+    itr = Iter.range(n).skip(n - 3)
+    assert itr.len_if_known() == 3
+    assert itr.collect(list) == [n - 3, n - 2, n - 1]
+    assert Iter.range(n).islice(n // 10, None, n // 10).collect(list) == [i * n // 10 for i in range(1, 10)]
+
+def test_nth_sequence():
+    n = 10**12 if sequences.seekable(iter(range(1))) else 10**5
+    assert Iter.range(n).nth(n) == n - 1
+    assert Iter.range(10).nth(11) is None
+    itr = Iter('ABCDEF')
+    assert itr.nth(2) == 'B'
+    assert itr.nth(2) == 'D'
+    assert itr.collect(list) == ['E', 'F']
+
+def test_cycle_sequence():
+    itr = Iter([1, 2, 3])
+    itr.next()
+    assert itr.cycle().take(7).collect(list) == [2, 3, 2, 3, 2, 3, 2]
+    assert Iter.range(5).cycle().skip(2).take(6).collect(list) == [2, 3, 4, 0, 1, 2]
+    assert Iter([]).cycle().collect(list) == []
+    itr = Iter([1, 2, 3], and_mut=True)
+    cycled = itr.mirror().cycle()
+    itr.next()
+    assert cycled.take(5).collect(list) == [2, 3, 2, 3, 2]
+
+def test_not_seekable_after_stage():
+    calls = []
+    itr = Iter(range(10)).inspect(calls.append).skip(2)
+    assert itr.collect(list) == list(range(2, 10))
+    assert calls == list(range(10))
+
+def test_unseekable_fallback(monkeypatch):
+    monkeypatch.setattr(sequences, 'SEEKABLE', frozenset())
+    assert Iter.range(10).skip(3).collect(list) == list(range(3, 10))
+    assert Iter.range(10).islice(1, None, 3).collect(list) == [1, 4, 7]
+    assert Iter.range(10).nth(4) == 3
+    assert Iter.range(3).cycle().take(5).collect(list) == [0, 1, 2, 0, 1]
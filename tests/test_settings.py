@@ -28,4 +28,24 @@ def test_fallible():
 def test_fail_value():
     lst = [0, 1, None, 2, 3]
     itr = Iter(lst).fallible(fail_value=0).map(int) 
-    assert itr.collect(list) == [0, 1, 0, 2, 3]
\ No newline at end of file
+    assert itr.collect(list) == [0, 1, 0, 2, 3]
+
+def test_unset_fallible():
+    itr = Iter([0, 1, None]).fallible().unset_fallible().map(int)
+    with raises(TypeError):
+        itr.collect(list)
+
+def test_star_dispatch():
+    pairs = [(1, 2), (3, 4), (5,)]
+    assert Iter(pairs[:2]).star().map(lambda x, y: x * y).collect(list) == [2, 12]
+    assert Iter(pairs).star().fallible(0).map(lambda x, y: x * y).collect(list) == [2, 12, 0]
+    assert Iter([(1, 2), 3]).star().fallible(-1).map(lambda x, y: x + y).collect(list) == [3, -1]
+    assert Iter(pairs[:2]).star().filter(lambda x, y: y > 2).collect(list) == [(3, 4)]
+    total = []
+    Iter(pairs[:2]).star().for_each(lambda x, y: total.append(x + y))
+    assert total == [3, 7]
+
+def test_doublestar_dispatch():
+    records = [{'a': 1, 'b': 2}, [('a', 3), ('b', 4)]]
+    assert Iter(records).doublestar().map(lambda a, b: a - b).collect(list) == [-1, -1]
+    assert Iter(records + [{'a': 1}]).doublestar().fallible().map(lambda a, b: a - b).collect(list) == [-1, -1, None]
@@ -0,0 +1,61 @@
+import bisect
+import collections
+import random
+
+from pipe_iter import Iter
+from pipe_iter.sketch import HyperLogLog, QuantileSketch
+from pytest import mark, raises
+
+def test_sample():
+    assert Iter(range(5)).sample(10) == [0, 1, 2, 3, 4]
+    assert Iter(range(5)).sample(0) == []
+    assert Iter(range(1000)).sample(10, seed=7) == Iter(range(1000)).sample(10, seed=7)
+    sample = Iter(range(1000)).sample(10, seed=7)
+    assert len(set(sample)) == 10 and all(0 <= item < 1000 for item in sample)
+    with raises(ValueError):
+        Iter(range(5)).sample(-1)
+
+def test_sample_is_uniform():
+    counts = collections.Counter()
+    trials = 4000
+    for seed in range(trials):
+        counts.update(Iter(range(50)).sample(5, seed=seed))
+    expected = trials * 5 / 50
+    assert set(counts) == set(range(50))
+    assert all(abs(count - expected) < 0.2 * expected for count in counts.values())
+
+def test_sample_consumes_iterator():
+    itr = Iter(iter(range(10**6)))
+    assert len(itr.sample(100, seed=1)) == 100
+    assert itr.next(None) is None
+
+@mark.parametrize('n', [0, 10, 1000, 50000])
+def test_approx_distinct(n):
+    items = [f'item {i % n}' for i in range(2 * n)] if n else []
+    estimate = Iter(items).approx_distinct()
+    assert abs(estimate - n) <= max(1, 0.04 * n)
+
+def test_approx_distinct_ints_and_memory():
+    assert abs(Iter.range(200000).approx_distinct(precision=12) - 200000) < 0.08 * 200000
+    assert len(HyperLogLog(12).registers) == 4096
+    with raises(ValueError):
+        Iter([]).approx_distinct(precision=30)
+
+@mark.parametrize('seed', range(5))
+def test_approx_quantiles(seed):
+    rng = random.Random(seed)
+    data = [rng.gauss(0, 1) for _ in range(100000)]
+    ordered = sorted(data)
+    qs = [0, 0.01, 0.1, 0.5, 0.9, 0.99, 1]
+    estimates = Iter(data).approx_quantiles(qs, eps=0.01, seed=seed)
+    for q, estimate in zip(qs, estimates):
+        assert abs(bisect.bisect_left(ordered, estimate) / len(data) - q) <= 0.01
+
+def test_quantile_sketch_memory():
+    sketch = QuantileSketch(0.01).update(range(10**5))
+    assert sketch.count == 10**5
+    assert sketch.size <= 3 * sketch.k + 2 * len(sketch.compactors)
+    assert Iter([]).approx_quantiles([0.5]) == [None]
+    assert Iter([3, 1, 2]).approx_quantiles([0, 0.5, 1]) == [1, 2, 3]
+    with raises(ValueError):
+        Iter([1]).approx_quantiles([1.5])
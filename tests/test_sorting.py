@@ -0,0 +1,39 @@
+import random
+
+from pipe_iter import Iter
+from pytest import mark, raises
+
+DATA = [random.Random(0).randrange(50) for _ in range(1000)]
+RECORDS = [(i % 7, i) for i in range(500)]
+
+def test_top_k():
+    assert Iter(DATA).top_k(10) == sorted(DATA, reverse=True)[:10]
+    assert Iter(DATA).top_k(10, reverse=True) == sorted(DATA)[:10]
+    assert Iter(RECORDS).top_k(5, key=lambda record: record[0]) == sorted(RECORDS, key=lambda record: record[0], reverse=True)[:5]
+    assert Iter([3, 1]).top_k(5) == [3, 1]
+    assert Iter(DATA).top_k(0) == []
+    with raises(ValueError):
+        Iter(DATA).top_k(-1)
+
+@mark.parametrize('max_memory', [None, 1, 7, 999, 1000, 1001])
+@mark.parametrize('reverse', [False, True])
+def test_sorted(tmp_path, max_memory, reverse):
+    itr = Iter(DATA).sorted(reverse=reverse, max_memory=max_memory, spill_dir=tmp_path)
+    assert itr.len_if_known() == len(DATA)
+    assert itr.collect(list) == sorted(DATA, reverse=reverse)
+
+def test_sorted_stable():
+    key = lambda record: record[0]
+    assert Iter(RECORDS).sorted(key=key, max_memory=30).collect(list) == sorted(RECORDS, key=key)
+    assert Iter(RECORDS).sorted(key=key, reverse=True, max_memory=30).collect(list) == sorted(RECORDS, key=key, reverse=True)
+
+def test_sorted_spills(tmp_path):
+    sorting = Iter.range(10000, 0, -1).sorted(max_memory=100, spill_dir=tmp_path)
+    assert sorting.take(3).collect(list) == [1, 2, 3]
+    assert Iter.range(5).sorted(max_memory=1).collect(list) == [0, 1, 2, 3, 4]
+    assert Iter([]).sorted(max_memory=10).collect(list) == []
+    with raises(ValueError):
+        Iter(DATA).sorted(max_memory=0)
+
+def test_sorted_in_memory_is_seekable():
+    assert Iter(DATA).sorted().skip(990).collect(list) == sorted(DATA)[990:]
@@ -0,0 +1,75 @@
+import threading
+from pipe_iter import BufferOverflowError, Iter, Tee
+from pytest import raises
+
+def test_bounded_tee_lockstep():
+    iters = Iter(range(100)).map(lambda x: x * 2).tee(3, max_lag=1)
+    assert Iter.zipped(*iters).collect(list) == [(x, x, x) for x in range(0, 200, 2)]
+
+def test_bounded_tee_raise():
+    first, second = Iter(range(10)).tee(2, max_lag=3)
+    assert first.take(3).collect(list) == [0, 1, 2]
+    with raises(BufferOverflowError):
+        first.next()
+    assert second.take(6).collect(list) == list(range(6))
+    assert first.take(3).collect(list) == [3, 4, 5]
+    assert second.take(3).collect(list) == [6, 7, 8]
+    assert first.collect(list) == list(range(6, 10))
+    assert second.collect(list) == [9]
+
+def test_bounded_tee_drop():
+    first, second = Tee.tee(Iter(range(10)), 2, max_lag=3, on_overflow='drop')
+    assert list(first) == list(range(10))
+    assert second.lag == 3
+    assert second.dropped == 7
+    assert list(second) == [7, 8, 9]
+    assert first.tee.stats() == [
+        {'lag': 0, 'max_lag': 0, 'dropped': 0},
+        {'lag': 0, 'max_lag': 3, 'dropped': 7},
+    ]
+
+def test_bounded_tee_stats_from_iter():
+    first, second = Iter(range(10)).tee(2, max_lag=4, on_overflow='drop')
+    assert first.collect(list) == list(range(10))
+    assert (second.iterator.lag, second.iterator.dropped) == (4, 6)
+    assert second.collect(list) == [6, 7, 8, 9]
+    assert first.iterator.tee.stats()[1] == {'lag': 0, 'max_lag': 4, 'dropped': 6}
+    assert len(first.iterator.tee.buffer) == 0
+
+def test_bounded_tee_long_lag():
+    first, second = Iter(range(5000)).tee(2, max_lag=1000)
+    assert first.take(1000).collect(list) == list(range(1000))
+    assert second.take(600).collect(list) == list(range(600))
+    assert first.take(500).collect(list) == list(range(1000, 1500))
+    assert second.take(1400).collect(list) == list(range(600, 2000))
+    assert Iter.zipped(second, first).collect(list) == [(x + 500, x) for x in range(1500, 4500)]
+    assert first.collect(list) == list(range(4500, 5000))
+
+def test_bounded_tee_block():
+    first, second = Tee.tee(range(10000), 2, max_lag=8, on_overflow='block')
+    results = {}
+    def consume(name, branch):
+        results[name] = list(branch)
+    threads = [threading.Thread(target=consume, args=args) for args in (('first', first), ('second', second))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results['first'] == results['second'] == list(range(10000))
+    assert first.max_lag <= 8 and second.max_lag <= 8
+    assert len(first.tee.buffer) == 0
+
+def test_bounded_tee_close():
+    first, second = Tee.tee(range(10), 2, max_lag=2, on_overflow='raise')
+    second.close()
+    assert list(first) == list(range(10))
+    assert list(second) == []
+
+def test_bounded_clone():
+    itr = Iter([(1, 2), (3, 4), (5, 6)]).star()
+    clone = itr.clone(max_lag=2, on_overflow='raise')
+    assert itr.take(2).map(lambda a, b: a + b).collect(list) == [3, 7]
+    assert clone.map(lambda a, b: a * b).collect(list) == [2, 12, 30]
+    assert itr.collect(list) == [(5, 6)]
+    with raises(ValueError):
+        Iter(range(3)).tee(2, max_lag=2, on_overflow='spill')
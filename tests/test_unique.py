@@ -0,0 +1,43 @@
+import random
+
+from pipe_iter import Iter
+from pipe_iter.sketch import BloomFilter
+from pytest import raises
+
+def test_unique():
+    assert Iter([3, 1, 3, 2, 1, 4]).unique().collect(list) == [3, 1, 2, 4]
+    words = ['apple', 'Avocado', 'banana', 'blueberry', 'cherry']
+    assert Iter(words).unique(key=lambda word: word[0].lower()).collect(list) == ['apple', 'banana', 'cherry']
+    assert Iter(words).map(str.upper).unique(key=len).map(len).collect(list) == [5, 7, 6, 9]
+
+def test_unique_settings_do_not_apply():
+    assert Iter([(1, 2), (1, 2), (2, 1)]).star().unique().collect(list) == [(1, 2), (2, 1)]
+
+def test_unique_bloom():
+    items = [random.Random(1).randrange(5000) for _ in range(20000)]
+    result = Iter(items).unique(mode='bloom', capacity=5000, error_rate=0.01).collect(list)
+    assert len(result) == len(set(result))
+    distinct = len(set(items))
+    assert distinct * 0.97 <= len(result) <= distinct
+    assert Iter(['a', 'b', 'a']).unique(key=str.upper, mode='bloom', capacity=10).collect(list) == ['a', 'b']
+
+def test_unique_invalid():
+    with raises(ValueError):
+        Iter([]).unique(mode='bloom')
+    with raises(ValueError):
+        Iter([]).unique(mode='approximate')
+    with raises(ValueError):
+        Iter([]).unique(mode='bloom', capacity=10, error_rate=1)
+
+def test_bloom_filter_error_rate():
+    bloom = BloomFilter(10000, 0.01)
+    assert bloom.nbytes == (bloom.size + 7) // 8 < 12000
+    assert sum(bloom.add(i) for i in range(10000)) < 10000 * 0.01
+    assert all(i in bloom for i in range(10000))
+    false_positives = sum(i in bloom for i in range(10000, 110000))
+    assert false_positives < 100000 * 0.015
+
+def test_unique_consecutive():
+    assert Iter('AAAABBBCCDAABBB').unique_consecutive().collect(''.join) == 'ABCDAB'
+    assert Iter([1, -1, 2, -2, 2]).unique_consecutive(key=abs).collect(list) == [1, 2]
+    assert Iter([]).unique_consecutive().collect(list) == []
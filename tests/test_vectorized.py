@@ -0,0 +1,31 @@
+from pipe_iter import Iter
+from pytest import importorskip, raises
+
+np = importorskip('numpy')
+
+def test_map_batches():
+    assert Iter(range(10)).map_batches(lambda a: a * 2, size=3).collect(list) == [x * 2 for x in range(10)]
+    assert Iter(range(5)).map_batches(np.sqrt, size=2, dtype=float).map(round).collect(list) == [0, 1, 1, 2, 2]
+
+def test_map_batches_structured():
+    pairs = list(zip(range(5), range(5, 10)))
+    assert Iter(pairs).map_batches(lambda a: a['f0'] + a['f1'], size=2).collect(list) == [5, 7, 9, 11, 13]
+    assert Iter(pairs).star().map_batches(lambda x, y: x * y, size=4).collect(list) == [0, 6, 14, 24, 36]
+    assert Iter(pairs).doublestar().map_batches(lambda f0, f1: f1 - f0, size=4).collect(list) == [5] * 5
+    with raises(ValueError):
+        Iter(range(5)).star().map_batches(lambda x: x, size=2).collect(list)
+    with raises(ValueError):
+        Iter(range(5)).doublestar().filter_batches(lambda x: x > 1, size=2).collect(list)
+
+def test_filter_batches():
+    items = [3, 8, 1, 9, 4]
+    assert Iter(items).filter_batches(lambda a: a > 3, size=2).collect(list) == [8, 9, 4]
+    with raises(ValueError):
+        Iter(items).filter_batches(lambda a: a[:1] > 0, size=2).collect(list)
+
+def test_batches_mutability():
+    itr = Iter.and_mut(range(4))
+    assert itr.map_batches(lambda a: a + 1, size=3) is itr
+    assert itr.collect(list) == [1, 2, 3, 4]
+    immutable = Iter(range(4))
+    assert immutable.map_batches(lambda a: a + 1) is not immutable